@@ -0,0 +1,48 @@
+"""
+Benchmark for AsyncAPIClient.
+
+Runs the same number of GET requests against the local stand-in server with 1, 10
+and 100 requests in flight and prints the throughput for each. The server adds a
+small delay to every answer so it behaves like a real (remote) API.
+
+Run it from the project root:
+	python -m benchmarks.bench_async_client
+"""
+
+
+import asyncio							#For running the async client.
+import sys								#For finding the path to src when we run the benchmark.
+import os								#For finding the path to src when we run the benchmark.
+import time								#For measuring how long each run takes.
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))		#Same trick as in the tests so that "from src..." works.
+
+from src.async_api_client import AsyncAPIClient
+from src.local_server import LocalAPIServer
+
+TOTAL_REQUESTS = 500					#How many requests every run sends.
+SERVER_LATENCY = 0.02					#20 ms per answer, roughly one round trip to a nearby API.
+CONCURRENCY_LEVELS = (1,10,100)			#The numbers of requests in flight we want to compare.
+
+
+async def run_once(base_url,concurrency):									#Sends TOTAL_REQUESTS GETs and returns (seconds, number of errors).
+	paths = [f"users/{(i % 10) + 1}" for i in range(TOTAL_REQUESTS)]		#Cycling through the 10 seeded users.
+	async with AsyncAPIClient(base_url=base_url,max_concurrency=concurrency) as client:
+		start = time.perf_counter()
+		results = await client.get_many(paths)
+		elapsed = time.perf_counter() - start
+	errors = sum(1 for result in results if isinstance(result,Exception))
+	return elapsed,errors
+
+
+def main():
+	with LocalAPIServer(latency=SERVER_LATENCY) as server:
+		print(f"{TOTAL_REQUESTS} GET requests, {SERVER_LATENCY * 1000:.0f} ms server latency")
+		print(f"{'in flight':>10} {'seconds':>10} {'req/s':>10} {'errors':>8}")
+		for concurrency in CONCURRENCY_LEVELS:
+			elapsed,errors = asyncio.run(run_once(server.base_url,concurrency))
+			print(f"{concurrency:>10} {elapsed:>10.2f} {TOTAL_REQUESTS / elapsed:>10.1f} {errors:>8}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,58 @@
+"""
+Benchmark for the time APIClient itself adds to a request.
+
+Sends the same GET to the local stand-in server (no added latency) with a bare
+requests.Session, with APIClient and with an APIClient that has a timing hook,
+one after the other, and prints the time per request for each. The differences are
+the overhead of our own client code and of the timing instrumentation.
+
+Run it from the project root:
+	python -m benchmarks.bench_client_overhead
+"""
+
+
+import sys								#For finding the path to src when we run the benchmark.
+import os								#For finding the path to src when we run the benchmark.
+import time								#For measuring how long each run takes.
+
+import requests							#The bare session we compare against.
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))		#Same trick as in the tests so that "from src..." works.
+
+from src.api_client import APIClient
+from src.instrumentation import TimingCollector
+from src.local_server import LocalAPIServer
+
+REQUESTS_PER_RUN = 2000					#How many requests every run sends.
+WARMUP = 50								#Requests sent first so that connections are open before we measure.
+
+
+def time_per_request(send):				#Calls send() REQUESTS_PER_RUN times and returns microseconds per call.
+	for _ in range(WARMUP):
+		send()
+	start = time.perf_counter()
+	for _ in range(REQUESTS_PER_RUN):
+		send()
+	return (time.perf_counter() - start) / REQUESTS_PER_RUN * 1e6
+
+
+def main():
+	with LocalAPIServer() as server:
+		url = server.base_url + "/users/1"
+		session = requests.Session()
+		client = APIClient(base_url=server.base_url)
+		timed_client = APIClient(base_url=server.base_url,request_hooks=[TimingCollector().record])
+		results = [
+			("requests.Session.get",time_per_request(lambda: session.get(url,timeout=10))),
+			("APIClient.get",time_per_request(lambda: client.get("users/1"))),
+			("APIClient.get (timed)",time_per_request(lambda: timed_client.get("users/1"))),
+		]
+	baseline = results[0][1]
+	print(f"{REQUESTS_PER_RUN} GET users/1 against the local server")
+	print(f"{'client':>22} {'us/request':>12} {'overhead':>10}")
+	for name,micros in results:
+		print(f"{name:>22} {micros:>12.1f} {micros - baseline:>+10.1f}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,76 @@
+"""
+Benchmark for the streaming data-driven runner.
+
+Generates data files of growing size, posts them to the local stand-in server with
+DataDrivenRunner and prints the time and the peak memory (RSS) of each run. Every
+run happens in a fresh Python process so the peak memory of one run does not hide
+the next one. Peak RSS should stay about the same however big the file gets.
+
+Run it from the project root:
+	python -m benchmarks.bench_data_runner
+"""
+
+
+import json								#For writing the generated data files.
+import resource							#For reading the peak memory of a process (Linux/Mac only).
+import subprocess						#For running every size in its own Python process.
+import sys								#For finding the path to src when we run the benchmark.
+import os								#For finding the path to src when we run the benchmark.
+import tempfile							#For a folder to put the generated files in.
+import time								#For measuring how long each run takes.
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))		#Same trick as in the tests so that "from src..." works.
+
+RECORD_COUNTS = (2000,8000,32000)		#The file sizes we want to compare.
+FORMATS = ("json","ndjson")				#JSON array files and newline-delimited JSON files.
+
+
+def write_data_file(path,count,fmt):								#Writes count users without keeping them all in memory.
+	with open(path,'w',encoding='utf-8') as f:
+		if fmt == "json":
+			f.write("[\n")
+		for i in range(count):
+			record = json.dumps({"name":f"User {i}","username":f"user{i}","email":f"user{i}@example.com"})
+			if fmt == "json":
+				f.write(("," if i else "") + record + "\n")
+			else:
+				f.write(record + "\n")
+		if fmt == "json":
+			f.write("]\n")
+
+
+def run_child(data_file,results_file):								#Runs inside the child process: posts the file and prints the stats as JSON.
+	from src.api_client import APIClient
+	from src.data_runner import DataDrivenRunner
+	from src.local_server import LocalAPIServer
+
+	with LocalAPIServer() as server:
+		runner = DataDrivenRunner(client=APIClient(base_url=server.base_url),workers=8,results_file=results_file,checkpoint_every=1000)
+		start = time.perf_counter()
+		summary = runner.run(data_file,resume=False)
+		elapsed = time.perf_counter() - start
+	peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss		#Kilobytes on Linux.
+	print(json.dumps({"seconds":elapsed,"processed":summary["processed"],"failed":summary["failed"],"peak_rss_kb":peak_kb}))
+
+
+def main():
+	with tempfile.TemporaryDirectory() as tmp_dir:
+		print(f"{'format':>7} {'records':>9} {'file MB':>8} {'seconds':>8} {'rec/s':>8} {'peak RSS MB':>12}")
+		for fmt in FORMATS:
+			for count in RECORD_COUNTS:
+				data_file = os.path.join(tmp_dir,f"users_{count}.{fmt}")
+				write_data_file(data_file,count,fmt)
+				output = subprocess.run(
+					[sys.executable,"-m","benchmarks.bench_data_runner","--child",data_file,data_file + ".results"],
+					check=True,capture_output=True,text=True
+				).stdout
+				stats = json.loads(output.strip().splitlines()[-1])
+				size_mb = os.path.getsize(data_file) / 1e6
+				print(f"{fmt:>7} {count:>9} {size_mb:>8.1f} {stats['seconds']:>8.2f} {count / stats['seconds']:>8.0f} {stats['peak_rss_kb'] / 1024:>12.1f}")
+
+
+if __name__ == "__main__":
+	if len(sys.argv) == 4 and sys.argv[1] == "--child":
+		run_child(sys.argv[2],sys.argv[3])
+	else:
+		main()
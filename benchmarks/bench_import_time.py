@@ -0,0 +1,93 @@
+"""
+Benchmark for how long it takes to import the framework modules (cold start).
+
+Every short CLI call and every pytest-xdist worker pays this before doing any work.
+Each module is imported in a fresh "python -X importtime" process a few times and
+the fastest cumulative time is kept. The result is compared with
+benchmarks/import_time_baseline.json: the run fails (exit code 1) when a module got
+slower than its baseline by more than TOLERANCE (plus SLACK_MS for timer noise) or
+when importing the framework pulls in one of the LAZY_MODULES that should only load
+once a request is sent.
+
+Run it from the project root:
+	python -m benchmarks.bench_import_time            (compare with the baseline)
+	python -m benchmarks.bench_import_time --update   (save the current numbers as the baseline)
+"""
+
+
+import argparse							#For the --update and --runs options.
+import json								#For the baseline file and the subprocess output.
+import os								#For finding the project root and the baseline file.
+import subprocess						#Every measurement needs a fresh interpreter.
+import sys								#For starting the same Python that runs this benchmark.
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = os.path.join(PROJECT_ROOT,"benchmarks","import_time_baseline.json")
+MODULES = ("src.config","src.utils","src.api_client","src.async_api_client","src.client_registry","src.loadgen")
+LAZY_MODULES = ("requests","urllib3","charset_normalizer","idna","dotenv","orjson")		#Must not be imported by "import src.<anything>".
+TOLERANCE = 0.5							#50% slower than the baseline counts as a regression...
+SLACK_MS = 5.0							#...on top of a few milliseconds that timer noise alone can cause.
+
+
+def import_time_ms(module):				#Cumulative import time of module in a fresh interpreter, from -X importtime.
+	result = subprocess.run([sys.executable,"-X","importtime","-c",f"import {module}"],cwd=PROJECT_ROOT,capture_output=True,text=True,check=True)
+	for line in result.stderr.splitlines():
+		parts = [part.strip() for part in line.split("|")]
+		if len(parts) == 3 and parts[2] == module:						#The top-level line, not one of its children.
+			return int(parts[1]) / 1000.0
+	raise RuntimeError(f"No -X importtime line for {module}")
+
+
+def loaded_lazy_modules(modules=MODULES):	#The LAZY_MODULES that are in sys.modules after importing modules in a fresh interpreter.
+	code = (f"import sys\nfor name in {list(modules)!r}: __import__(name)\n"
+			f"print(__import__('json').dumps([m for m in {list(LAZY_MODULES)!r} if m in sys.modules]))")
+	result = subprocess.run([sys.executable,"-c",code],cwd=PROJECT_ROOT,capture_output=True,text=True,check=True)
+	return json.loads(result.stdout)
+
+
+def measure(runs=5):					#module -> fastest import time in milliseconds over runs fresh processes.
+	return {module:min(import_time_ms(module) for _ in range(runs)) for module in MODULES}
+
+
+def regressions(current,baseline):		#Messages for every module that got slower than the baseline allows.
+	problems = []
+	for module,ms in current.items():
+		allowed = baseline.get(module)
+		if allowed is not None and ms > allowed * (1 + TOLERANCE) + SLACK_MS:
+			problems.append(f"{module}: {ms:.1f} ms, baseline {allowed:.1f} ms")
+	return problems
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Measure the cold import time of the framework modules and fail on regressions.")
+	parser.add_argument("--runs",type=int,default=5,help="fresh processes per module, the fastest one counts (default 5)")
+	parser.add_argument("--update",action="store_true",help="save the current numbers as the new baseline")
+	args = parser.parse_args(argv)
+
+	current = measure(args.runs)
+	baseline = {}
+	if os.path.exists(BASELINE_FILE):
+		with open(BASELINE_FILE,'r',encoding='utf-8') as f:
+			baseline = json.load(f)
+	print(f"{'module':>22} {'ms':>8} {'baseline':>9}")
+	for module,ms in current.items():
+		print(f"{module:>22} {ms:>8.1f} {baseline.get(module,float('nan')):>9.1f}")
+
+	if args.update:
+		with open(BASELINE_FILE,'w',encoding='utf-8') as f:
+			json.dump({module:round(ms,1) for module,ms in current.items()},f,indent=2)
+			f.write("\n")
+		print(f"Baseline saved to {BASELINE_FILE}")
+		return 0
+
+	problems = regressions(current,baseline)
+	lazy = loaded_lazy_modules()
+	if lazy:
+		problems.append(f"imported at startup but should be lazy: {', '.join(lazy)}")
+	for problem in problems:
+		print(f"REGRESSION {problem}")
+	return 1 if problems else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Benchmark for setup_logger: blocking handlers versus the queued mode.
+
+Logs the same messages through a logger made by setup_logger the old way (every
+call formats and writes to the console and the log file itself) and through one
+made with queued=True (every call only puts the record on a queue), from 1 and 4
+threads. It prints log calls per second as seen by the calling threads and the time
+until the background writer has written everything. Console output goes to
+/dev/null so the terminal speed does not count.
+
+Run it from the project root:
+	python -m benchmarks.bench_logging
+"""
+
+
+import sys								#For finding the path to src when we run the benchmark.
+import os								#For finding the path to src when we run the benchmark.
+import tempfile							#For a folder to put the log files in.
+import threading						#For logging from several threads at once.
+import time								#For measuring how long each run takes.
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))		#Same trick as in the tests so that "from src..." works.
+
+from src.utils import setup_logger,shutdown_logger
+
+MESSAGES = 50000						#Log calls per run (split between the threads).
+THREAD_COUNTS = (1,4)
+
+
+def run(name,log_file,queued,threads):									#Returns (seconds spent in the logging calls, seconds until everything is written).
+	real_stderr = sys.stderr
+	sys.stderr = open(os.devnull,'w')									#StreamHandler picks up sys.stderr when it is created.
+	try:
+		logger = setup_logger(name,log_file=log_file,queued=queued,rate_limit=0)
+	finally:
+		sys.stderr = real_stderr
+	logger.propagate = False
+	per_thread = MESSAGES // threads
+
+	def work():
+		for i in range(per_thread):
+			logger.info("Created user: %s (ID: %d)","Alice Test",i)
+
+	workers = [threading.Thread(target=work) for _ in range(threads)]
+	start = time.perf_counter()
+	for worker in workers:
+		worker.start()
+	for worker in workers:
+		worker.join()
+	calls_done = time.perf_counter() - start
+	shutdown_logger(name)												#Waits for the queued records to be written.
+	all_written = time.perf_counter() - start
+	for handler in list(logger.handlers):
+		logger.removeHandler(handler)
+		handler.close()
+	return calls_done,all_written
+
+
+def main():
+	with tempfile.TemporaryDirectory() as tmp_dir:
+		print(f"{MESSAGES} logger.info calls")
+		print(f"{'mode':>9} {'threads':>8} {'calls/s':>12} {'written after s':>16}")
+		for threads in THREAD_COUNTS:
+			for queued in (False,True):
+				mode = "queued" if queued else "blocking"
+				name = f"bench_{mode}_{threads}"
+				calls_done,all_written = run(name,os.path.join(tmp_dir,name + ".log"),queued,threads)
+				print(f"{mode:>9} {threads:>8} {MESSAGES / calls_done:>12.0f} {all_written:>16.2f}")
+
+
+if __name__ == "__main__":
+	main()
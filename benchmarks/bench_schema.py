@@ -0,0 +1,88 @@
+"""
+Benchmark for checking and decoding big responses.
+
+Builds a JSON array of 10,000 users and times:
+  - the per-key asserts the tests used to do against USER_SCHEMA.validate_many
+  - CREATED_USER_SCHEMA.validate_many against the sent payloads
+  - decoding the body with the standard json module and with orjson (when installed)
+
+Run it from the project root:
+	python -m benchmarks.bench_schema
+"""
+
+
+import sys								#For finding the path to src when we run the benchmark.
+import os								#For finding the path to src when we run the benchmark.
+import json								#For building the body and for the standard decoder.
+import time								#For measuring how long each run takes.
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))		#Same trick as in the tests so that "from src..." works.
+
+from src.json_decoder import load_orjson
+from src.schema import CREATED_USER_SCHEMA,USER_SCHEMA
+
+ELEMENTS = 10000						#Users in the array.
+REPEATS = 20							#Every run is repeated this often and the best time is kept.
+
+
+def best_ms(function):					#Runs function REPEATS times and returns the fastest run in milliseconds.
+	best = None
+	for _ in range(REPEATS):
+		start = time.perf_counter()
+		function()
+		elapsed = time.perf_counter() - start
+		best = elapsed if best is None else min(best,elapsed)
+	return best * 1000
+
+
+def per_key_asserts(users):				#What test_get_all_users did before the schema.
+	for user in users:
+		assert "id" in user
+		assert "email" in user
+		assert "name" in user
+		assert "username" in user
+		assert isinstance(user["id"],int)
+		assert isinstance(user["email"],str)
+		assert isinstance(user["name"],str)
+		assert isinstance(user["username"],str)
+
+
+def per_key_matches(created,sent):		#What test_create_users_from_data_file did per user, plus the same type checks the schema does.
+	for created_user,user_data in zip(created,sent):
+		assert "id" in created_user
+		assert "name" in created_user
+		assert "username" in created_user
+		assert "email" in created_user
+		assert isinstance(created_user["id"],int)
+		assert isinstance(created_user["name"],str)
+		assert isinstance(created_user["username"],str)
+		assert isinstance(created_user["email"],str)
+		assert created_user["name"] == user_data["name"]
+		assert created_user["username"] == user_data["username"]
+		assert created_user["email"] == user_data["email"]
+
+
+def main():
+	sent = [{"name":f"User {i}","username":f"user{i}","email":f"user{i}@example.com"} for i in range(ELEMENTS)]
+	users = [dict(payload,id=i,phone="1-770-736-8031",website="example.org") for i,payload in enumerate(sent)]
+	body = json.dumps(users).encode("utf-8")
+	results = [
+		("per-key asserts",best_ms(lambda: per_key_asserts(users))),
+		("USER_SCHEMA.validate_many",best_ms(lambda: USER_SCHEMA.validate_many(users))),
+		("per-key matches",best_ms(lambda: per_key_matches(users,sent))),
+		("CREATED_USER_SCHEMA (matched)",best_ms(lambda: CREATED_USER_SCHEMA.validate_many(users,expected=sent))),
+		("json.loads",best_ms(lambda: json.loads(body))),
+	]
+	orjson = load_orjson()
+	if orjson is not None:
+		results.append(("orjson.loads",best_ms(lambda: orjson.loads(body))))
+	else:
+		print("orjson is not installed, skipping it (pip install orjson)")
+	print(f"{ELEMENTS} users, {len(body) / 1024:.0f} KiB body, best of {REPEATS}")
+	print(f"{'check':>30} {'ms':>8}")
+	for name,ms in results:
+		print(f"{name:>30} {ms:>8.2f}")
+
+
+if __name__ == "__main__":
+	main()
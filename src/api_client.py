@@ -7,13 +7,27 @@ address or how we send requests changes, we only need to edit this file.
 """
 
 
-import requests					#Library for sending GET and POST HTTP requests to API.
-import sys						#For finding the path to src when we run the tests.
-import os						#For finding the path to src when we run the tests.
+import json as jsonlib			#For building one response per record out of a bulk answer (post's json argument hides the module name).
+import io						#For reading a streamed response body as text.
+import threading				#For protecting the retry/breaker counters when several threads share one client.
+from urllib.parse import urlsplit	#For finding the host of a URL (the circuit breaker works per host).
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))				#It adds the project folder to the list of places Python looks when you import something, so from src.config import Config works.
+from src.lazy import lazy_import	#requests and friends are only imported once a client is created, so importing this file (e.g. for APIError) stays fast.
 
+requests = lazy_import("requests")	#Library for sending GET and POST HTTP requests to API.
+futures = lazy_import("concurrent.futures")	#For fetching the next page in the background while the current one is being used.
+instrumentation = lazy_import("src.instrumentation")	#For timing every request when request hooks are registered (it imports urllib3 itself).
+urllib3_connection = lazy_import("urllib3.connection")	#Its default socket options are kept when keep-alive options are added.
+socket = lazy_import("socket")	#For the TCP keep-alive socket options of pooled connections.
+
+from src.coalescing import BULK_UNSUPPORTED_STATUSES,SingleFlight	#For sharing identical GETs in flight and batching POSTs.
 from src.config import Config	#To import the settings from the Config class in config.py in src.
+from src.json_decoder import get_decoder,use_decoder	#For decoding response.json() with a faster decoder (orjson) when one is available.
+from src.json_stream import iter_json_array	#For decoding a streamed JSON array one item at a time.
+from src.response_cache import make_key		#For building the cache key (URL plus query parameters).
+
+ERROR_BODY_LIMIT = 500			#At most this many bytes of an error body go into the APIError message.
+PAGINATION_STYLES = ("page","range","none")		#page: _page/_limit, range: _start/_end, none: one request (Link headers are followed in every style).
 
 
 
@@ -24,15 +38,70 @@ class APIError(Exception):												#creating our own error exception class in
 		self.response = response
 		super().__init__(self.message)									#This makes this class behave exactly like how the Exception class would behave.
 
+class CircuitOpenError(APIError):										#Raised without sending anything when the circuit breaker says the host is down.
+	pass
+
 class APIClient:														#The class that knows "how" to call the API
-	def __init__(self,base_url=None,timeout=None):						
+	default_request_hooks = []											#Hooks every new client starts with (the pytest timing plugin adds its collector here).
+
+	def __init__(self,base_url=None,timeout=None,retry_policy=None,circuit_breaker=None,cache=None,request_hooks=None,json_decoder=None,coalesce_gets=False,post_batcher=None):	#retry_policy and circuit_breaker are optional (see src/resilience.py). Without them every failure is raised straight away. cache is an optional ResponseCache (see src/response_cache.py) used by get. request_hooks get a RequestTiming for every request sent (see src/instrumentation.py). json_decoder picks what response.json() uses (see src/json_decoder.py), Config.JSON_DECODER by default. coalesce_gets and post_batcher turn on request coalescing (see src/coalescing.py).
 		self.base_url = base_url or Config.get_base_url()				#Either the base url that comes to this function or the base url from config.py in src.
 		self.timeout = timeout or Config.get_timeout()					#Either the timeout that comes to this function or the timeout from config.py in src.
+		self.retry_policy = retry_policy
+		self.circuit_breaker = circuit_breaker
+		self.cache = cache
+		self._json_loads = get_decoder(json_decoder or Config.JSON_DECODER)	#None means requests' own response.json().
+		self.single_flight = SingleFlight() if coalesce_gets else None	#Concurrent identical GETs share one request.
+		self.post_batcher = post_batcher								#Concurrent POSTs to the same path go out as one bulk request.
+		self.stats = {"retries":0,"retry_budget_exhausted":0,"circuit_opened":0,"circuit_rejected":0,		#Counters so we can see how often the retry and breaker layers kicked in.
+					"coalesced":0,"bulk_requests":0,"batched":0,"requests_saved":0}					#...and how many requests coalescing and batching saved.
+		self._stats_lock = threading.Lock()								#The same client can be used by several worker threads.
 		self.session = requests.Session()								#requests.Session() makes one session to make multiple requests rather than making many connections every time a request has to be made.
 		# Set User-Agent header so requests look like they come from a browser. Helps when an API (e.g. reqres.in) is behind Cloudflare and may block scripted requests.
 		self.session.headers.update({
 			'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 		})
+		self.request_hooks = list(APIClient.default_request_hooks) + list(request_hooks or [])
+		self._pool_options = {"pool_size":None,"pool_block":False,"keepalive_idle":None}
+		if self.request_hooks:
+			self.set_pool_size(None)									#Swaps in the adapter whose connections report their connect time.
+
+	def set_pool_size(self,pool_size,pool_block=None,keepalive_idle=None):	#Keeps up to pool_size connections per host open (None keeps the requests default of 10). pool_block=True makes extra threads wait for a free connection instead of opening throwaway ones. keepalive_idle turns on TCP keep-alive probes after that many idle seconds so long-lived pooled connections are not silently dropped. pool_block and keepalive_idle left at None keep their current setting (pass False/0 to turn them off). Use this instead of mounting an adapter so timing hooks keep working.
+		self._pool_options = {
+			"pool_size":pool_size,
+			"pool_block":self._pool_options["pool_block"] if pool_block is None else pool_block,
+			"keepalive_idle":self._pool_options["keepalive_idle"] if keepalive_idle is None else keepalive_idle,
+		}
+		pool_block,keepalive_idle = self._pool_options["pool_block"],self._pool_options["keepalive_idle"]
+		adapter_class = instrumentation.InstrumentedAdapter if self.request_hooks else requests.adapters.HTTPAdapter
+		adapter = adapter_class(pool_maxsize=pool_size or requests.adapters.DEFAULT_POOLSIZE,pool_block=pool_block)
+		if keepalive_idle:
+			socket_options = list(urllib3_connection.HTTPConnection.default_socket_options) + [(socket.SOL_SOCKET,socket.SO_KEEPALIVE,1)]
+			if hasattr(socket,"TCP_KEEPIDLE"):													#Linux; other systems only get SO_KEEPALIVE with their default timing.
+				socket_options.append((socket.IPPROTO_TCP,socket.TCP_KEEPIDLE,int(keepalive_idle)))
+			adapter.init_poolmanager(adapter._pool_connections,adapter._pool_maxsize,block=pool_block,socket_options=socket_options)
+		self.session.mount("http://",adapter)
+		self.session.mount("https://",adapter)
+
+	def grow_pool(self,pool_size):										#Makes sure up to pool_size connections per host can be kept open. A pool that is already big enough is left alone, so shared clients keep their options and their open (pre-warmed) connections.
+		if pool_size > (self._pool_options["pool_size"] or requests.adapters.DEFAULT_POOLSIZE):
+			self.set_pool_size(pool_size)
+
+	def connection_stats(self):											#How many requests went through the pooled connections and how many new connections (TCP + TLS handshakes) they needed.
+		requests_sent = connections = 0
+		for adapter in set(self.session.adapters.values()):
+			pools = adapter.poolmanager.pools
+			for key in pools.keys():
+				pool = pools[key]
+				requests_sent += pool.num_requests
+				connections += pool.num_connections
+		return {"requests":requests_sent,"connections":connections,"handshakes_saved":max(0,requests_sent - connections)}
+
+	def add_request_hook(self,hook):									#hook(timing) is called after every request attempt with a RequestTiming.
+		first = not self.request_hooks
+		self.request_hooks.append(hook)
+		if first:
+			self.set_pool_size(**self._pool_options)
 
 	def _build_url(self,path):											#Glues the base url with the path.
 		path = path.strip('/')											#Removes leading/trailing '/' from the path.
@@ -41,28 +110,218 @@ class APIClient:														#The class that knows "how" to call the API
 
 	def get(self,path,params=None):															#This method is asking for resources from the API and returns what that API has responded.
 		url = self._build_url(path)															#This is an attempt to make the complete URL with the proper path and keep it ready and stored in url.
+		if self.single_flight is not None:													#The same GET already in flight on another thread is waited for instead of sent again.
+			response,shared = self.single_flight.do(make_key(url,params),self._get,url,params)
+			if shared:
+				self._count("coalesced")
+				self._count("requests_saved")
+			return response
+		return self._get(url,params)
+
+	def _get(self,url,params):																#The GET itself: through the cache when there is one, otherwise straight to the API.
+		if self.cache is not None:															#With a cache, a fresh copy is returned without any network call.
+			return self._cached_get(url,params)
 		try:																				#Try block is for attempting to execute certain code. If the code fails or gives an error then the except block after the try block will take over and convey what error has happened.
-			response = self.session.get(url,params=params,timeout=self.timeout)				#There is a request made to the API here in the form of get request and that response is stored in response variable.
+			response = self._send("GET",url,params=params)									#There is a request made to the API here in the form of get request (retried if a retry policy is set) and that response is stored in response variable.
 			self._raise_for_error(response,url)												#This method is defined below. Raises APIError if status code >= 400.
 			return response																	#This returns the response which is the outcome of this get method defined here.
 		except requests.RequestException as e:												#If there was a challenge in the try block (e.g. network error, timeout) then this will get executed.
 			raise APIError(f"GET request failed: {e}", response=None)						#The 'e' holds the details of the potential error and that will be displayed in the output.
 	
-	def post(self,path,json=None,data=None):												#This method is for giving information either in the form of JSON or data.
+	def _cached_get(self,url,params):														#GET through the response cache: fresh copy, conditional revalidation, or a normal request.
+		key = make_key(url,params)
+		entry,fresh = self.cache.lookup(key)
+		if fresh:
+			return use_decoder(entry.to_response(),self._json_loads)
+		headers = entry.validators() if entry is not None else None							#If-None-Match/If-Modified-Since for a stale copy.
+		try:
+			response = self._send("GET",url,params=params,headers=headers)
+		except requests.RequestException as e:
+			raise APIError(f"GET request failed: {e}", response=None)
+		if response.status_code == 304 and entry is not None:								#Not Modified: only headers came over the network.
+			return use_decoder(self.cache.revalidated(key,entry,response),self._json_loads)
+		self._raise_for_error(response,url)
+		self.cache.store(key,response)
+		return response
+
+	def post(self,path,json=None,data=None,retry=False):									#This method is for giving information either in the form of JSON or data. POST is not idempotent, so it is only retried when retry=True.
+		if self.post_batcher is not None and json is not None and data is None and not retry:	#JSON records may go out together with other threads' records.
+			return self.post_batcher.submit(self,path,json)
+		return self._post(path,json,data,retry)
+
+	def _post(self,path,json=None,data=None,retry=False):									#The POST itself, one record per request.
 		url = self._build_url(path)															#This is an attempt to make the complete URL with the proper path and keep it ready and stored in url.
 		try:																				#Try block is for attempting to execute certain code. If the code fails or gives an error then the except block after the try block will take over and convey what error has happened.
-			response = self.session.post(url,json=json,data=data,timeout=self.timeout)		#There is a request made to the API here in the form of post request and that response is stored in response variable.
+			response = self._send("POST",url,force_retry=retry,json=json,data=data)			#There is a request made to the API here in the form of post request and that response is stored in response variable.
 			self._raise_for_error(response,url)												#This method is defined below. Raises APIError if status code >= 400.
 			return response																	#This returns the response which is the outcome of this post method defined here.
 		except requests.RequestException as e:												#If there was a challenge in the try block (e.g. network error, timeout) then this will get executed.
 			raise APIError(f"POST request failed: {e}",response=None)						#The 'e' holds the details of the potential error and that will be displayed in the output.
 
+	def _post_bulk(self,path,payloads):														#Sends the payloads as one JSON array for PostBatcher. Returns one response per payload, or None when the API refused the array (nothing was created).
+		url = self._build_url(path)
+		try:
+			response = self._send("POST",url,json=payloads)
+		except requests.RequestException as e:
+			raise APIError(f"POST request failed: {e}",response=None)
+		if response.status_code in BULK_UNSUPPORTED_STATUSES:
+			return None
+		self._raise_for_error(response,url)
+		try:
+			items = response.json()
+		except ValueError:
+			items = None
+		if not isinstance(items,list) or len(items) != len(payloads):						#The API took the array but not as separate records, so they must not be posted again.
+			raise APIError(f"Bulk POST to {url} was accepted ({response.status_code}) but did not answer with {len(payloads)} records. Response: {self._error_body_preview(response)}",
+				status_code=response.status_code,response=response)
+		self._count("bulk_requests")
+		with self._stats_lock:
+			self.stats["batched"] += len(payloads)
+			self.stats["requests_saved"] += len(payloads) - 1
+		return [self._item_response(response,item) for item in items]
+
+	def _item_response(self,bulk_response,item):											#A response for one record of a bulk answer, as if it had been posted alone.
+		response = requests.Response()
+		response.status_code = bulk_response.status_code
+		response.headers = requests.structures.CaseInsensitiveDict(bulk_response.headers)
+		response._content = jsonlib.dumps(item).encode("utf-8")
+		response.headers["Content-Length"] = str(len(response._content))
+		response.encoding = "utf-8"
+		response.url = bulk_response.url
+		response.request = bulk_response.request
+		response.elapsed = bulk_response.elapsed
+		return use_decoder(response,self._json_loads)
+
+	def _page_params(self,params,pagination,page_size,page_index):							#The query parameters for page number page_index (starting at 0).
+		if pagination == "page":
+			return dict(params,_page=page_index + 1,_limit=page_size)
+		if pagination == "range":
+			return dict(params,_start=page_index * page_size,_end=(page_index + 1) * page_size)
+		return params
+
+	def _fetch_page(self,url,params,stream):												#One GET for iter_get. Raises APIError just like get.
+		try:
+			response = self._send("GET",url,params=params,stream=stream)
+		except requests.RequestException as e:
+			raise APIError(f"GET request failed: {e}", response=None)
+		self._raise_for_error(response,url)
+		return response
+
+	def _iter_streamed_items(self,response):												#Decodes the JSON array in a streamed response item by item, straight from the socket.
+		response.raw.decode_content = True													#Lets urllib3 undo gzip/deflate for us.
+		text = io.TextIOWrapper(response.raw,encoding=response.encoding or "utf-8")
+		try:
+			yield from iter_json_array(text)
+		finally:
+			response.close()
+
+	def iter_get(self,path,params=None,page_size=None,pagination="page",stream=False,prefetch=True,max_pages=None):	#Yields the items of a collection one by one, page by page. Memory depends on the page size, not on the size of the collection.
+		if pagination not in PAGINATION_STYLES:
+			raise ValueError(f"pagination must be one of {PAGINATION_STYLES}")
+		if page_size is None or pagination == "none":
+			pagination = "none"																#Without a page size we cannot ask for pages, so we send one request (and follow Link headers).
+		url = self._build_url(path)
+		params = dict(params or {})
+		request = (url,self._page_params(params,pagination,page_size,0))
+		executor = futures.ThreadPoolExecutor(max_workers=1,thread_name_prefix="iter-get") if prefetch and not stream else None	#A streamed page is read while we use it, so only buffered pages are prefetched.
+		future = None
+		pages = 0
+		try:
+			while request is not None:
+				response = future.result() if future is not None else self._fetch_page(request[0],request[1],stream)
+				future = None
+				request = None
+				pages += 1
+				next_link = response.links.get("next",{}).get("url")						#A Link: <...>; rel="next" header wins over our own page counting.
+				if stream:
+					count = 0
+					for item in self._iter_streamed_items(response):
+						count += 1
+						yield item
+				else:
+					items = response.json()
+					if not isinstance(items,list):
+						raise ValueError(f"iter_get expects a JSON array from {response.url}")
+					count = len(items)
+				if pagination != "none" and not next_link and count > page_size:					#More than we asked for: the server ignores the paging parameters and would send the same items for every page.
+					raise ValueError(f"{response.url} answered with {count} items for a page of {page_size}; the server ignores {pagination!r} paging, use pagination=\"none\"")
+				if max_pages is None or pages < max_pages:
+					if next_link:
+						request = (next_link,None)												#The link already carries the query parameters.
+					elif pagination != "none" and count == page_size:						#A full page means there may be more.
+						request = (url,self._page_params(params,pagination,page_size,pages))
+				if not stream:
+					if request is not None and executor is not None:
+						future = executor.submit(self._fetch_page,request[0],request[1],False)	#The next page downloads while the caller works through this one.
+					response = None
+					yield from items
+					items = None
+		finally:
+			if executor is not None:
+				executor.shutdown(wait=True,cancel_futures=True)
+
+	def _count(self,name):																							#Adds one to a counter in self.stats.
+		with self._stats_lock:
+			self.stats[name] += 1
+
+	def _send(self,method,url,force_retry=False,**kwargs):															#Sends the request, retrying and checking the circuit breaker when they are configured. Network errors are raised as requests.RequestException.
+		host = urlsplit(url).netloc
+		attempt = 0
+		while True:
+			if self.circuit_breaker is not None and not self.circuit_breaker.allow(host):
+				self._count("circuit_rejected")
+				raise CircuitOpenError(f"{method} request not sent: circuit open for {host}")						#Failing fast instead of waiting for the timeout.
+			response = error = None
+			if self.request_hooks:																					#Timed path, only taken when someone is listening.
+				response,error,timing = instrumentation.timed_request(self.session,method,url,timeout=self.timeout,**kwargs)
+				for hook in self.request_hooks:
+					hook(timing)
+				if error is not None and not isinstance(error,requests.RequestException):
+					raise error
+			else:
+				try:
+					response = self.session.request(method,url,timeout=self.timeout,**kwargs)
+				except requests.RequestException as e:
+					error = e
+			if self.circuit_breaker is not None:
+				if error is not None or response.status_code >= 500:													#Only network errors and server errors count as "the host is down".
+					if self.circuit_breaker.record_failure(host):
+						self._count("circuit_opened")
+				else:
+					self.circuit_breaker.record_success(host)
+			policy = self.retry_policy
+			attempt += 1
+			if policy is None or attempt > policy.max_retries or not policy.is_retryable(method,response,error,force_retry):
+				break
+			if not policy.take_budget():
+				self._count("retry_budget_exhausted")
+				break
+			self._count("retries")
+			delay = policy.backoff(attempt,response)
+			if response is not None:
+				response.close()																					#Gives the connection back to the pool (matters for streamed responses).
+			policy.sleep(delay)
+		if error is not None:
+			raise error
+		return use_decoder(response,self._json_loads)
+
 	def _raise_for_error(self,response,url):																		#Defining the _raise_for_error method for catching the error and providing the proper error message so that the output is not ugly and it does not crash.
 		if response.status_code >= 400:																				#HTTP status codes 400+ indicate client or server errors (e.g. 404 Not Found, 403 Forbidden, 500 Internal Server Error).
 			raise APIError(																							#Invoking the APIError custom exception that we created above.
-				message=f"API returned error: {response.status_code} for {url}. Response: {response.text}",			#Making our custom error message that needs to be displayed when the error occurs.
+				message=f"API returned error: {response.status_code} for {url}. Response: {self._error_body_preview(response)}",	#Making our custom error message that needs to be displayed when the error occurs. Only the start of the body is used so a huge error page is not copied into every exception.
 				status_code=response.status_code,																	#Storing the status code for future use (e.g. in tests we assert error_info.value.status_code == 404).
 				response=response																					#Storing the full response object for future inspection (e.g. response body, headers).
 			)
 
-	
\ No newline at end of file
+	def _error_body_preview(self,response):																		#Returns at most ERROR_BODY_LIMIT bytes of the body as text. A streamed body is only read that far, the rest is never downloaded.
+		if response._content_consumed:
+			preview = response.content[:ERROR_BODY_LIMIT]
+		else:
+			try:
+				preview = response.raw.read(ERROR_BODY_LIMIT,decode_content=True) or b""
+			except Exception:
+				preview = b""																						#Not being able to read the body should never hide the real error.
+			finally:
+				response.close()
+		text = preview.decode(response.encoding or "utf-8",errors="replace")
+		return text + ("..." if len(preview) >= ERROR_BODY_LIMIT else "")
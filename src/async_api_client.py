@@ -0,0 +1,77 @@
+"""
+Async API Client module for the automation framework.
+
+AsyncAPIClient is the asyncio counterpart of APIClient. It has the same get/post
+methods and raises the same APIError, but many requests can be in flight at the
+same time. get_many/post_many send a whole list of requests with a limit on how
+many run at once and give the results back in the same order as the input. Only
+max_concurrency items are taken from the list at a time, so long lists (or
+generators) do not fill the executor's queue.
+"""
+
+
+from src.api_client import APIClient,APIError					#We reuse the normal client so URLs, headers and errors behave exactly the same.
+from src.lazy import lazy_import
+
+asyncio = lazy_import("asyncio")								#For running many requests at the same time with async/await. Only loaded once the client is used.
+futures = lazy_import("concurrent.futures")						#The worker threads that do the actual (blocking) HTTP calls.
+
+
+class AsyncAPIClient:																	#The class that knows "how" to call the API without blocking the event loop.
+	def __init__(self,base_url=None,timeout=None,max_concurrency=10,**client_options):	#max_concurrency is the highest number of requests that can be in flight at the same time. Every other option (retry_policy, circuit_breaker, cache, request_hooks, json_decoder, coalesce_gets, post_batcher) is passed on to APIClient.
+		if max_concurrency < 1:
+			raise ValueError("max_concurrency must be at least 1")
+		self.max_concurrency = max_concurrency
+		self._client = APIClient(base_url=base_url,timeout=timeout,**client_options)		#The sync client does the real work inside the worker threads.
+		self.stats = self._client.stats													#Retry, breaker, coalescing and batching counters of the sync client.
+		self.base_url = self._client.base_url
+		self.timeout = self._client.timeout
+		self.session = self._client.session
+		self._client.grow_pool(max_concurrency)											#By default requests keeps only 10 connections per host, which would make extra workers open and throw away connections.
+		self._executor = futures.ThreadPoolExecutor(max_workers=max_concurrency,thread_name_prefix="async-api")		#Our own pool of max_concurrency threads. Extra requests wait in its queue, which is what bounds the concurrency.
+
+	async def _run(self,func,*args):													#Runs one blocking client call in the worker threads without blocking the event loop.
+		loop = asyncio.get_running_loop()
+		return await loop.run_in_executor(self._executor,func,*args)
+
+	async def get(self,path,params=None):												#Same as APIClient.get but awaitable. Raises APIError on failure.
+		return await self._run(self._client.get,path,params)
+
+	async def post(self,path,json=None,data=None,retry=False):							#Same as APIClient.post but awaitable. Raises APIError on failure.
+		return await self._run(self._client.post,path,json,data,retry)
+
+	def _raise_for_error(self,response,url):											#Kept so the async client has the same contract as APIClient.
+		self._client._raise_for_error(response,url)
+
+	async def _capture(self,coro):														#Turns an APIError into a result so one bad item does not cancel the others.
+		try:
+			return await coro
+		except APIError as e:
+			return e
+
+	async def _map(self,func,items):													#Calls func(*args) for every args in items with max_concurrency workers. Each worker takes the next item only when its last one is done, so the items are never all queued at once (items can be a generator). Returns the results in input order.
+		results = {}
+		pending = enumerate(items)														#Shared by the workers; they run on one event loop, so taking the next item needs no lock.
+
+		async def worker():
+			for index,args in pending:
+				results[index] = await self._capture(self._run(func,*args))
+
+		await asyncio.gather(*(worker() for _ in range(self.max_concurrency)))
+		return [results[index] for index in range(len(results))]
+
+	async def get_many(self,paths,params=None):											#Sends a GET for every path. Returns a list in the same order as paths, each item is either a response or an APIError.
+		return await self._map(self._client.get,((path,params) for path in paths))
+
+	async def post_many(self,path,payloads):											#POSTs every JSON payload to the same path. Returns a list in the same order as payloads, each item is either a response or an APIError.
+		return await self._map(self._client.post,((path,payload) for payload in payloads))
+
+	def close(self):																	#Stops the worker threads and closes the connections. Blocks until running requests are done, so from async code use "async with" instead.
+		self._executor.shutdown(wait=True)
+		self.session.close()
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self,*exc_info):
+		await asyncio.to_thread(self.close)												#Waiting for the worker threads happens off the event loop, so other tasks keep running.
@@ -0,0 +1,75 @@
+"""
+Shared APIClient registry for the automation framework.
+
+Creating a new APIClient for every test means a new requests.Session and a new
+TCP + TLS handshake for every test. get_client hands out one pooled client per base
+URL per process instead, so connections stay open between tests. pytest-xdist
+workers are separate processes, so each worker keeps its own hot pool without any
+locking between them. prewarm opens a few connections up front and close_all shuts
+everything down at the end of the session.
+"""
+
+
+import threading											#get_client can be called from several threads at once.
+
+from src.api_client import APIClient
+from src.config import Config
+
+_clients = {}												#base URL -> APIClient for this process
+_lock = threading.Lock()
+
+
+def get_client(base_url=None,pool_size=None,pool_block=None,keepalive_idle=None):		#Returns the shared client for this base URL (Config.BASE_URL by default), creating it the first time. The pool options default to Config and only apply when the client is created.
+	base_url = base_url or Config.get_base_url()
+	with _lock:
+		client = _clients.get(base_url)
+		if client is None:
+			client = APIClient(base_url=base_url)
+			client.set_pool_size(
+				pool_size or Config.POOL_SIZE,
+				pool_block=Config.POOL_BLOCK if pool_block is None else pool_block,
+				keepalive_idle=keepalive_idle or Config.KEEPALIVE_IDLE or None,
+			)
+			_clients[base_url] = client
+		return client
+
+
+def prewarm(client,connections,path=""):					#Opens `connections` pooled connections at the same time by sending that many GETs to path. Returns how many succeeded.
+	if connections < 1:
+		return 0
+	barrier = threading.Barrier(connections)				#All requests start together, so each one needs its own connection.
+	results = []
+
+	def warm():
+		try:
+			barrier.wait(timeout=client.timeout)
+			client.session.get(client._build_url(path),timeout=client.timeout)		#Any answer (even 404) leaves an open connection in the pool.
+			results.append(True)
+		except Exception:
+			results.append(False)							#Pre-warming is only an optimisation, a failure here must not break the session.
+
+	threads = [threading.Thread(target=warm,name=f"prewarm-{i}") for i in range(connections)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	return sum(results)
+
+
+def connection_stats():										#Requests, new connections and handshakes saved, added up over every shared client.
+	totals = {"clients":0,"requests":0,"connections":0,"handshakes_saved":0}
+	with _lock:
+		clients = list(_clients.values())
+	for client in clients:
+		totals["clients"] += 1
+		for name,value in client.connection_stats().items():
+			totals[name] += value
+	return totals
+
+
+def close_all():											#Closes every shared client and forgets them.
+	with _lock:
+		clients = list(_clients.values())
+		_clients.clear()
+	for client in clients:
+		client.session.close()
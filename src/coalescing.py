@@ -0,0 +1,143 @@
+"""
+Request coalescing for APIClient.
+
+SingleFlight makes concurrent identical GETs share one network call: the first
+caller sends the request and every caller that asks for the same URL and query
+while it is in flight waits for it and gets the same answer (or its own copy of the
+same APIError). Turn it on with APIClient(coalesce_gets=True).
+
+PostBatcher collects POSTs to the same path that arrive within max_wait seconds
+(at most max_batch of them) and sends them as one request whose body is a JSON
+array. If the API answers with an array of the same length, every caller gets its
+own response built from its own item. If the API refuses arrays (a 400, 404, 405,
+413, 415 or 501 answer, so nothing was created), every caller sends its own record
+instead, and later POSTs to that path skip batching. If the API accepts the array
+but does not answer with a matching array (jsonplaceholder stores the whole array
+as one object), the records may already be stored, so they are never sent again:
+every caller gets an APIError and later POSTs to that path skip batching.
+Batches are kept apart per base URL, so clients for different servers can share
+one PostBatcher.
+Turn it on with APIClient(post_batcher=PostBatcher(...)). A lone POST waits up
+to max_wait for company, so batching only pays off when many threads post at once.
+
+client.stats["requests_saved"] counts the requests both of them saved.
+"""
+
+
+import copy												#Every waiting caller gets its own copy of a shared exception.
+import threading										#Callers on many threads meet in the same flight or batch.
+
+BULK_UNSUPPORTED_STATUSES = (400,404,405,413,415,501)	#Answers that mean "this endpoint does not take an array".
+
+
+def _own_copy(error):									#A copy of the exception for one caller, so threads never share (and extend) one traceback.
+	try:
+		return copy.copy(error)
+	except Exception:
+		return error									#An exception that cannot be copied is raised as it is.
+
+
+class _Flight:											#One GET in flight.
+	__slots__ = ("done","result","error")
+
+	def __init__(self):
+		self.done = threading.Event()
+		self.result = None
+		self.error = None
+
+
+class SingleFlight:										#The class that makes identical calls in flight at the same time share one result.
+	def __init__(self):
+		self._flights = {}								#key -> _Flight
+		self._lock = threading.Lock()
+
+	def do(self,key,func,*args):						#Returns (result, shared). shared is True when another caller's call produced the result.
+		with self._lock:
+			flight = self._flights.get(key)
+			leader = flight is None
+			if leader:
+				flight = _Flight()
+				self._flights[key] = flight
+		if not leader:
+			flight.done.wait()
+			if flight.error is not None:
+				raise _own_copy(flight.error)
+			return flight.result,True
+		try:
+			flight.result = func(*args)
+		except BaseException as e:
+			flight.error = e
+			raise
+		finally:
+			with self._lock:
+				del self._flights[key]					#Calls starting from now on send a new request.
+			flight.done.set()
+		return flight.result,False
+
+
+class _Batch:											#POSTs waiting to go out together.
+	__slots__ = ("payloads","full","done","responses","error","fallback")
+
+	def __init__(self):
+		self.payloads = []
+		self.full = threading.Event()					#Set when max_batch payloads have joined, so the leader does not wait any longer.
+		self.done = threading.Event()
+		self.responses = None
+		self.error = None
+		self.fallback = False							#True when every caller has to send its own record.
+
+
+class PostBatcher:										#The class that turns many concurrent POSTs into one bulk POST.
+	def __init__(self,max_batch=50,max_wait=0.005):
+		if max_batch < 1:
+			raise ValueError("max_batch must be at least 1")
+		self.max_batch = max_batch						#Most records in one bulk request.
+		self.max_wait = max_wait						#Seconds the first record of a batch waits for others to join.
+		self._open = {}									#(base url, path) -> _Batch still taking records
+		self._unsupported = set()						#(base url, path) pairs that did not handle a bulk request.
+		self._lock = threading.Lock()
+
+	def submit(self,client,path,payload):				#Called by APIClient.post. Returns this record's response or raises its own APIError.
+		key = (client.base_url,path)					#The batch is sent through the leader's client, so only records for the same server may join it.
+		if key in self._unsupported:
+			return client._post(path,payload)
+		with self._lock:
+			batch = self._open.get(key)
+			leader = batch is None
+			if leader:
+				batch = _Batch()
+				self._open[key] = batch
+			index = len(batch.payloads)
+			batch.payloads.append(payload)
+			if len(batch.payloads) >= self.max_batch:
+				del self._open[key]						#Full: the next record starts a new batch.
+				batch.full.set()
+		if leader:
+			batch.full.wait(self.max_wait)
+			with self._lock:
+				if self._open.get(key) is batch:
+					del self._open[key]
+			self._flush(client,path,key,batch)
+		else:
+			batch.done.wait()
+		if batch.fallback:
+			return client._post(path,payload)			#Every caller sends its own record, on its own thread.
+		if batch.error is not None:
+			raise _own_copy(batch.error)
+		return batch.responses[index]
+
+	def _flush(self,client,path,key,batch):				#Sends the batch and wakes everyone up. Runs on the leader's thread.
+		try:
+			if len(batch.payloads) == 1:
+				batch.fallback = True					#Nobody joined: a normal POST, no array.
+			else:
+				batch.responses = client._post_bulk(path,batch.payloads)
+				if batch.responses is None:
+					self._unsupported.add(key)
+					batch.fallback = True				#Refused, so nothing was created and every record can be sent on its own.
+		except Exception as e:
+			if 200 <= (getattr(e,"status_code",None) or 0) < 300:
+				self._unsupported.add(key)				#Accepted but not answered per record: never batch this path again.
+			batch.error = e
+		finally:
+			batch.done.set()
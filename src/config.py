@@ -5,20 +5,88 @@ It includes project settings for
 	- API base URLs,
 	- timeouts
 	- environment specific variables
+
+Nothing is read when this file is imported. The first time a setting is used, the
+environment is put together once and every value is cached after its first use:
+	1. environment variables (always win)
+	2. .env.<profile> in the project root, when a profile is chosen
+	3. the built-in Config.PROFILES[<profile>]
+	4. .env in the project root
+	5. the defaults below
+A profile is chosen with CONFIG_PROFILE=<name> (in the environment or in .env) or
+with Config.use_profile("<name>"). Assigning Config.BASE_URL = ... overrides a value
+until Config.reload().
 """
 
 import os     #This is for accessing the environment variables
-from dotenv import load_dotenv     #This is for loading variables from a .env file.
 
-load_dotenv()          #Loads environment variable from .env file.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))     #Where .env and .env.<profile> are looked for.
+
+
+def _flag(value):     #"1", "true" or "yes" (any case) mean on.
+	return value.lower() in ("1","true","yes")
+
+
+def _read_env_file(path):     #The variables in a .env style file, or nothing when there is no such file. python-dotenv is only imported when there is a file to read.
+	if not os.path.isfile(path):
+		return {}
+	from dotenv import dotenv_values     #This is for reading variables from a .env file.
+	return {name:value for name,value in dotenv_values(path).items() if value is not None}
+
+
+class _Setting:     #One setting. Read from the environment the first time it is used, then cached in Config._values.
+	def __init__(self,env,default,cast=str):
+		self.env = env     #Name of the environment variable.
+		self.default = default     #Used when the variable is not set anywhere, as text (it goes through cast too).
+		self.cast = cast     #str, int, float or _flag.
+
+	def __set_name__(self,owner,name):
+		self.name = name
+
+	def __get__(self,instance,owner):
+		values = owner._values
+		if self.name not in values:
+			values[self.name] = self.cast(owner._environment().get(self.env,self.default))
+		return values[self.name]
+
+
+class _ConfigType(type):     #Makes Config.BASE_URL = value override the cached value instead of replacing the setting itself.
+	def __setattr__(cls,name,value):
+		if isinstance(cls.__dict__.get(name),_Setting):
+			cls._values[name] = value
+		else:
+			super().__setattr__(name,value)
+
+
+class Config(metaclass=_ConfigType):       #This class is created to centralize all the settings required for this project.
+	PROFILES = {     #Built-in environment profiles. A .env.<name> file can add to them or define new ones.
+		"offline":{"API_BASE_URL":"local://"},     #Tests and tools talk to the local stand-in server.
+	}
+	_values = {}     #Setting name -> cached value.
+	_env = None     #The merged environment, built on first use.
+	_profile = None     #Profile chosen with use_profile. None means CONFIG_PROFILE decides.
+	_active_profile = ""     #The profile the cached environment was built with.
 
-class Config:       #This class is created to centralize all the settings required for this project.
 	# Default API: jsonplaceholder.typicode.com (public test API; reqres.in was switched due to Cloudflare 403 blocking automated requests)
-	BASE_URL = os.getenv("API_BASE_URL","https://jsonplaceholder.typicode.com") #Sets the base url as API_BASE_URL as first priority. If API_BASE_URL is empty then it uses this default.
-	REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT","10"))  #Sets how long to wait for the API response. If the REQUEST_TIMEOUT is not available then request timeout defaults to 10.
-	LOG_LEVEL = os.getenv("LOG_LEVEL","INFO")   #When the project runs, this decides the ammount of information provided about the status of the operation in real time. Defaults to INFO level if LOG_LEVEL is empty.
-	LOG_FILE_PATH = os.getenv("LOG_FILE_PATH","logs/automation.log")      #This sets where the logging information is stored. Defaults to logs/automation.log is LOG_FILE_PATH has nothing.
-	TEST_DATA_DIR = os.getenv("TEST_DATA_DIR","data")        #Place where the test files are kept to test automation.
+	BASE_URL = _Setting("API_BASE_URL","https://jsonplaceholder.typicode.com") #Sets the base url as API_BASE_URL as first priority. If API_BASE_URL is empty then it uses this default.
+	REQUEST_TIMEOUT = _Setting("REQUEST_TIMEOUT","10",int)  #Sets how long to wait for the API response. If the REQUEST_TIMEOUT is not available then request timeout defaults to 10.
+	LOG_LEVEL = _Setting("LOG_LEVEL","INFO")   #When the project runs, this decides the ammount of information provided about the status of the operation in real time. Defaults to INFO level if LOG_LEVEL is empty.
+	LOG_FILE_PATH = _Setting("LOG_FILE_PATH","logs/automation.log")      #This sets where the logging information is stored. Defaults to logs/automation.log is LOG_FILE_PATH has nothing.
+	TEST_DATA_DIR = _Setting("TEST_DATA_DIR","data")        #Place where the test files are kept to test automation.
+	LOG_QUEUED = _Setting("LOG_QUEUED","false",_flag)      #When true, logger calls only put the record on a queue and a background thread formats and writes it.
+	LOG_FORMAT = _Setting("LOG_FORMAT","text")      #"text" for the usual lines, "json" for one JSON object per line in the log file.
+	LOG_MAX_BYTES = _Setting("LOG_MAX_BYTES","0",int)      #Start a new log file once it reaches this size. 0 means no size based rotation.
+	LOG_ROTATE_WHEN = _Setting("LOG_ROTATE_WHEN","")      #Time based rotation, e.g. "midnight" or "H" (see logging.handlers.TimedRotatingFileHandler). Empty means off.
+	LOG_BACKUP_COUNT = _Setting("LOG_BACKUP_COUNT","5",int)      #How many rotated log files are kept.
+	LOG_RATE_LIMIT = _Setting("LOG_RATE_LIMIT","0",float)      #Most messages per second from one logging line (call site). 0 means no limit.
+	LOG_RATE_BURST = _Setting("LOG_RATE_BURST","20",int)      #How many messages one logging line may send in a burst before LOG_RATE_LIMIT applies.
+	JSON_DECODER = _Setting("JSON_DECODER","auto")      #What response.json() uses: "auto" (orjson when installed), "orjson" or "json" (the standard library).
+	POOL_SIZE = _Setting("POOL_SIZE","10",int)      #How many kept-alive connections the shared test client keeps per host.
+	POOL_BLOCK = _Setting("POOL_BLOCK","false",_flag)      #When true, threads wait for a free pooled connection instead of opening extra ones.
+	POOL_PREWARM = _Setting("POOL_PREWARM","0",int)      #Connections the shared test client opens at session start, so the first tests do not pay for handshakes.
+	KEEPALIVE_IDLE = _Setting("KEEPALIVE_IDLE","0",int)      #Seconds before TCP keep-alive probes start on idle pooled connections. 0 leaves it to the operating system.
+	LOCAL_SERVER_LATENCY = _Setting("LOCAL_SERVER_LATENCY","0",float)      #Seconds of delay the local stand-in server adds to every answer when API_BASE_URL is local://, record:// or replay://.
+	LOCAL_SERVER_ERROR_RATE = _Setting("LOCAL_SERVER_ERROR_RATE","0",float)      #Share of requests (0 to 1) the local stand-in server answers with a 503.
 
 	@classmethod				#For creating a method without creating an object. Provides a simpler way to access the setting.
 	def get_base_url(cls):		
@@ -28,6 +96,45 @@ class Config:       #This class is created to centralize all the settings requir
 	def get_timeout(cls):
 		return cls.REQUEST_TIMEOUT		#Objective of this method is to return the time out value.
 
+	@classmethod
+	def get_profile(cls):		#The active profile name, or "" when none is used.
+		cls._environment()
+		return cls._active_profile
+
+	@classmethod
+	def use_profile(cls,name):		#Switches to another profile ("" for none). Cached values and overrides are dropped.
+		cls._profile_file(name)
+		cls._profile = name
+		cls.reload()
+
+	@classmethod
+	def _profile_file(cls,name):		#The path of .env.<name>. Raises ValueError for a profile that is neither built in nor has a file.
+		path = os.path.join(PROJECT_ROOT,f".env.{name}")
+		if name and name not in cls.PROFILES and not os.path.isfile(path):
+			raise ValueError(f"Unknown config profile '{name}': expected one of {sorted(cls.PROFILES)} or a .env.{name} file")
+		return path
+
+	@classmethod
+	def reload(cls):		#Forgets every cached value and override, so the next use reads the environment again.
+		cls._values.clear()
+		cls._env = None
+
+	@classmethod
+	def _environment(cls):		#All variables in order of priority (see the top of this file). Built once.
+		env = cls._env
+		if env is None:
+			dotenv = _read_env_file(os.path.join(PROJECT_ROOT,".env"))
+			profile = cls._profile if cls._profile is not None else os.environ.get("CONFIG_PROFILE") or dotenv.get("CONFIG_PROFILE","")
+			env = dict(dotenv)
+			if profile:
+				profile_file = cls._profile_file(profile)
+				env.update(cls.PROFILES.get(profile,{}))
+				env.update(_read_env_file(profile_file))
+			env.update(os.environ)
+			cls._active_profile = profile
+			cls._env = env
+		return env
+
 
 
 
@@ -0,0 +1,144 @@
+"""
+Streaming data-driven runner for the automation framework.
+
+test_create_users_from_data_file loads the whole data file with json.load and posts
+the users one by one. That is fine for a handful of users, but not for files with
+hundreds of thousands of records. This file reads the records one at a time (from a
+JSON array or an NDJSON file), posts them with a pool of worker threads, writes one
+short result line per record and saves a checkpoint so an interrupted run can carry
+on where it stopped.
+"""
+
+
+import json																#For writing the results and the checkpoint.
+import os																#For building paths and replacing the checkpoint file safely.
+from concurrent.futures import FIRST_COMPLETED,ThreadPoolExecutor,wait	#The worker pool, and a way to wait until at least one worker is done.
+
+from src.api_client import APIClient,APIError
+from src.config import Config
+from src.json_stream import CHUNK_SIZE,iter_json_array,iter_ndjson		#The incremental JSON readers live in their own file because APIClient.iter_get uses them too.
+from src.utils import get_test_data_path
+
+
+def iter_records(path,chunk_size=CHUNK_SIZE):							#Yields the records of a data file. A file whose first character is '[' is read as a JSON array, anything else as NDJSON.
+	with open(path,'r',encoding='utf-8-sig') as f:						#utf-8-sig also skips a BOM at the start of the file if there is one.
+		first = ""
+		while True:
+			char = f.read(1)
+			if not char or not char.isspace():
+				first = char
+				break
+		f.seek(0)
+		if first == "[":
+			yield from iter_json_array(f,chunk_size)
+		else:
+			yield from iter_ndjson(f)
+
+
+def _post_record(client,path,record):									#Runs inside a worker thread. Posts one record and turns the outcome into a short result.
+	try:
+		response = client.post(path,json=record)
+	except APIError as e:
+		return {"status":e.status_code,"error":e.message[:200]}			#Keeping only the start of the message so the results file stays small.
+	result = {"status":response.status_code}
+	try:
+		created = response.json()
+	except ValueError:
+		return result
+	if isinstance(created,dict) and "id" in created:
+		result["id"] = created["id"]
+	return result
+
+
+class DataDrivenRunner:													#The class that posts every record of a data file and keeps track of the progress.
+	def __init__(self,client=None,path="users",workers=8,max_pending=None,results_file=None,checkpoint_file=None,checkpoint_every=100):
+		if workers < 1:
+			raise ValueError("workers must be at least 1")
+		self.client = client or APIClient()
+		self.path = path												#The API path every record is posted to.
+		self.workers = workers
+		self.max_pending = max_pending or workers * 4					#Backpressure: we stop reading the file while this many records are waiting or in flight.
+		self.results_file = results_file
+		self.checkpoint_file = checkpoint_file
+		self.checkpoint_every = checkpoint_every
+		self.client.grow_pool(workers)									#At least one kept-alive connection per worker. A shared client keeps its pool options.
+
+	def _default_results_file(self,source):								#logs/<data file name>.results.ndjson, next to the log file.
+		log_dir = os.path.dirname(Config.LOG_FILE_PATH)
+		return os.path.join(log_dir,os.path.basename(source) + ".results.ndjson")
+
+	def _load_checkpoint(self,checkpoint_file,source):					#Returns the saved checkpoint for this data file, or None.
+		if not os.path.exists(checkpoint_file):
+			return None
+		with open(checkpoint_file,'r',encoding='utf-8') as f:
+			checkpoint = json.load(f)
+		if checkpoint.get("source") != source:
+			return None													#The checkpoint belongs to another data file.
+		return checkpoint
+
+	def _save_checkpoint(self,checkpoint_file,checkpoint):				#Writes to a temporary file first so a crash never leaves half a checkpoint behind.
+		tmp_file = checkpoint_file + ".tmp"
+		with open(tmp_file,'w',encoding='utf-8') as f:
+			json.dump(checkpoint,f)
+		os.replace(tmp_file,checkpoint_file)
+
+	def run(self,filename,resume=True):									#Posts every record of the data file and returns a summary dictionary.
+		source = os.path.abspath(get_test_data_path(filename))			#An absolute path is kept as it is, a bare file name is looked up in the test data folder.
+		results_file = self.results_file or self._default_results_file(source)
+		checkpoint_file = self.checkpoint_file or results_file + ".checkpoint"
+		results_dir = os.path.dirname(results_file)
+		if results_dir:
+			os.makedirs(results_dir,exist_ok=True)
+
+		checkpoint = self._load_checkpoint(checkpoint_file,source) if resume else None
+		start_index = checkpoint["next_index"] if checkpoint else 0
+		summary = {"source":source,"results_file":results_file,"resumed_from":start_index,"processed":0,"succeeded":0,"failed":0}
+
+		results = open(results_file,'r+' if checkpoint else 'w',encoding='utf-8')
+		if checkpoint:
+			results.seek(checkpoint["results_offset"])
+			results.truncate()											#Lines written after the last checkpoint are thrown away, those records are posted again.
+
+		next_index = start_index										#Index of the next record whose result must be written. Results are written in input order.
+		done = {}														#Results that finished early and are waiting for the ones before them.
+		pending = {}													#future -> record index
+
+		def flush_ready():												#Writes every result that is now next in line.
+			nonlocal next_index
+			while next_index in done:
+				result = done.pop(next_index)
+				result["index"] = next_index
+				results.write(json.dumps(result,separators=(",",":")) + "\n")
+				summary["processed"] += 1
+				if "error" not in result:
+					summary["succeeded"] += 1
+				else:
+					summary["failed"] += 1
+				next_index += 1
+				if summary["processed"] % self.checkpoint_every == 0:
+					results.flush()
+					self._save_checkpoint(checkpoint_file,{"source":source,"next_index":next_index,"results_offset":results.tell()})
+
+		def collect(return_when):										#Waits for running workers and stores their results.
+			finished,_ = wait(list(pending),return_when=return_when)
+			for future in finished:
+				done[pending.pop(future)] = future.result()
+			flush_ready()
+
+		try:
+			with ThreadPoolExecutor(max_workers=self.workers,thread_name_prefix="data-runner") as executor:
+				for index,record in enumerate(iter_records(source)):
+					if index < start_index:
+						continue											#Already posted in the interrupted run.
+					while len(pending) + len(done) >= self.max_pending:
+						collect(FIRST_COMPLETED)
+					pending[executor.submit(_post_record,self.client,self.path,record)] = index
+				while pending:
+					collect(FIRST_COMPLETED)
+		finally:
+			results.flush()
+			self._save_checkpoint(checkpoint_file,{"source":source,"next_index":next_index,"results_offset":results.tell()})
+			results.close()
+
+		os.remove(checkpoint_file)										#The run finished, so there is nothing left to resume.
+		return summary
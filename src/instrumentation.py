@@ -0,0 +1,186 @@
+"""
+Per-request timing instrumentation for APIClient.
+
+When a request hook is registered on a client (APIClient(request_hooks=[...]) or
+client.add_request_hook(...)), every attempt it sends is timed and the hook gets a
+RequestTiming: time to connect (TCP + TLS), time to first byte (after the
+connection is open, so it does not count the connect time again), download time,
+total time, bytes sent and received and whether a kept-alive connection was reused.
+TimingCollector is a ready-made hook that keeps the timings in memory and can
+summarise them per endpoint or per test and export them to JSON or CSV.
+Without hooks the client takes its normal path and nothing here runs.
+"""
+
+
+import csv													#For the CSV export.
+import json													#For the JSON export.
+import os													#For creating the export folder.
+import threading											#The connect time is passed from urllib3's connection to the client through a thread-local.
+import time													#For the timings.
+from urllib.parse import urlsplit							#For turning a URL into an endpoint name.
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection,HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool,HTTPSConnectionPool
+
+_state = threading.local()									#The request being timed on this thread (each thread sends one request at a time).
+
+FIELDS = ("test","method","endpoint","url","status","error","connect_s","ttfb_s","download_s","total_s","bytes_sent","bytes_received","reused")
+
+
+def _finished_connect(started):								#Called by the timed connections below.
+	if getattr(_state,"active",False):
+		_state.connect_s += time.perf_counter() - started
+		_state.connected = True
+
+
+class _TimedHTTPConnection(HTTPConnection):					#A normal urllib3 connection that reports how long connect() took.
+	def connect(self):
+		started = time.perf_counter()
+		super().connect()
+		_finished_connect(started)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):				#Same for HTTPS; connect() includes the TLS handshake.
+	def connect(self):
+		started = time.perf_counter()
+		super().connect()
+		_finished_connect(started)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+	ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+	ConnectionCls = _TimedHTTPSConnection
+
+
+class InstrumentedAdapter(HTTPAdapter):						#A requests adapter whose connections report their connect time. Mounted by APIClient when hooks are added.
+	def init_poolmanager(self,*args,**kwargs):
+		super().init_poolmanager(*args,**kwargs)
+		self.poolmanager.pool_classes_by_scheme = {"http":_TimedHTTPConnectionPool,"https":_TimedHTTPSConnectionPool}
+
+
+def endpoint_name(method,url):								#"GET http://x/users/2?a=1" -> "GET /users/{id}", so all user ids end up in one row.
+	path = urlsplit(url).path
+	parts = ["{id}" if part.isdigit() else part for part in path.split("/") if part]
+	return f"{method} /" + "/".join(parts)
+
+
+def _header_bytes(headers):									#Roughly how many bytes the header lines take on the wire.
+	return sum(len(name) + len(str(value)) + 4 for name,value in headers.items())
+
+
+class RequestTiming:										#The timings of one request attempt. All times are in seconds.
+	__slots__ = FIELDS
+
+	def __init__(self,**values):
+		for field in FIELDS:
+			setattr(self,field,values.get(field))
+
+	def to_dict(self):
+		return {field:getattr(self,field) for field in FIELDS}
+
+
+def timed_request(session,method,url,**kwargs):				#Sends one request through the session and returns (response, error, RequestTiming). Exactly one of response/error is None.
+	_state.active = True
+	_state.connect_s = 0.0
+	_state.connected = False
+	response = error = None
+	started = time.perf_counter()
+	try:
+		response = session.request(method,url,**kwargs)
+	except Exception as e:
+		error = e
+	finally:
+		_state.active = False
+	total = time.perf_counter() - started
+	timing = RequestTiming(method=method,endpoint=endpoint_name(method,url),url=url,total_s=total,
+						connect_s=_state.connect_s,error=type(error).__name__ if error is not None else None)
+	if response is not None:
+		timing.reused = not _state.connected					#No connect() during this request means a kept-alive connection was used.
+		ttfb = max(0.0,min(response.elapsed.total_seconds(),total) - timing.connect_s)	#requests measures from sending until the headers are parsed, which includes opening the connection. Taken out, so connect and TTFB never count the same time.
+		timing.status = response.status_code
+		timing.ttfb_s = ttfb
+		timing.download_s = max(0.0,total - timing.connect_s - ttfb) if response._content_consumed else 0.0		#A streamed body has not been downloaded yet.
+		request = response.request
+		if request is not None:
+			timing.bytes_sent = len(request.method) + len(request.url) + _header_bytes(request.headers) + len(request.body or b"")
+		received = _header_bytes(response.headers)
+		if response._content_consumed:
+			wire = response.raw.tell() if hasattr(response.raw,"tell") else 0		#Bytes read from the socket (still compressed).
+			received += wire or len(response.content or b"")
+		timing.bytes_received = received
+	return response,error,timing
+
+
+def _percentile(sorted_values,p):							#Nearest-rank percentile of an already sorted list.
+	if not sorted_values:
+		return None
+	index = max(0,-(-len(sorted_values) * p // 100) - 1)
+	return sorted_values[int(index)]
+
+
+class TimingCollector:										#Keeps every RequestTiming in memory. Use collector.record as a request hook.
+	def __init__(self):
+		self.timings = []									#list.append is thread-safe in CPython, so recording needs no lock.
+		self.current_test = None							#Set by the pytest plugin so every timing knows which test sent it.
+
+	def record(self,timing):
+		if timing.test is None:
+			timing.test = self.current_test
+		self.timings.append(timing)
+
+	def clear(self):
+		self.timings = []
+
+	def by_endpoint(self):									#Summary per endpoint, slowest (by total time spent) first.
+		groups = {}
+		for timing in self.timings:
+			groups.setdefault(timing.endpoint,[]).append(timing)
+		rows = []
+		for endpoint,timings in groups.items():
+			totals = sorted(t.total_s for t in timings)
+			rows.append({
+				"endpoint":endpoint,
+				"count":len(timings),
+				"total_s":sum(totals),
+				"mean_s":sum(totals) / len(totals),
+				"p50_s":_percentile(totals,50),
+				"p95_s":_percentile(totals,95),
+				"max_s":totals[-1],
+				"mean_connect_s":sum(t.connect_s or 0.0 for t in timings) / len(timings),
+				"mean_ttfb_s":sum(t.ttfb_s or 0.0 for t in timings) / len(timings),
+				"reused_pct":100.0 * sum(1 for t in timings if t.reused) / len(timings),
+				"bytes_received":sum(t.bytes_received or 0 for t in timings),
+			})
+		return sorted(rows,key=lambda row: row["total_s"],reverse=True)
+
+	def by_test(self):										#Time spent waiting for the API per test, slowest first.
+		groups = {}
+		for timing in self.timings:
+			row = groups.setdefault(timing.test or "<outside tests>",{"test":timing.test or "<outside tests>","requests":0,"total_s":0.0,"connect_s":0.0})
+			row["requests"] += 1
+			row["total_s"] += timing.total_s
+			row["connect_s"] += timing.connect_s or 0.0
+		return sorted(groups.values(),key=lambda row: row["total_s"],reverse=True)
+
+	def export_json(self,path):
+		_make_parent(path)
+		with open(path,'w',encoding='utf-8') as f:
+			json.dump({"timings":[t.to_dict() for t in self.timings],"endpoints":self.by_endpoint(),"tests":self.by_test()},f,indent=2)
+
+	def export_csv(self,path):
+		_make_parent(path)
+		with open(path,'w',encoding='utf-8',newline='') as f:
+			writer = csv.DictWriter(f,fieldnames=FIELDS)
+			writer.writeheader()
+			for timing in self.timings:
+				writer.writerow(timing.to_dict())
+
+
+def _make_parent(path):
+	folder = os.path.dirname(path)
+	if folder:
+		os.makedirs(folder,exist_ok=True)
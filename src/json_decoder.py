@@ -0,0 +1,63 @@
+"""
+Pluggable JSON decoder for APIClient responses.
+
+requests decodes response.json() with the standard json module. For big bodies
+(thousands of users) orjson is several times faster. APIClient(json_decoder=...)
+or JSON_DECODER in the .env picks the decoder used by response.json():
+	"auto"   orjson when it is installed, otherwise the standard json module (default)
+	"orjson" orjson, raises ImportError when it is not installed
+	"json"   the standard json module (requests' own response.json())
+or any function that turns the body into Python objects. It gets bytes, or str
+when the body is in a charset other than UTF-8.
+response.json(**kwargs) with keyword arguments (parse_int=Decimal, ...) always
+uses requests' own response.json(), because only the json module knows them.
+orjson is optional: pip install orjson.
+"""
+
+
+import functools										#For binding the decoder to a response and caching the orjson lookup.
+import importlib										#orjson is only imported when a client asks for a decoder.
+
+from src.lazy import lazy_import
+
+requests_exceptions = lazy_import("requests.exceptions")	#JSONDecodeError is what requests' own response.json() raises, so callers catch the same error either way.
+
+DECODERS = ("auto","orjson","json")
+
+
+@functools.lru_cache(maxsize=None)						#Looked up once.
+def load_orjson():										#Returns the orjson module, or None when it is not installed.
+	try:
+		return importlib.import_module("orjson")		#Optional fast decoder.
+	except ImportError:
+		return None
+
+
+def get_decoder(decoder="auto"):						#Returns the loads function for a decoder name, or None for requests' own response.json().
+	if callable(decoder):
+		return decoder
+	if decoder not in DECODERS:
+		raise ValueError(f"json_decoder must be one of {DECODERS} or a function, got {decoder!r}")
+	if decoder == "json":
+		return None
+	orjson = load_orjson()
+	if decoder == "orjson" and orjson is None:
+		raise ImportError("json_decoder='orjson' needs the orjson package (pip install orjson)")
+	return orjson.loads if orjson is not None else None
+
+
+def decode_response(response,loads,**kwargs):			#response.json() with our decoder. Bodies in a charset other than UTF-8 go through response.text first.
+	if kwargs:
+		return type(response).json(response,**kwargs)	#Options for the json module: requests' own response.json() honours them.
+	encoding = (response.encoding or "utf-8").lower().replace("_","-")
+	body = response.content if encoding in ("utf-8","utf8") else response.text
+	try:
+		return loads(body)
+	except ValueError as e:
+		raise requests_exceptions.JSONDecodeError(getattr(e,"msg",str(e)),getattr(e,"doc",""),getattr(e,"pos",0))
+
+
+def use_decoder(response,loads):						#Makes response.json() use loads. Does nothing when loads is None.
+	if loads is not None and response is not None:
+		response.json = functools.partial(decode_response,response,loads)
+	return response
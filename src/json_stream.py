@@ -0,0 +1,81 @@
+"""
+Incremental JSON readers for the automation framework.
+
+json.load needs the whole document in memory. These helpers read a JSON array (or
+newline-delimited JSON) from anything with a read() method, a chunk at a time, and
+yield the items one by one. The data runner uses them for big data files and
+APIClient.iter_get uses them to decode large responses straight from the socket.
+"""
+
+
+import json																#For decoding one item at a time.
+
+CHUNK_SIZE = 64 * 1024													#How many characters we read at a time.
+CUT_TAIL = 16															#A decode error this close to the end of the buffer may just be an item cut in half (e.g. "tru" of true).
+
+
+def _skip_whitespace(buf,pos):											#Returns the position of the first character after pos that is not whitespace.
+	while pos < len(buf) and buf[pos] in " \t\r\n":
+		pos += 1
+	return pos
+
+
+def _cut_off(buf,error):												#True when a decode error can be explained by the item running past the end of buf, so reading more may fix it.
+	return error.msg.startswith("Unterminated string") or len(buf) - error.pos <= CUT_TAIL
+
+
+def iter_json_array(f,chunk_size=CHUNK_SIZE):							#Yields the items of a JSON array one by one, never keeping more than about one chunk (plus one record) in memory.
+	decoder = json.JSONDecoder()
+	buf = f.read(chunk_size)
+	eof = not buf
+	offset = 0															#How many characters of the input were dropped from the front of buf, for error positions.
+	pos = _skip_whitespace(buf,0)
+	if pos >= len(buf) or buf[pos] != "[":
+		raise ValueError("Input does not start with a JSON array")
+	pos += 1
+	expecting = "first"													#"first": an item or "]", "item": an item, "separator": "," or "]".
+	while True:
+		pos = _skip_whitespace(buf,pos)
+		end = None
+		if pos < len(buf):
+			char = buf[pos]
+			if expecting == "separator":								#Exactly one comma between items, and none before "]".
+				if char == ",":
+					pos += 1
+					expecting = "item"
+					continue
+				if char == "]":
+					return
+				raise ValueError(f"Expected ',' or ']' at character {offset + pos}")
+			if char == "]" and expecting == "first":					#An empty array.
+				return
+			try:
+				item,end = decoder.raw_decode(buf,pos)
+			except json.JSONDecodeError as e:
+				if eof or not _cut_off(buf,e):							#A broken item in the middle of the input: reading on would only keep the rest of the file in memory.
+					raise ValueError(f"Invalid JSON at character {offset + e.pos}: {e.msg}")
+			if end == len(buf) and not eof:
+				end = None												#A number like 12 could really be 123 in the next chunk, so we read more before trusting it.
+		if end is not None:
+			yield item
+			pos = end
+			expecting = "separator"
+			continue
+		if eof:
+			raise ValueError("Input ended before the JSON array was closed")
+		more = f.read(chunk_size)										#Dropping what we already used and reading the next chunk.
+		eof = not more
+		offset += pos
+		buf = buf[pos:] + more
+		pos = 0
+
+
+def iter_ndjson(f):														#Yields one record per non-empty line (newline-delimited JSON).
+	for line_number,line in enumerate(f,start=1):
+		line = line.strip()
+		if not line:
+			continue
+		try:
+			yield json.loads(line)
+		except ValueError as e:
+			raise ValueError(f"Invalid JSON on line {line_number}: {e}")
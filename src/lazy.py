@@ -0,0 +1,39 @@
+"""
+Lazy imports for the automation framework.
+
+requests (with urllib3, charset_normalizer and certifi) takes longer to import than
+the rest of the framework together. Modules that only need it once a request is
+actually sent write
+
+	requests = lazy_import("requests")
+
+at the top instead of "import requests". Nothing is imported until the first
+attribute is used (requests.Session(), requests.RequestException, ...), so
+importing src.api_client for APIError or a short CLI call like --help stays fast.
+"""
+
+
+import importlib										#For importing the real module on first use.
+
+
+class LazyModule:										#Stands in for a module and imports it the first time one of its attributes is used.
+	def __init__(self,name):
+		self._name = name
+		self._module = None
+
+	def _load(self):
+		module = self._module
+		if module is None:
+			module = self._module = importlib.import_module(self._name)		#Python's import lock makes this safe when several threads get here first.
+		return module
+
+	def __getattr__(self,attribute):					#Only called for attributes this object does not have itself, i.e. the module's.
+		return getattr(self._load(),attribute)
+
+	def __repr__(self):
+		state = "loaded" if self._module is not None else "not loaded yet"
+		return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name):									#Returns a stand-in for the module called name. The import happens on first attribute use.
+	return LazyModule(name)
@@ -0,0 +1,267 @@
+"""
+Load generator for the automation framework.
+
+Drives APIClient with a mix of "get users", "get users/{id}" and "post users"
+requests for a fixed time and reports latency percentiles, throughput per second
+and errors by status code.
+
+With --rps the requests are sent on a fixed schedule (open loop): request number i
+is due at start + i / rps whether or not earlier requests have finished, and its
+latency is measured from the moment it was due. If the API slows down and requests
+pile up, the waiting time shows up in the percentiles instead of being hidden.
+With --concurrency (and no --rps) N workers send requests back to back (closed loop).
+
+Run it from the project root, e.g.:
+	python -m src.loadgen --rps 50 --duration 30 --mix get_users=1,get_user=3,post_user=1 --output logs/load.json
+"""
+
+
+import argparse															#For reading the command line options.
+import itertools														#For cycling through the users in the data file.
+import json																#For saving the report.
+import os																#For creating the report folder.
+import random															#For picking the next operation from the mix.
+import threading														#The results are recorded from many worker threads.
+import time																#For the schedule and the latency measurements.
+from concurrent.futures import ThreadPoolExecutor						#The workers that send the requests.
+
+from src.api_client import APIClient,APIError
+from src.config import Config
+from src.data_runner import iter_records
+from src.utils import get_test_data_path
+
+OPERATIONS = ("get_users","get_user","post_user")						#What a scenario can be made of.
+DEFAULT_MIX = {"get_users":1,"get_user":3,"post_user":1}
+PERCENTILES = (50,90,99,99.9)
+
+
+class LatencyHistogram:													#HDR-style histogram: values are rounded to about 1% and counted, so memory does not grow with the number of requests.
+	SUB_BUCKETS = 128													#Values below 128 us are exact; above, every power of two is split into 128 buckets (<1% error).
+
+	def __init__(self):
+		self.counts = {}												#bucket lower bound in microseconds -> count
+		self.total = 0
+		self.min = None
+		self.max = None
+
+	def _bucket(self,value):
+		if value < self.SUB_BUCKETS:
+			return value
+		shift = value.bit_length() - self.SUB_BUCKETS.bit_length()
+		return (value >> shift) << shift
+
+	def record(self,seconds):											#Adds one latency, given in seconds.
+		value = max(0,int(seconds * 1e6))
+		bucket = self._bucket(value)
+		self.counts[bucket] = self.counts.get(bucket,0) + 1
+		self.total += 1
+		self.min = value if self.min is None else min(self.min,value)
+		self.max = value if self.max is None else max(self.max,value)
+
+	def merge(self,other):												#Adds the counts of another histogram to this one.
+		for bucket,count in other.counts.items():
+			self.counts[bucket] = self.counts.get(bucket,0) + count
+		self.total += other.total
+		if other.total:
+			self.min = other.min if self.min is None else min(self.min,other.min)
+			self.max = other.max if self.max is None else max(self.max,other.max)
+
+	def percentile(self,p):												#Latency in milliseconds that p percent of the values are at or below.
+		if not self.total:
+			return None
+		target = max(1,-(-self.total * p // 100))						#Rank of the value we want (rounded up).
+		seen = 0
+		for bucket in sorted(self.counts):
+			seen += self.counts[bucket]
+			if seen >= target:
+				return (self.max if seen == self.total else bucket) / 1000.0	#The last bucket is reported as the exact maximum.
+		return self.max / 1000.0
+
+	def to_dict(self):													#Summary and raw buckets, so two runs can be compared later.
+		return {
+			"count":self.total,
+			"min_ms":None if self.min is None else self.min / 1000.0,
+			"max_ms":None if self.max is None else self.max / 1000.0,
+			"percentiles_ms":{f"p{p:g}":self.percentile(p) for p in PERCENTILES},
+			"buckets_us":{str(bucket):count for bucket,count in sorted(self.counts.items())},
+		}
+
+
+def parse_mix(text):													#"get_users=1,get_user=3" -> {"get_users":1,"get_user":3}
+	mix = {}
+	for part in text.split(","):
+		name,_,weight = part.strip().partition("=")
+		if name not in OPERATIONS:
+			raise ValueError(f"Unknown operation '{name}', expected one of {OPERATIONS}")
+		mix[name] = float(weight or 1)
+	if not any(weight > 0 for weight in mix.values()):
+		raise ValueError("At least one operation needs a weight above 0")
+	return mix
+
+
+class LoadRecorder:														#Collects the outcome of every request. Shared by all worker threads.
+	def __init__(self,start):
+		self.start = start
+		self.overall = LatencyHistogram()
+		self.by_operation = {}											#operation -> LatencyHistogram
+		self.per_second = {}											#second since start -> {"ok","errors"}
+		self.errors = {}												#"404", "503", "network" -> count
+		self._lock = threading.Lock()
+
+	def record(self,operation,latency,finished_at,error=None):			#error is None for a success, otherwise the key it is counted under.
+		second = int(finished_at - self.start)
+		with self._lock:
+			self.overall.record(latency)
+			self.by_operation.setdefault(operation,LatencyHistogram()).record(latency)
+			slot = self.per_second.setdefault(second,{"ok":0,"errors":0})
+			if error is None:
+				slot["ok"] += 1
+			else:
+				slot["errors"] += 1
+				self.errors[error] = self.errors.get(error,0) + 1
+
+
+class LoadGenerator:													#The class that runs one load scenario.
+	def __init__(self,client=None,mix=None,rps=None,concurrency=10,duration=10.0,data_file="users_to_create.json",user_ids=range(1,11),seed=None):
+		if rps is not None and rps <= 0:
+			raise ValueError("rps must be above 0")
+		if concurrency < 1:
+			raise ValueError("concurrency must be at least 1")
+		self.client = client or APIClient()
+		self.mix = mix or dict(DEFAULT_MIX)
+		self.rps = rps													#Requests per second for the open-loop mode. None means closed loop.
+		self.concurrency = concurrency									#Worker threads (the most requests in flight at once).
+		self.duration = duration
+		self.data_file = data_file										#Users for post_user, read from the data folder.
+		self.user_ids = list(user_ids)									#Ids used by get_user.
+		self._random = random.Random(seed)
+		self._random_lock = threading.Lock()
+		self.client.grow_pool(concurrency)								#At least one kept-alive connection per worker. A shared client keeps its pool options.
+		payloads = list(iter_records(get_test_data_path(data_file))) if "post_user" in self.mix else []
+		self._payloads = itertools.cycle(payloads) if payloads else None
+		self._payload_lock = threading.Lock()
+
+	def _pick(self):													#Chooses the next operation according to the weights.
+		names = list(self.mix)
+		with self._random_lock:
+			name = self._random.choices(names,weights=[self.mix[n] for n in names])[0]
+			user_id = self._random.choice(self.user_ids)
+		return name,user_id
+
+	def _call(self,operation,user_id):									#Sends one request. Raises APIError on failure.
+		if operation == "get_users":
+			return self.client.get("users")
+		if operation == "get_user":
+			return self.client.get(f"users/{user_id}")
+		if self._payloads is None:
+			raise ValueError(f"No users found in {self.data_file} for post_user")
+		with self._payload_lock:
+			payload = next(self._payloads)
+		return self.client.post("users",json=payload)
+
+	def _run_one(self,recorder,due):									#Runs in a worker: sends one request and records its latency from the moment it was due.
+		operation,user_id = self._pick()
+		error = None
+		try:
+			self._call(operation,user_id)
+		except APIError as e:
+			error = str(e.status_code) if e.status_code is not None else "network"		#Errors are broken down by APIError.status_code.
+		except Exception as e:
+			error = type(e).__name__									#Anything else is counted too instead of stopping the run.
+		finished = time.perf_counter()
+		recorder.record(operation,finished - due,finished,error)
+
+	def _open_loop(self,executor,recorder,start):						#Submits request i at start + i / rps, no matter how many are still running.
+		interval = 1.0 / self.rps
+		i = 0
+		while True:
+			due = start + i * interval
+			if due - start >= self.duration:
+				break
+			delay = due - time.perf_counter()
+			if delay > 0:
+				time.sleep(delay)
+			executor.submit(self._run_one,recorder,due)					#Futures are not kept: a long run would pile up millions of them.
+			i += 1
+		return []
+
+	def _closed_loop(self,executor,recorder,start):						#Every worker sends its next request as soon as the last one is done.
+		def worker():
+			while time.perf_counter() - start < self.duration:
+				self._run_one(recorder,time.perf_counter())
+		return [executor.submit(worker) for _ in range(self.concurrency)]
+
+	def run(self):														#Runs the scenario and returns the report dictionary.
+		start = time.perf_counter()
+		recorder = LoadRecorder(start)
+		with ThreadPoolExecutor(max_workers=self.concurrency,thread_name_prefix="loadgen") as executor:
+			if self.rps is not None:
+				futures = self._open_loop(executor,recorder,start)
+			else:
+				futures = self._closed_loop(executor,recorder,start)
+			for future in futures:
+				future.result()											#Waits for the closed-loop workers (the executor waits for open-loop requests).
+		elapsed = time.perf_counter() - start
+		return self._report(recorder,elapsed)
+
+	def _report(self,recorder,elapsed):
+		completed = recorder.overall.total
+		return {
+			"config":{"base_url":self.client.base_url,"mode":"open" if self.rps is not None else "closed","rps":self.rps,
+					"concurrency":self.concurrency,"duration":self.duration,"mix":self.mix,"data_file":self.data_file},
+			"elapsed_s":elapsed,
+			"requests":completed,
+			"throughput_rps":completed / elapsed if elapsed else 0.0,
+			"errors":dict(sorted(recorder.errors.items())),
+			"latency":recorder.overall.to_dict(),
+			"latency_by_operation":{name:histogram.to_dict() for name,histogram in sorted(recorder.by_operation.items())},
+			"throughput_over_time":[dict(second=second,**counts) for second,counts in sorted(recorder.per_second.items())],
+		}
+
+
+def format_report(report):												#A short text version of the report for the console.
+	latency = report["latency"]["percentiles_ms"]
+	lines = [
+		f"{report['requests']} requests in {report['elapsed_s']:.1f}s ({report['throughput_rps']:.1f} req/s, {report['config']['mode']} loop)",
+		"latency ms: " + "  ".join(f"{name}={value:.2f}" for name,value in latency.items() if value is not None),
+		"errors: " + (", ".join(f"{status}={count}" for status,count in report["errors"].items()) or "none"),
+	]
+	return "\n".join(lines)
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Drive sustained load through APIClient and report latency percentiles.")
+	parser.add_argument("--base-url",help="API base URL (defaults to Config.BASE_URL); local:// and replay://<cassette> use the local stand-in server")
+	parser.add_argument("--rps",type=float,help="target requests per second (open loop); without it the run is closed loop")
+	parser.add_argument("--concurrency",type=int,default=10,help="worker threads / most requests in flight (default 10)")
+	parser.add_argument("--duration",type=float,default=10.0,help="seconds to run (default 10)")
+	parser.add_argument("--mix",type=parse_mix,default=dict(DEFAULT_MIX),help="weights, e.g. get_users=1,get_user=3,post_user=1")
+	parser.add_argument("--data-file",default="users_to_create.json",help="users for post_user, looked up in the test data folder")
+	parser.add_argument("--seed",type=int,help="random seed for the operation mix")
+	parser.add_argument("--output",help="write the JSON report to this file")
+	args = parser.parse_args(argv)
+
+	from src.local_server import server_from_base_url					#Imported here: http.server is only needed for local://, record:// and replay:// runs, not for --help.
+	base_url = args.base_url or Config.get_base_url()
+	server = server_from_base_url(base_url,latency=Config.LOCAL_SERVER_LATENCY,error_rate=Config.LOCAL_SERVER_ERROR_RATE)
+	if server is not None:
+		base_url = server.start().base_url
+	try:
+		generator = LoadGenerator(client=APIClient(base_url=base_url),mix=args.mix,rps=args.rps,concurrency=args.concurrency,
+								duration=args.duration,data_file=args.data_file,seed=args.seed)
+		report = generator.run()
+	finally:
+		if server is not None:
+			server.stop()
+	print(format_report(report))
+	if args.output:
+		folder = os.path.dirname(args.output)
+		if folder:
+			os.makedirs(folder,exist_ok=True)
+		with open(args.output,'w',encoding='utf-8') as f:
+			json.dump(report,f,indent=2)
+	return report
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,311 @@
+"""
+Local stand-in HTTP server for the automation framework.
+
+This file starts a small in-process HTTP server that answers the same /users
+endpoints as jsonplaceholder.typicode.com. It lets us run tests and benchmarks
+without internet access, so the numbers we measure are about our own client and
+not about the network.
+
+Latency and random errors can be injected to see how the client copes.
+RecordingAPIServer forwards every request to the real API and saves the answers
+in a cassette file, and ReplayAPIServer plays that cassette back later. Setting
+API_BASE_URL to local://, record://<cassette> or replay://<cassette> makes the test
+suite start one of these servers instead of going to the internet (see
+server_from_base_url and tests/conftest.py).
+"""
+
+
+import hashlib									#For making ETags out of the response bodies.
+import json										#For turning Python objects into JSON text and back.
+import os										#For creating the folder of a cassette file.
+import random									#For injecting errors at a configurable rate.
+import threading								#For running the server in the background while the tests run.
+import time										#For adding an artificial delay to every response.
+from http.server import BaseHTTPRequestHandler,ThreadingHTTPServer		#In-built classes for writing a small HTTP server that handles every connection in its own thread.
+from urllib.parse import parse_qs,urlencode,urlsplit		#For reading the pagination parameters, building Link headers and reading local:// style base URLs.
+
+from src.lazy import lazy_import
+
+requests = lazy_import("requests")				#RecordingAPIServer forwards requests to the real API. Only imported when recording.
+
+DEFAULT_UPSTREAM = "https://jsonplaceholder.typicode.com"		#The real API that RecordingAPIServer forwards to.
+RECORDED_HEADERS = ("Content-Type","ETag","Last-Modified","Link","X-Total-Count","Retry-After")		#Response headers worth keeping in a cassette.
+
+
+def default_users():							#This method returns the seed users the server starts with (same shape as jsonplaceholder users).
+	return [
+		{"id":i,"name":f"User {i}","username":f"user{i}","email":f"user{i}@example.com"}
+		for i in range(1,11)					#jsonplaceholder has 10 users, so I am seeding the same number.
+	]
+
+
+class _StandInHandler(BaseHTTPRequestHandler):		#The class that decides what to answer for every request.
+	protocol_version = "HTTP/1.1"					#HTTP/1.1 keeps the connection open so the client can reuse it (just like a real API).
+	disable_nagle_algorithm = True					#Headers and body are written separately. Without this, small answers wait ~40 ms for a delayed TCP ACK.
+
+	def log_message(self,format,*args):				#Overriding this method so that the server does not print a line for every request.
+		pass
+
+	def _send_json(self,status,body,extra_headers=None):		#Helper that sends a JSON body with the right headers.
+		payload = json.dumps(body).encode("utf-8")	#Converting the body into bytes.
+		etag = None
+		if self.command == "GET" and status == 200:
+			etag = '"' + hashlib.sha1(payload).hexdigest() + '"'		#Same body, same ETag, so clients can revalidate their cached copy.
+			if self.headers.get("If-None-Match") == etag:
+				self.send_response(304)								#Not Modified: the client's copy is still good, so no body is sent.
+				self.send_header("ETag",etag)
+				self.send_header("Content-Length","0")
+				self.end_headers()
+				return
+		self.send_response(status)
+		self.send_header("Content-Type","application/json; charset=utf-8")
+		self.send_header("Content-Length",str(len(payload)))		#Content-Length is needed so keep-alive connections know where the body ends.
+		if etag:
+			self.send_header("ETag",etag)
+		for name,value in (extra_headers or {}).items():
+			self.send_header(name,value)
+		self.end_headers()
+		self.wfile.write(payload)
+
+	def _query(self):								#Returns the query string as a dictionary with one value per name.
+		query = self.path.split("?",1)[1] if "?" in self.path else ""
+		return {name:values[-1] for name,values in parse_qs(query).items()}
+
+	def _paginate(self,items):						#json-server style paging, like jsonplaceholder: _page/_limit (with a Link header) or _start/_end/_limit.
+		query = self._query()
+		try:
+			if "_page" in query:
+				page = max(1,int(query["_page"]))
+				limit = int(query.get("_limit",10))
+				headers = {"X-Total-Count":str(len(items))}
+				if page * limit < len(items):
+					next_query = urlencode(dict(query,_page=page + 1))
+					headers["Link"] = f'<{self.server.base_url}{self.path.split("?",1)[0]}?{next_query}>; rel="next"'
+				return items[(page - 1) * limit:page * limit],headers
+			if "_start" in query or "_end" in query:
+				start = int(query.get("_start",0))
+				end = int(query["_end"]) if "_end" in query else start + int(query.get("_limit",len(items)))
+				return items[start:end],{"X-Total-Count":str(len(items))}
+			if "_limit" in query:
+				return items[:int(query["_limit"])],{}
+		except ValueError:
+			pass												#jsonplaceholder ignores parameters it cannot read.
+		return items,{}
+
+	def _path_parts(self):							#Splits '/users/2?x=1' into ['users','2'].
+		path = self.path.split("?",1)[0]
+		return [part for part in path.split("/") if part]
+
+	def send_raw(self,status,headers,body):			#Sends an already prepared answer (used by the record and replay servers).
+		self.send_response(status)
+		for name,value in headers.items():
+			self.send_header(name,value)
+		self.send_header("Content-Length",str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def serve_users(self,raw):						#The stand-in /users API.
+		parts = self._path_parts()
+		if self.command == "GET":
+			if parts == ["users"]:
+				users,headers = self._paginate(self.server.users)
+				return self._send_json(200,users,headers)
+			if len(parts) == 2 and parts[0] == "users":
+				user = self.server.find_user(parts[1])
+				if user is not None:
+					return self._send_json(200,user)
+			return self._send_json(404,{})			#jsonplaceholder answers 404 with an empty object for unknown resources.
+		if parts != ["users"]:
+			return self._send_json(404,{})
+		try:
+			body = json.loads(raw or b"{}")
+		except ValueError:
+			return self._send_json(400,{"error":"invalid JSON"})
+		if isinstance(body,list):								#A bulk create: one created user per item, in the same order.
+			if not self.server.bulk:
+				return self._send_json(400,{"error":"expected a JSON object"})
+			if self.server.bulk == "object":				#What jsonplaceholder does: the whole array is stored as one object.
+				return self._send_json(201,self.server.create_user(dict(enumerate(body))))
+			return self._send_json(201,[self.server.create_user(item) for item in body])
+		self._send_json(201,self.server.create_user(body))		#201 Created, same as jsonplaceholder.
+
+	def _handle(self):								#Every request goes through here: count it, wait, maybe fail on purpose, then let the server answer.
+		length = int(self.headers.get("Content-Length") or 0)		#Reading how many bytes the client sent.
+		raw = self.rfile.read(length) if length else b""
+		self.server.count_request()
+		self.server.wait()							#Simulating the network/server time.
+		if self.server.should_fail():
+			return self._send_json(self.server.error_status,{"error":"injected by LocalAPIServer"})
+		self.server.dispatch(self,raw)
+
+	def do_GET(self):								#Handles GET requests.
+		self._handle()
+
+	def do_POST(self):								#Handles POST requests.
+		self._handle()
+
+
+class LocalAPIServer(ThreadingHTTPServer):			#The server itself. It keeps the users in memory.
+	daemon_threads = True							#Request threads should not keep Python alive after the tests finish.
+
+	def __init__(self,host="127.0.0.1",port=0,latency=0.0,users=None,error_rate=0.0,error_status=503,seed=None,bulk=False):	#port=0 lets the operating system pick a free port. latency is in seconds. error_rate is the share of requests (0 to 1) answered with error_status. bulk=True accepts a JSON array on POST /users and creates one user per item, bulk="object" stores the array as one user like jsonplaceholder does.
+		super().__init__((host,port),_StandInHandler)
+		self.latency = latency
+		self.error_rate = error_rate
+		self.error_status = error_status
+		self.bulk = bulk
+		self._random = random.Random(seed)			#A seed makes the injected errors happen on the same requests every run.
+		self._random_lock = threading.Lock()
+		self.users = list(users) if users is not None else default_users()
+		self._next_id = len(self.users) + 1			#jsonplaceholder always answers POST /users with id 11.
+		self.request_count = 0						#How many requests reached the server. Handy for checking caches.
+		self._count_lock = threading.Lock()
+		self._thread = None
+
+	@property
+	def base_url(self):								#The URL that should be given to APIClient(base_url=...).
+		host,port = self.server_address[:2]
+		return f"http://{host}:{port}"
+
+	def count_request(self):						#Request threads run at the same time, so the counter is locked.
+		with self._count_lock:
+			self.request_count += 1
+
+	def wait(self):									#Sleeps for the configured latency.
+		if self.latency:
+			time.sleep(self.latency)
+
+	def should_fail(self):							#True for about error_rate of the requests.
+		if not self.error_rate:
+			return False
+		with self._random_lock:
+			return self._random.random() < self.error_rate
+
+	def dispatch(self,handler,raw):					#Answers one request. The record and replay servers answer differently.
+		handler.serve_users(raw)
+
+	def find_user(self,user_id):					#Returns the user with this id, or None.
+		for user in self.users:
+			if str(user.get("id")) == user_id:
+				return user
+		return None
+
+	def create_user(self,body):						#Returns the submitted body with an id added, like jsonplaceholder does.
+		return dict(body,id=self._next_id)
+
+	def start(self):								#Starts serving in a background thread and returns the server.
+		self._thread = threading.Thread(target=self.serve_forever,kwargs={"poll_interval":0.05},daemon=True)		#A short poll interval makes stop() return quickly.
+		self._thread.start()
+		return self
+
+	def stop(self):									#Stops the background thread and closes the listening socket.
+		self.shutdown()
+		self.server_close()
+		if self._thread is not None:
+			self._thread.join()
+			self._thread = None
+
+	def __enter__(self):
+		return self.start()
+
+	def __exit__(self,*exc_info):
+		self.stop()
+
+
+def _request_key(method,path,raw):					#What a recorded request is matched on: method, path with sorted query and (for JSON) the normalised body.
+	base,_,query = path.partition("?")
+	key = method + " " + base.rstrip("/")
+	if query:
+		key += "?" + urlencode(sorted(parse_qs(query,keep_blank_values=True).items()),doseq=True)
+	if raw:
+		try:
+			key += " " + json.dumps(json.loads(raw),sort_keys=True,separators=(",",":"))
+		except ValueError:
+			key += " " + raw.decode("utf-8","replace")
+	return key
+
+
+class RecordingAPIServer(LocalAPIServer):			#Forwards every request to the real API and remembers the answers in a cassette file.
+	def __init__(self,cassette,upstream=DEFAULT_UPSTREAM,timeout=10,**kwargs):
+		super().__init__(**kwargs)
+		self.cassette = cassette
+		self.upstream = upstream.rstrip("/")
+		self.timeout = timeout
+		self._session = requests.Session()
+		self._interactions = []
+		self._record_lock = threading.Lock()
+
+	def dispatch(self,handler,raw):
+		forwarded = {name:handler.headers[name] for name in ("Content-Type","Accept","User-Agent") if handler.headers.get(name)}
+		try:
+			upstream_response = self._session.request(handler.command,self.upstream + handler.path,data=raw or None,headers=forwarded,timeout=self.timeout)
+		except requests.RequestException as e:
+			return handler._send_json(502,{"error":f"upstream request failed: {e}"})		#Not recorded, so a replay never serves a network hiccup.
+		headers = {name:upstream_response.headers[name] for name in RECORDED_HEADERS if name in upstream_response.headers}
+		text = upstream_response.content.decode("utf-8","replace")
+		with self._record_lock:
+			self._interactions.append({
+				"request":{"method":handler.command,"path":handler.path,"body":raw.decode("utf-8","replace")},
+				"response":{"status":upstream_response.status_code,"headers":headers,"body":text},
+			})
+		headers = {name:value.replace(self.upstream,self.base_url) for name,value in headers.items()}		#Link headers must point back at us, not at the real API.
+		handler.send_raw(upstream_response.status_code,headers,text.encode("utf-8"))
+
+	def save(self):									#Writes the cassette file.
+		folder = os.path.dirname(self.cassette)
+		if folder:
+			os.makedirs(folder,exist_ok=True)
+		with self._record_lock:
+			cassette = {"upstream":self.upstream,"interactions":list(self._interactions)}
+		with open(self.cassette,'w',encoding='utf-8') as f:
+			json.dump(cassette,f,indent=2)
+
+	def stop(self):
+		super().stop()
+		self.save()
+		self._session.close()
+
+
+class ReplayAPIServer(LocalAPIServer):				#Answers from a cassette file recorded by RecordingAPIServer. Nothing goes to the internet.
+	def __init__(self,cassette,**kwargs):
+		super().__init__(**kwargs)
+		with open(cassette,'r',encoding='utf-8') as f:
+			data = json.load(f)
+		self.upstream = data.get("upstream",DEFAULT_UPSTREAM)
+		self._recordings = {}						#request key -> list of answers, in the order they were recorded.
+		for interaction in data["interactions"]:
+			request = interaction["request"]
+			key = _request_key(request["method"],request["path"],request["body"].encode("utf-8"))
+			self._recordings.setdefault(key,[]).append(interaction["response"])
+		self._positions = {}
+		self._replay_lock = threading.Lock()
+
+	def dispatch(self,handler,raw):
+		key = _request_key(handler.command,handler.path,raw)
+		with self._replay_lock:
+			answers = self._recordings.get(key)
+			if not answers:
+				answer = None
+			else:
+				position = self._positions.get(key,0)
+				answer = answers[min(position,len(answers) - 1)]		#Same request again: next recorded answer, and the last one once we run out.
+				self._positions[key] = position + 1
+		if answer is None:
+			return handler._send_json(501,{"error":f"no recording for {key}"})		#Makes a missing recording obvious instead of pretending it is a 404.
+		headers = {name:value.replace(self.upstream,self.base_url) for name,value in answer["headers"].items()}
+		handler.send_raw(answer["status"],headers,answer["body"].encode("utf-8"))
+
+
+def server_from_base_url(base_url,latency=0.0,error_rate=0.0):		#Returns a (not yet started) server for local://, record://<cassette> and replay://<cassette> base URLs, or None for a normal URL.
+	parts = urlsplit(base_url or "")
+	cassette = (parts.netloc + parts.path) or None					#record://cassettes/users.json -> cassettes/users.json
+	options = {"latency":latency,"error_rate":error_rate}
+	if parts.scheme == "local":
+		return LocalAPIServer(**options)
+	if parts.scheme in ("record","replay") and not cassette:
+		raise ValueError(f"{base_url} needs a cassette path, e.g. {parts.scheme}://cassettes/users.json")
+	if parts.scheme == "record":
+		return RecordingAPIServer(cassette,**options)
+	if parts.scheme == "replay":
+		return ReplayAPIServer(cassette,**options)
+	return None
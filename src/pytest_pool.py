@@ -0,0 +1,45 @@
+"""
+Pytest plugin that reports how many connection handshakes the shared client pool saved.
+
+tests/conftest.py hands every test the shared client from src/client_registry.py
+and calls record_pool_stats when the session ends. This plugin prints the totals in
+the terminal summary. Under pytest-xdist every worker sends its numbers to the main
+process, which adds them up, so the report covers all workers.
+"""
+
+
+import pytest				#For the hook markers.
+
+_stats = []					#Pool stats of this process, plus those sent by xdist workers.
+
+
+def record_pool_stats(stats):								#Called with client_registry.connection_stats() before the shared clients are closed.
+	_stats.append(stats)
+
+
+@pytest.hookimpl(trylast=True)								#After the session fixtures (and so record_pool_stats) have been torn down.
+def pytest_sessionfinish(session):
+	workeroutput = getattr(session.config,"workeroutput",None)		#Only set inside an xdist worker.
+	if workeroutput is not None:
+		workeroutput["api_pool_stats"] = list(_stats)
+
+
+@pytest.hookimpl(optionalhook=True)							#Only exists when pytest-xdist is installed.
+def pytest_testnodedown(node,error):
+	_stats.extend(getattr(node,"workeroutput",{}).get("api_pool_stats",[]))
+
+
+def pytest_terminal_summary(terminalreporter,exitstatus,config):
+	if getattr(config,"workeroutput",None) is not None or not _stats:
+		return
+	totals = {"clients":0,"requests":0,"connections":0,"handshakes_saved":0}
+	for stats in _stats:
+		for name in totals:
+			totals[name] += stats.get(name,0)
+	if not totals["requests"]:
+		return
+	terminalreporter.section("API connection pool")
+	terminalreporter.write_line(
+		f"{totals['requests']} requests over {totals['connections']} connections from {totals['clients']} shared client(s): "
+		f"{totals['handshakes_saved']} TCP/TLS handshakes saved"
+	)
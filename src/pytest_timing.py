@@ -0,0 +1,75 @@
+"""
+Pytest plugin that reports the slowest API endpoints and tests.
+
+Enabled with --api-timing (or by asking for an export with --api-timing-json /
+--api-timing-csv). It registers a TimingCollector as a default request hook, so
+every APIClient created during the session is timed, remembers which test sent each
+request and prints two tables at the end of the run. Without the options nothing is
+registered and the clients take their normal, untimed path.
+tests/conftest.py loads it.
+"""
+
+
+from src.api_client import APIClient
+from src.instrumentation import TimingCollector
+
+_collector = None											#The collector of the running session, None when the plugin is off.
+
+
+def pytest_addoption(parser):
+	group = parser.getgroup("api-timing","per-request API timings")
+	group.addoption("--api-timing",action="store_true",help="time every APIClient request and print the slowest endpoints and tests")
+	group.addoption("--api-timing-json",metavar="PATH",help="also save the raw timings and summaries as JSON (implies --api-timing)")
+	group.addoption("--api-timing-csv",metavar="PATH",help="also save the raw timings as CSV (implies --api-timing)")
+	group.addoption("--api-timing-top",type=int,default=10,metavar="N",help="rows per table (default 10)")
+
+
+def get_collector():										#The running session's collector (None when the plugin is off).
+	return _collector
+
+
+def pytest_configure(config):
+	global _collector
+	option = config.option
+	if option.api_timing or option.api_timing_json or option.api_timing_csv:
+		_collector = TimingCollector()
+		APIClient.default_request_hooks.append(_collector.record)
+
+
+def pytest_unconfigure(config):
+	global _collector
+	if _collector is not None:
+		APIClient.default_request_hooks.remove(_collector.record)
+		_collector = None
+
+
+def pytest_runtest_setup(item):								#From here until teardown, timings belong to this test.
+	if _collector is not None:
+		_collector.current_test = item.nodeid
+
+
+def pytest_runtest_logfinish(nodeid,location):
+	if _collector is not None:
+		_collector.current_test = None
+
+
+def pytest_terminal_summary(terminalreporter,exitstatus,config):
+	if _collector is None:
+		return
+	top = config.option.api_timing_top
+	write = terminalreporter.write_line
+	terminalreporter.section("slowest API endpoints")
+	write(f"{'endpoint':<40} {'count':>6} {'total s':>9} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'connect ms':>11} {'reused':>7}")
+	for row in _collector.by_endpoint()[:top]:
+		write(f"{row['endpoint'][:40]:<40} {row['count']:>6} {row['total_s']:>9.3f} {row['p50_s'] * 1000:>8.1f} {row['p95_s'] * 1000:>8.1f} "
+			f"{row['max_s'] * 1000:>8.1f} {row['mean_connect_s'] * 1000:>11.1f} {row['reused_pct']:>6.0f}%")
+	terminalreporter.section("slowest tests by API time")
+	write(f"{'test':<70} {'requests':>9} {'total s':>9} {'connect s':>10}")
+	for row in _collector.by_test()[:top]:
+		write(f"{row['test'][-70:]:<70} {row['requests']:>9} {row['total_s']:>9.3f} {row['connect_s']:>10.3f}")
+	if config.option.api_timing_json:
+		_collector.export_json(config.option.api_timing_json)
+		write(f"API timings saved to {config.option.api_timing_json}")
+	if config.option.api_timing_csv:
+		_collector.export_csv(config.option.api_timing_csv)
+		write(f"API timings saved to {config.option.api_timing_csv}")
@@ -0,0 +1,117 @@
+"""
+Retry and circuit breaker helpers for the automation framework.
+
+RetryPolicy decides if a failed request should be sent again and how long to wait
+before doing so (exponential backoff with jitter, honouring Retry-After).
+CircuitBreaker remembers which hosts keep failing and makes APIClient fail fast for
+those hosts for a while, instead of letting every worker wait for the full timeout.
+Both are handed to APIClient(retry_policy=..., circuit_breaker=...).
+"""
+
+
+import random											#For adding jitter to the backoff so that workers do not all retry at the same moment.
+import threading										#The client can be shared by worker threads, so the counters need a lock.
+import time												#For measuring how long a circuit has been open and for sleeping between retries.
+from email.utils import parsedate_to_datetime			#Retry-After can be an HTTP date instead of a number of seconds.
+
+IDEMPOTENT_METHODS = frozenset({"GET","HEAD","OPTIONS","PUT","DELETE"})		#Methods that are safe to send twice.
+
+
+class RetryPolicy:																	#The class that decides "if" and "when" to retry.
+	def __init__(self,max_retries=3,backoff_factor=0.5,max_backoff=30.0,jitter=True,
+			retry_statuses=(429,502,503,504),retry_budget=None,sleep=time.sleep):
+		self.max_retries = max_retries												#How many times one request may be retried.
+		self.backoff_factor = backoff_factor										#First wait in seconds. It doubles on every retry.
+		self.max_backoff = max_backoff												#Waits (also from Retry-After) are never longer than this.
+		self.jitter = jitter														#"Full jitter": wait a random time between 0 and the backoff.
+		self.retry_statuses = frozenset(retry_statuses)								#Status codes that mean "try again later".
+		self.retry_budget = retry_budget											#Total number of retries the client may spend over its lifetime. None means no limit.
+		self.sleep = sleep															#Replaceable so tests do not have to really wait.
+		self._lock = threading.Lock()
+		self._budget_used = 0
+
+	def is_retryable(self,method,response=None,error=None,force=False):			#True when this outcome is worth another attempt. force=True allows non-idempotent methods (e.g. POST) to be retried.
+		if method.upper() not in IDEMPOTENT_METHODS and not force:
+			return False
+		if error is not None:
+			return True																#Connection errors, resets and timeouts.
+		return response is not None and response.status_code in self.retry_statuses
+
+	def take_budget(self):															#Uses one retry from the total budget. Returns False when it is used up.
+		with self._lock:
+			if self.retry_budget is not None and self._budget_used >= self.retry_budget:
+				return False
+			self._budget_used += 1
+			return True
+
+	def backoff(self,attempt,response=None):										#How many seconds to wait before retry number attempt (starting at 1).
+		retry_after = self._retry_after(response)
+		if retry_after is not None:
+			return min(retry_after,self.max_backoff)								#The server told us how long to wait, so we trust it.
+		delay = min(self.backoff_factor * (2 ** (attempt - 1)),self.max_backoff)
+		if self.jitter:
+			delay = random.uniform(0,delay)
+		return delay
+
+	def _retry_after(self,response):												#Reads the Retry-After header (seconds or HTTP date). Returns None if there is none.
+		if response is None:
+			return None
+		value = response.headers.get("Retry-After")
+		if not value:
+			return None
+		value = value.strip()
+		if value.isdigit():
+			return float(value)
+		try:
+			retry_at = parsedate_to_datetime(value)
+		except (TypeError,ValueError):
+			return None
+		return max(0.0,retry_at.timestamp() - time.time())
+
+
+class CircuitBreaker:																#The class that stops sending requests to a host that keeps failing.
+	CLOSED = "closed"																#Everything is fine, requests go through.
+	OPEN = "open"																	#The host is failing, requests fail straight away.
+	HALF_OPEN = "half_open"															#The wait is over, one trial request is allowed through (another one recovery_timeout later if it never finishes).
+
+	def __init__(self,failure_threshold=5,recovery_timeout=30.0,clock=time.monotonic):
+		self.failure_threshold = failure_threshold									#Failures in a row that open the circuit.
+		self.recovery_timeout = recovery_timeout									#Seconds the circuit stays open before a trial request.
+		self.clock = clock
+		self._lock = threading.Lock()
+		self._hosts = {}															#host -> {"state","failures","opened_at"}
+
+	def _host(self,host):
+		return self._hosts.setdefault(host,{"state":self.CLOSED,"failures":0,"opened_at":0.0})
+
+	def state(self,host):															#Returns the current state of the circuit for this host.
+		with self._lock:
+			return self._host(host)["state"]
+
+	def allow(self,host):															#True if a request to this host may be sent now.
+		with self._lock:
+			entry = self._host(host)
+			if entry["state"] == self.CLOSED:
+				return True
+			now = self.clock()
+			if now - entry["opened_at"] >= self.recovery_timeout:						#OPEN: the wait is over. HALF_OPEN: the trial never reported back (e.g. a hook raised), so another one may go.
+				entry["state"] = self.HALF_OPEN										#Only the first caller after the wait gets the trial request.
+				entry["opened_at"] = now
+				return True
+			return False
+
+	def record_success(self,host):
+		with self._lock:
+			entry = self._host(host)
+			entry["state"] = self.CLOSED
+			entry["failures"] = 0
+
+	def record_failure(self,host):													#Returns True if this failure opened the circuit.
+		with self._lock:
+			entry = self._host(host)
+			entry["failures"] += 1
+			if entry["state"] == self.HALF_OPEN or (entry["state"] == self.CLOSED and entry["failures"] >= self.failure_threshold):
+				entry["state"] = self.OPEN
+				entry["opened_at"] = self.clock()
+				return True
+			return False
@@ -0,0 +1,211 @@
+"""
+Response cache for APIClient.get.
+
+The suites ask for the same users and users/{id} again and again. ResponseCache keeps
+successful GET responses in memory (least recently used entries are dropped first
+when the byte limit is reached) and can also save them in a folder on disk so that
+several pytest processes share them (the folder has its own byte limit; the least
+recently used files are deleted first). A fresh entry is answered without touching the
+network; a stale one is revalidated with If-None-Match/If-Modified-Since, so a 304
+answer only costs a few header bytes. Pass it as APIClient(cache=ResponseCache()).
+"""
+
+
+import base64											#Bodies are bytes, JSON can only hold text.
+import json												#For saving entries on disk.
+import os												#For the disk folder and atomic file replacement.
+import threading										#The same client (and cache) can be used by several threads.
+import time												#For the time-to-live checks.
+from collections import OrderedDict						#Keeps the entries in "least recently used first" order.
+from urllib.parse import urlencode						#For putting the query parameters into the key.
+
+from src.lazy import lazy_import
+
+requests = lazy_import("requests")						#For rebuilding requests.Response objects from cached entries (only needed once something was cached).
+hashlib = lazy_import("hashlib")						#For turning a cache key into a safe file name (only needed with disk_dir).
+
+
+def make_key(url,params=None):											#URL plus sorted query parameters, so {'a':1,'b':2} and {'b':2,'a':1} hit the same entry.
+	if not params:
+		return url
+	items = params.items() if isinstance(params,dict) else params
+	return url + "?" + urlencode(sorted((str(k),str(v)) for k,v in items))
+
+
+class CacheEntry:														#One cached response.
+	def __init__(self,url,status_code,headers,content,encoding,stored_at):
+		self.url = url
+		self.status_code = status_code
+		self.headers = dict(headers)
+		self.content = content
+		self.encoding = encoding
+		self.stored_at = stored_at										#time.time() when the answer was stored or last revalidated (wall clock so other processes can compare it).
+
+	@classmethod
+	def from_response(cls,response):
+		return cls(response.url,response.status_code,response.headers,response.content,response.encoding,time.time())
+
+	@property
+	def size(self):														#Roughly how many bytes this entry uses (body plus headers).
+		return len(self.content) + sum(len(k) + len(v) for k,v in self.headers.items())
+
+	def is_fresh(self,ttl):
+		return time.time() - self.stored_at < ttl
+
+	def validators(self):												#Headers for a conditional request. Empty if the server gave us nothing to revalidate with.
+		headers = {}
+		if self.headers.get("ETag"):
+			headers["If-None-Match"] = self.headers["ETag"]
+		if self.headers.get("Last-Modified"):
+			headers["If-Modified-Since"] = self.headers["Last-Modified"]
+		return headers
+
+	def to_response(self):												#Builds a requests.Response that looks like the original one.
+		response = requests.Response()
+		response.status_code = self.status_code
+		response.headers = requests.structures.CaseInsensitiveDict(self.headers)
+		response._content = self.content
+		response.encoding = self.encoding
+		response.url = self.url
+		response.from_cache = True										#Lets tests and reports tell cached answers apart.
+		return response
+
+	def to_json(self):
+		return {"url":self.url,"status_code":self.status_code,"headers":self.headers,"encoding":self.encoding,
+				"stored_at":self.stored_at,"content":base64.b64encode(self.content).decode("ascii")}
+
+	@classmethod
+	def from_json(cls,data):
+		return cls(data["url"],data["status_code"],data["headers"],base64.b64decode(data["content"]),data["encoding"],data["stored_at"])
+
+
+class ResponseCache:													#The class that stores and looks up GET responses.
+	def __init__(self,max_bytes=16 * 1024 * 1024,ttl=60.0,disk_dir=None,disk_max_bytes=64 * 1024 * 1024):
+		self.max_bytes = max_bytes										#Memory limit for all entries together.
+		self.ttl = ttl													#Seconds an entry is used without asking the server.
+		self.disk_dir = disk_dir										#Optional folder shared with other processes. None keeps everything in memory.
+		self.disk_max_bytes = disk_max_bytes							#Limit for the files in disk_dir, checked across runs and processes.
+		self._entries = OrderedDict()									#key -> CacheEntry, least recently used first.
+		self._bytes = 0
+		self._lock = threading.Lock()
+		self._disk_lock = threading.Lock()								#Separate, so file work never holds up memory lookups.
+		self._disk_bytes = 0											#Our estimate of the folder size: a full scan only happens when it goes over the limit.
+		self.stats = {"hits":0,"misses":0,"revalidated":0,"stores":0,"evictions":0,"disk_hits":0,"disk_evictions":0}
+		if disk_dir:
+			os.makedirs(disk_dir,exist_ok=True)
+			self._prune_disk()											#Files left by earlier runs count towards the limit too.
+
+	def _disk_path(self,key):
+		return os.path.join(self.disk_dir,hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+	def _read_disk(self,key):											#Returns the entry saved on disk, or None.
+		path = self._disk_path(key)
+		try:
+			with open(path,'r',encoding='utf-8') as f:
+				entry = CacheEntry.from_json(json.load(f))
+			os.utime(path)												#Marks the file as recently used, so pruning deletes it last.
+			return entry
+		except (OSError,ValueError,KeyError):
+			return None													#Missing, deleted by another process or half-written by an old version: treat as a miss.
+
+	def _prune_disk(self):												#Deletes the least recently used files until the folder is under disk_max_bytes again.
+		with self._disk_lock:
+			files = []
+			for item in os.scandir(self.disk_dir):
+				if item.name.endswith(".json"):							#Never another process's temporary file.
+					try:
+						info = item.stat()
+					except OSError:
+						continue
+					files.append((info.st_mtime,info.st_size,item.path))
+			total = sum(size for _,size,_ in files)
+			evicted = 0
+			for _,size,path in sorted(files):
+				if total <= self.disk_max_bytes:
+					break
+				try:
+					os.remove(path)
+				except OSError:
+					pass												#Already deleted by another process.
+				total -= size
+				evicted += 1
+			self._disk_bytes = total
+		with self._lock:
+			self.stats["disk_evictions"] += evicted
+
+	def _write_disk(self,key,entry):									#Writes to a temporary file first so other processes never read half an entry.
+		path = self._disk_path(key)
+		tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+		with open(tmp_path,'w',encoding='utf-8') as f:
+			json.dump(entry.to_json(),f)
+			written = f.tell()
+		os.replace(tmp_path,path)
+		with self._disk_lock:
+			self._disk_bytes += written
+			full = self._disk_bytes > self.disk_max_bytes
+		if full:
+			self._prune_disk()
+
+	def _put(self,key,entry):											#Stores in memory and drops the least recently used entries while we are over the limit. Call with the lock held.
+		old = self._entries.pop(key,None)
+		if old is not None:
+			self._bytes -= old.size
+		if entry.size > self.max_bytes:
+			return														#Bigger than the whole cache, not worth keeping.
+		self._entries[key] = entry
+		self._bytes += entry.size
+		while self._bytes > self.max_bytes:
+			_,evicted = self._entries.popitem(last=False)
+			self._bytes -= evicted.size
+			self.stats["evictions"] += 1
+
+	def lookup(self,key):												#Returns (entry, fresh). entry is None on a miss.
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is not None:
+				self._entries.move_to_end(key)							#Most recently used goes to the end.
+		if entry is None and self.disk_dir:
+			entry = self._read_disk(key)
+			if entry is not None:
+				with self._lock:
+					self.stats["disk_hits"] += 1
+					self._put(key,entry)
+		fresh = entry is not None and entry.is_fresh(self.ttl)
+		with self._lock:
+			self.stats["hits" if fresh else "misses"] += 1
+		return entry,fresh
+
+	def store(self,key,response):										#Saves a successful GET response (unless the server said no-store).
+		if response.status_code != 200 or "no-store" in response.headers.get("Cache-Control",""):
+			return
+		entry = CacheEntry.from_response(response)
+		with self._lock:
+			self._put(key,entry)
+			self.stats["stores"] += 1
+		if self.disk_dir:
+			self._write_disk(key,entry)
+
+	def revalidated(self,key,entry,not_modified):						#The server answered 304: our copy is good again. Returns the response to give back to the caller.
+		headers = dict(entry.headers)
+		for name in ("ETag","Last-Modified","Cache-Control","Date"):	#A 304 may carry updated validators.
+			if not_modified.headers.get(name):
+				headers[name] = not_modified.headers[name]
+		entry = CacheEntry(entry.url,entry.status_code,headers,entry.content,entry.encoding,time.time())	#A new entry: other threads may still be reading the old one.
+		with self._lock:
+			self._put(key,entry)
+			self.stats["revalidated"] += 1
+		if self.disk_dir:
+			self._write_disk(key,entry)
+		return entry.to_response()
+
+	def clear(self):													#Forgets everything kept in memory (the disk folder is left alone).
+		with self._lock:
+			self._entries.clear()
+			self._bytes = 0
+
+	@property
+	def size_bytes(self):
+		return self._bytes
+
+	def __len__(self):
+		return len(self._entries)
@@ -0,0 +1,138 @@
+"""
+Declarative response schemas for the automation framework.
+
+A Schema lists the keys a JSON object must have, the type of each key, keys that may
+be missing but must have the right type when present, and keys that must equal the
+payload we sent (e.g. the name of a user we just created). The schema is compiled
+once into a small Python function that checks a whole list in a single loop, so
+checking 10,000 users costs one pass instead of a separate assert per key per user.
+Only the items that fail that quick check are looked at again to build the messages,
+and every problem in the list is reported together in one SchemaError.
+
+	USER_SCHEMA.validate_many(response.json())
+	CREATED_USER_SCHEMA.validate(response.json(),expected=user_data)
+"""
+
+
+MAX_REPORTED = 20											#Problems spelled out in the SchemaError message; the rest are only counted.
+
+
+class SchemaError(AssertionError):							#An AssertionError, so pytest reports a failed schema like a failed assert.
+	def __init__(self,errors):
+		self.errors = list(errors)							#Every problem found, e.g. "[3] 'email': missing".
+		lines = self.errors[:MAX_REPORTED]
+		if len(self.errors) > MAX_REPORTED:
+			lines.append(f"... and {len(self.errors) - MAX_REPORTED} more")
+		super().__init__(f"{len(self.errors)} schema violation(s):\n  " + "\n  ".join(lines))
+
+
+class _Absent:												#The type of the placeholder an optional key gets when it is missing.
+	pass
+
+_ABSENT = _Absent()
+
+
+def _as_tuple(types):
+	return types if isinstance(types,tuple) else (types,)
+
+
+def _type_name(types):
+	if isinstance(types,tuple):
+		return " or ".join(t.__name__ for t in types)
+	return types.__name__
+
+
+class Schema:												#The class that describes one kind of JSON object and checks responses against it.
+	def __init__(self,fields,optional=None,match=(),name="object"):
+		self.fields = dict(fields)							#key -> type (or tuple of types, or None for "any type") that must be present. Types are exact, as json gives them: True is not an int.
+		self.optional = dict(optional or {})				#key -> type, only checked when the key is there.
+		self.match = tuple(match)							#Keys that must equal the expected payload passed to validate.
+		self.name = name
+		for key in self.match:
+			if key not in self.fields:
+				raise ValueError(f"match key '{key}' must also be a required field")
+		self._check = self._compile()						#Compiled once, used for every call.
+
+	def _compile(self):										#Builds the source of one function that returns the positions of every item that is not valid.
+		names = {"dict":dict,"type":type,"KeyError":KeyError,"_absent":_ABSENT}
+		conditions = ["type(item) is dict"]
+		for i,(key,types) in enumerate(self.fields.items()):
+			if types is None:
+				conditions.append(f"{key!r} in item")
+			elif isinstance(types,tuple):
+				names[f"_t{i}"] = types
+				conditions.append(f"type(item[{key!r}]) in _t{i}")			#A missing key raises KeyError, which marks the item as bad.
+			else:
+				names[f"_t{i}"] = types
+				conditions.append(f"type(item[{key!r}]) is _t{i}")
+		for i,(key,types) in enumerate(self.optional.items()):
+			names[f"_o{i}"] = _as_tuple(types) + (_Absent,)
+			conditions.append(f"type(item.get({key!r},_absent)) in _o{i}")
+		match_conditions = [f"item[{key!r}] == wanted[{key!r}]" for key in self.match]
+		defaults = ",".join(f"{name}={name}" for name in names)			#Everything is bound as a default argument, so the loop only reads fast local variables.
+		source = "\n".join([
+			f"def check(items,expected,{defaults}):",
+			"	bad = []",
+			"	if expected is None:",
+			"		for index,item in enumerate(items):",
+			"			try:",
+			f"				if {' and '.join(conditions)}:",
+			"					continue",
+			"			except KeyError:",
+			"				pass",
+			"			bad.append(index)",
+			"	else:",
+			"		for index,(item,wanted) in enumerate(zip(items,expected)):",
+			"			try:",
+			f"				if {' and '.join(conditions + match_conditions)}:",
+			"					continue",
+			"			except KeyError:",
+			"				pass",
+			"			bad.append(index)",
+			"	return bad",
+		])
+		namespace = dict(names)
+		exec(compile(source,f"<schema {self.name}>","exec"),namespace)		#Only our own key names and types go into the source.
+		return namespace["check"]
+
+	def errors(self,item,expected=None,prefix=""):			#Every problem with one item as a list of messages. The slow, detailed path.
+		if not isinstance(item,dict):
+			return [f"{prefix}expected a JSON object, got {type(item).__name__}"]
+		problems = []
+		for key,types in self.fields.items():
+			if key not in item:
+				problems.append(f"{prefix}{key!r}: missing")
+			elif types is not None and type(item[key]) not in _as_tuple(types):
+				problems.append(f"{prefix}{key!r}: expected {_type_name(types)}, got {type(item[key]).__name__}")
+		for key,types in self.optional.items():
+			if key in item and type(item[key]) not in _as_tuple(types):
+				problems.append(f"{prefix}{key!r}: expected {_type_name(types)}, got {type(item[key]).__name__}")
+		if expected is not None:
+			for key in self.match:
+				if key in item and item[key] != expected.get(key):
+					problems.append(f"{prefix}{key!r}: expected {expected.get(key)!r}, got {item[key]!r}")
+		return problems
+
+	def validate(self,item,expected=None):					#Raises SchemaError listing every problem with one object. expected is the payload the match keys are compared with.
+		if self._check((item,),None if expected is None else (expected,)):
+			raise SchemaError(self.errors(item,expected))
+		return item
+
+	def validate_many(self,items,expected=None):			#Checks a whole list in one pass and raises one SchemaError with every problem. expected, when given, is a list of payloads in the same order.
+		if not isinstance(items,list):
+			raise SchemaError([f"expected a JSON array of {self.name}, got {type(items).__name__}"])
+		if expected is not None and len(expected) != len(items):
+			raise SchemaError([f"expected {len(expected)} {self.name} item(s), got {len(items)}"])
+		bad = self._check(items,expected)
+		if bad:
+			problems = []
+			for index in bad:
+				problems.extend(self.errors(items[index],None if expected is None else expected[index],prefix=f"[{index}] "))
+			raise SchemaError(problems)
+		return items
+
+
+#Schemas used by the tests.
+
+USER_SCHEMA = Schema({"id":int,"name":str,"username":str,"email":str},name="user")
+CREATED_USER_SCHEMA = Schema({"id":int,"name":str,"username":str,"email":str},match=("name","username","email"),name="created user")
@@ -2,17 +2,94 @@
 
 This file is for logging set up and for storing helper functions.
 
+setup_logger can also log without blocking (queued=True): the calling thread only
+puts the record on a queue and a background thread formats it and writes it out.
+The log file can be rotated by size or time, written as JSON lines, and noisy
+logging lines can be rate limited.
+
 """
 
+import atexit	 #For flushing the queued log records when Python exits.
+import json		 #For the JSON-lines log format.
 import logging   #This allows for displaying whatever is happening.
+import logging.handlers	#QueueHandler/QueueListener and the rotating file handlers.
 import os		 #This is for creating paths and folders.
-import sys		 #For allowing for importing from the src folder.
-
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))		#This line is for enabling the import from src folder.
+import queue	 #The queue between the logging calls and the background writer.
+import threading #The rate limit filter is used from many threads.
+import time		 #For the rate limit.
 
 from src.config import Config
 
-def setup_logger(name=None,level=None,log_file=None):		#This method is for setting up a logger. It receives and uses 3 pieces of inputs. name - This will be the name of the logger, level - The level of innformation given for each log (DEBUG,INFO,WARNING,ERROR), log_file - this is the place where to write the log output.
+class JsonFormatter(logging.Formatter):		#Formats every record as one JSON object per line, so other tools can read the log file.
+	def format(self,record):
+		entry = {
+			"time":self.formatTime(record),
+			"logger":record.name,
+			"level":record.levelname,
+			"message":record.getMessage(),
+			"thread":record.threadName,
+		}
+		if record.exc_info:
+			entry["exception"] = self.formatException(record.exc_info)
+		return json.dumps(entry,ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):		#Lets each logging line (file + line number) send at most `rate` messages per second after a burst. Skipped messages are counted and mentioned in the next message that gets through.
+	def __init__(self,rate,burst=20):
+		super().__init__()
+		self.rate = rate
+		self.burst = burst
+		self._buckets = {}					#call site -> [tokens, last refill time, suppressed count]
+		self._lock = threading.Lock()
+
+	def filter(self,record):
+		key = (record.name,record.pathname,record.lineno)		#The call site, so f-string messages from one line count together.
+		now = time.monotonic()
+		with self._lock:
+			bucket = self._buckets.get(key)
+			if bucket is None:
+				bucket = self._buckets[key] = [float(self.burst),now,0]
+			bucket[0] = min(float(self.burst),bucket[0] + (now - bucket[1]) * self.rate)	#Refilling the tokens for the time that has passed.
+			bucket[1] = now
+			if bucket[0] < 1:
+				bucket[2] += 1
+				return False
+			bucket[0] -= 1
+			suppressed,bucket[2] = bucket[2],0
+		if suppressed:
+			record.msg = f"{record.msg} (suppressed {suppressed} similar messages)"
+		return True
+
+
+class _EnqueueOnlyHandler(logging.handlers.QueueHandler):	#The standard QueueHandler formats the message before queuing it. We skip that so the calling thread only does a put().
+	def prepare(self,record):
+		return record
+
+
+_listeners = {}								#logger name -> (QueueListener, the queue handler on the logger), so they can be stopped (and flushed) at exit.
+
+
+def shutdown_logger(name=None):				#Stops one logger's background writer after it has written everything still in the queue. The logger keeps working: its real handlers are attached to it again, so later messages are written by the calling thread.
+	logger = logging.getLogger(name or "automation")
+	entry = _listeners.pop(logger.name,None)
+	if entry is None:
+		return
+	listener,entry_handler = entry
+	listener.stop()
+	logger.removeHandler(entry_handler)
+	for handler in listener.handlers:
+		logger.addHandler(handler)
+
+
+def shutdown_logging():						#Stops the background writers of every queued logger (see shutdown_logger).
+	for name in list(_listeners):
+		shutdown_logger(name)
+
+
+atexit.register(shutdown_logging)
+
+
+def setup_logger(name=None,level=None,log_file=None,queued=None,log_format=None,max_bytes=None,rotate_when=None,backup_count=None,rate_limit=None):		#This method is for setting up a logger. name - This will be the name of the logger, level - The level of innformation given for each log (DEBUG,INFO,WARNING,ERROR), log_file - this is the place where to write the log output. The other inputs default to the LOG_* settings in Config (queued logging, "text"/"json" file format, size or time based rotation, messages per second per logging line).
 	
 	logger = logging.getLogger(name or "automation")		#Gets a logger using the logging.getLogger function. The name of the logger passed in the parameter is considered. If the name does not exist then it will default to the 'automation' logger.
 
@@ -21,6 +98,15 @@ def setup_logger(name=None,level=None,log_file=None):		#This method is for setti
 	if logger.handlers:	
 		return logger	#This if condition is in place to return the logger object if the logger is already initialized. This avoids logger to be initialized again and again.
 
+	queued = Config.LOG_QUEUED if queued is None else queued					#Reading the optional settings, falling back to Config.
+	log_format = log_format or Config.LOG_FORMAT
+	max_bytes = Config.LOG_MAX_BYTES if max_bytes is None else max_bytes
+	rotate_when = Config.LOG_ROTATE_WHEN if rotate_when is None else rotate_when
+	backup_count = Config.LOG_BACKUP_COUNT if backup_count is None else backup_count
+	rate_limit = Config.LOG_RATE_LIMIT if rate_limit is None else rate_limit
+
+	handlers = []								#The handlers that do the real work. They are attached to the logger directly, or to a background listener when queued.
+
 	formatter = logging.Formatter(	#Using the Formatter in-built function to design how the log messages are to be displayed. The variable formatter is the object created to hold that design for displaying the message.
 		"%(asctime)s - %(name)s - %(levelname)s - %(message)s"	#This is the format in which the log message is supposed to come out.
 	)
@@ -29,7 +115,7 @@ def setup_logger(name=None,level=None,log_file=None):		#This method is for setti
 
 	console_handler.setFormatter(formatter)		#Applying the format we created above to the console_handler so that messages appear in that format in the console.
 	
-	logger.addHandler(console_handler)			#This establishes the connection between the logger and the console_handler. In other words, I am telling the logger, when you create and log a message, I want you to send the same message to the console_handler so that the console_handler can display that message in the console.
+	handlers.append(console_handler)			#Collecting the console_handler. Below it is connected to the logger (or to the background listener) so that messages logged are sent to it and displayed in the console.
 
 	log_path = log_file or Config.LOG_FILE_PATH #log_path will get the path of the file where the logs are to be written. It will get it from log_file parameter passed in this method, failing which it will default to the LOG_FILE_PATH in the Config class in config.py.
 
@@ -38,11 +124,32 @@ def setup_logger(name=None,level=None,log_file=None):		#This method is for setti
 	if log_dir and not os.path.exists(log_dir): #This if condition is created to deal with a situation where there is no dedicated folder to contain the logging file.
 		os.makedirs(log_dir)					#If there is no folder for the logging file then a new folder will be created for that purpose.
 
-	file_handler = logging.FileHandler(log_path,encoding="utf-8")	#I created a second handler with the help of FileHandler in-built method in the logging library to write the logs inside the logging file at the log_path path in the form of utf-8. That file handler is stored inside file_handler variable.
+	if max_bytes:								#Size based rotation: automation.log becomes automation.log.1 once it is max_bytes big.
+		file_handler = logging.handlers.RotatingFileHandler(log_path,maxBytes=max_bytes,backupCount=backup_count,encoding="utf-8")
+	elif rotate_when:							#Time based rotation, e.g. a new file every midnight.
+		file_handler = logging.handlers.TimedRotatingFileHandler(log_path,when=rotate_when,backupCount=backup_count,encoding="utf-8")
+	else:
+		file_handler = logging.FileHandler(log_path,encoding="utf-8")	#I created a second handler with the help of FileHandler in-built method in the logging library to write the logs inside the logging file at the log_path path in the form of utf-8. That file handler is stored inside file_handler variable.
 
-	file_handler.setFormatter(formatter)		#I am applying the design I created inside the formatter we created earlier to the file_handler so that I can see the messages exactly like how it is designed in the formatter.
+	file_handler.setFormatter(JsonFormatter() if log_format == "json" else formatter)	#I am applying the design I created inside the formatter we created earlier (or one JSON object per line) to the file_handler.
 	
-	logger.addHandler(file_handler)				#This establishes the connection between the logger and the file_handler. In other words, I am telling the logger, when you create and log a message, I want you to send the same message to the file_handler so that the file_handler can store that message inside the logging file.
+	handlers.append(file_handler)				#Collecting the file_handler so that messages logged are also stored inside the logging file.
+
+	if queued:									#The logger gets one handler that only puts records on a queue; a background thread hands them to the real handlers.
+		log_queue = queue.SimpleQueue()
+		entry_handler = _EnqueueOnlyHandler(log_queue)
+		listener = logging.handlers.QueueListener(log_queue,*handlers,respect_handler_level=True)
+		listener.start()
+		_listeners[logger.name] = (listener,entry_handler)
+		entry_handlers = [entry_handler]
+	else:
+		entry_handlers = handlers				#The old way: the calling thread formats and writes every message itself.
+
+	if rate_limit:								#Checked on the logger itself, before any handler (or the queue) does any work.
+		logger.addFilter(RateLimitFilter(rate_limit,Config.LOG_RATE_BURST))
+
+	for handler in entry_handlers:
+		logger.addHandler(handler)				#This establishes the connection between the logger and its handlers, so every message logged is sent to them.
 
 	return logger								#This returns the logger.
 
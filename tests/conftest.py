@@ -0,0 +1,56 @@
+"""
+Shared pytest setup.
+
+If API_BASE_URL is local://, record://<cassette> or replay://<cassette>, a local
+stand-in server (src/local_server.py) is started once for the whole session and
+Config.BASE_URL is pointed at it, so every APIClient() in the tests talks to it
+instead of jsonplaceholder.typicode.com.
+
+Every test gets its API client from the shared registry (src/client_registry.py):
+one pooled client per base URL per process (and so per pytest-xdist worker),
+optionally pre-warmed with POOL_PREWARM connections and closed at the end.
+
+It also loads the API timing plugin (src/pytest_timing.py), run with --api-timing
+to see the slowest endpoints and tests at the end of the session, and the pool
+report plugin (src/pytest_pool.py).
+"""
+
+
+import pytest		#This is for running tests.
+import sys			#This is to find the src folder.
+import os			#This is for fixing and creating proper paths.
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))	#Adding the project root to Python's search path so "from src..." works.
+
+from src.client_registry import close_all,connection_stats,get_client,prewarm
+from src.config import Config
+from src.local_server import server_from_base_url
+
+pytest_plugins = ("src.pytest_timing","src.pytest_pool")			#The API timing and connection pool report plugins.
+
+
+@pytest.fixture(scope="session",autouse=True)
+def local_api_server():												#Starts the local server for the session when Config.BASE_URL asks for one.
+	server = server_from_base_url(Config.BASE_URL,latency=Config.LOCAL_SERVER_LATENCY,error_rate=Config.LOCAL_SERVER_ERROR_RATE)
+	if server is None:
+		yield None													#A normal URL: the tests talk to the real API.
+		return
+	original_base_url = Config.BASE_URL
+	server.start()
+	Config.BASE_URL = server.base_url
+	try:
+		yield server
+	finally:
+		Config.BASE_URL = original_base_url
+		server.stop()												#A recording server saves its cassette here.
+
+
+@pytest.fixture(scope="session",autouse=True)
+def shared_api_client(local_api_server):							#The pooled client every test shares. Depends on local_api_server so it points at the local server when one is used.
+	client = get_client()
+	if Config.POOL_PREWARM:
+		prewarm(client,Config.POOL_PREWARM)
+	yield client
+	from src.pytest_pool import record_pool_stats					#Imported here, after pytest has loaded the plugin, so pytest can still rewrite its asserts.
+	record_pool_stats(connection_stats())
+	close_all()
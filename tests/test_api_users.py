@@ -16,7 +16,9 @@ import os		#This is for fixing and creating proper paths.
 
 sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))	#I want the APIClient class from the src/api_client. That's why I am adding the project root to Python's search path.
 
-from src.api_client import APIClient,APIError		#I need the APIClient class and the custom error APIError here.
+from src.api_client import APIError					#I need the custom error APIError here.
+from src.client_registry import get_client			#Every test shares one pooled client instead of opening new connections.
+from src.schema import CREATED_USER_SCHEMA,USER_SCHEMA	#Compiled schemas that check every user in one pass.
 from src.utils import setup_logger					#For setting up logging.
 
 logger = setup_logger("api_tests")					#Setting up a logger here using the function setup_logger from utils.py.
@@ -24,8 +26,8 @@ logger = setup_logger("api_tests")					#Setting up a logger here using the funct
 class TestAPIUsers:														#This class groups all the user tests in one place.
 
 	def setup_method(self):												#Created a method what will start whenever the pytest will run a test.									
-		self.client = APIClient()										#A new client will be created when a test is run by pytest.
-		logger.info("Test setup: Created new APIClient instance")		#Logger object coming from utils.py will invoke it's .info function to display the message in the console and write that same message inside the logging file using the console_handler and file_handler respectively.
+		self.client = get_client()										#The shared client for the base URL, so kept-alive connections are reused between tests.
+		logger.info("Test setup: Using the shared APIClient instance")		#Logger object coming from utils.py will invoke it's .info function to display the message in the console and write that same message inside the logging file using the console_handler and file_handler respectively.
 
 	def test_get_all_users(self):										#This test is designed to get the list of all the users.
 		logger.info("Starting test: Get all users")						#This is to log and indicate the that the test to get all the users has started.
@@ -52,11 +54,7 @@ class TestAPIUsers:														#This class groups all the user tests in one pl
 		assert isinstance(data,list)									#This checks that the response is a list (array of users). 
 		assert len(data) > 0											#This checks that the list is not empty. 
 
-		for user in data:												#This is for iterating through each and every user inside the list.
-			assert "id" in user											#It checks if there is the key 'id' in the dictionary corresponding to the user in this iteration.
-			assert "email" in user										#It checks if there is the key 'email' in the dictionary corresponding to the user in this iteration.
-			assert "name" in user										#It checks if there is the key 'name' in the dictionary corresponding to the user in this iteration.
-			assert "username" in user									#It checks if there is the key 'username' in the dictionary corresponding to the user in this iteration. 
+		USER_SCHEMA.validate_many(data)									#Checks that every user has an int 'id' and str 'email', 'name' and 'username' in one pass, and lists every bad user at once.
 
 		logger.info(f"Test passed: Retrieved {len(data)} users")		#This logs the message stating that the retrieval of the user data was successful.
 		
@@ -84,10 +82,7 @@ class TestAPIUsers:														#This class groups all the user tests in one pl
 		
 
 
-		assert "id" in user, "User should have 'id' field"												#This checks if there is a key called 'id' in the user dictionary.
-		assert "email" in user, "User should have 'email' field"										#This checks if there is a key called 'email' in the user dictionary.
-		assert "name" in user, "User should have 'name' field"											#This checks if there is a key called 'name' in the user dictionary.
-		assert "username" in user, "User should have 'username' field"									#This checks if there is a key called 'username' in the user dictionary. 
+		USER_SCHEMA.validate(user)																		#This checks that the user has the 'id', 'email', 'name' and 'username' fields with the right types.
 
 		assert user["id"] == user_id, f"Expected user ID {user_id}, got {user['id']}"				#This checks if the user information extracted corresponds to the user ID number 2 or not. 
 		logger.info(f"Test passed: Retrieved user {user_id} - {user.get('name')}")					#This logs that the test has been passed and the user ID number 2 has been retrieved with its information. 
@@ -119,13 +114,7 @@ class TestAPIUsers:														#This class groups all the user tests in one pl
 
 
 
-		assert "name" in data,"Response should have 'name' field"														#This checks if there is a key called 'name' in the data dictionary.
-		assert "username" in data,"Response should have 'username' field"												#This checks if there is a key called 'username' in the data dictionary or not. 
-		assert "email" in data,"Response should have 'email' field"														#This checks if there is a key called 'email' in the data dictionary or not. 
-		assert "id" in data,"Response should have 'id' field"															#This checks if there is a key called 'id' in the data dictionary or not. 
-
-		assert data["name"] == user_data["name"],f"Expected name '{user_data['name']}', got '{data['name']}'"			#This checks if the user that we created is indeed the user we created or not. 
-		assert data["email"] == user_data["email"],f"Expected email '{user_data['email']}', got '{data['email']}'"		#This checks if the email of the user that we created is indeed the email of the user that we created or not. 
+		CREATED_USER_SCHEMA.validate(data,expected=user_data)															#This checks the 'id', 'name', 'username' and 'email' fields and that name, username and email are the ones we sent. Every mismatch is reported together.
 
 		logger.info(f"Test passed: Created user '{data['name']}' with ID {data['id']}")									#This logs the message that the test has been passed. 
 
@@ -0,0 +1,112 @@
+"""
+Test file for the AsyncAPIClient.
+
+These tests run against the local stand-in server (src/local_server.py), so they do
+not need internet access. They check that:
+  - get/post behave like APIClient.get/post
+  - get_many/post_many return results in input order
+  - a failing item comes back as an APIError without stopping the others
+  - get_many takes items from the input only as fast as the workers need them
+  - "async with" closes the client
+  - the APIClient options (retry policy, request hooks, ...) are passed on
+"""
+
+
+import asyncio		#For running the async client inside normal pytest tests.
+import pytest		#This is for running tests.
+import sys			#This is to find the src folder.
+import os			#This is for fixing and creating proper paths.
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))	#Adding the project root to Python's search path so "from src..." works.
+
+from src.api_client import APIError
+from src.async_api_client import AsyncAPIClient
+from src.instrumentation import TimingCollector
+from src.local_server import LocalAPIServer
+from src.resilience import RetryPolicy
+from src.utils import setup_logger
+
+logger = setup_logger("async_client_tests")
+
+class TestAsyncAPIClient:
+
+	def setup_method(self):												#A fresh local server for every test.
+		self.server = LocalAPIServer().start()
+		self.client = AsyncAPIClient(base_url=self.server.base_url,max_concurrency=5)
+		logger.info("Test setup: Started local server and AsyncAPIClient")
+
+	def teardown_method(self):
+		self.client.close()
+		self.server.stop()
+
+	def test_get_single_user(self):
+		response = asyncio.run(self.client.get("users/2"))
+		assert response.status_code == 200
+		assert response.json()["id"] == 2
+
+	def test_post_user(self):
+		user_data = {"name":"John Doe","username":"johndoe","email":"john.doe@example.com"}
+		response = asyncio.run(self.client.post("users",json=user_data))
+		assert response.status_code == 201
+		assert response.json()["email"] == user_data["email"]
+
+	def test_get_not_found_raises_api_error(self):
+		with pytest.raises(APIError) as error_info:
+			asyncio.run(self.client.get("users/99999"))
+		assert error_info.value.status_code == 404
+
+	def test_get_many_keeps_order_and_per_item_errors(self):
+		paths = ["users/3","users/99999","users/1","users/10"]
+		results = asyncio.run(self.client.get_many(paths))
+
+		assert len(results) == len(paths)
+		assert isinstance(results[1],APIError)							#The unknown user fails on its own...
+		assert results[1].status_code == 404
+		assert [results[i].json()["id"] for i in (0,2,3)] == [3,1,10]	#...and the others still succeed in input order.
+
+	def test_post_many_keeps_order(self):
+		payloads = [{"name":f"User {i}","username":f"user{i}","email":f"user{i}@example.com"} for i in range(20)]
+		results = asyncio.run(self.client.post_many("users",payloads))
+
+		assert [result.status_code for result in results] == [201] * len(payloads)
+		assert [result.json()["username"] for result in results] == [payload["username"] for payload in payloads]
+
+	def test_items_are_taken_only_when_a_worker_is_free(self):
+		ahead = []
+
+		def paths():													#Records how far the client got ahead of the requests that reached the server.
+			for i in range(30):
+				ahead.append(i - self.server.request_count)
+				yield f"users/{i % 10 + 1}"
+
+		results = asyncio.run(self.client.get_many(paths()))
+		assert [result.json()["id"] for result in results] == [i % 10 + 1 for i in range(30)]
+		assert max(ahead) < 5											#Never more than max_concurrency items taken but not yet sent.
+
+	def test_async_with_closes_the_client(self):
+		async def use_client():
+			async with AsyncAPIClient(base_url=self.server.base_url,max_concurrency=2) as client:
+				await client.get("users/1")
+			return client
+
+		client = asyncio.run(use_client())
+		with pytest.raises(RuntimeError):
+			client._executor.submit(print)								#The worker threads have been stopped.
+
+	def test_client_options_are_passed_on(self):
+		server = LocalAPIServer(error_rate=1.0).start()					#Every request fails with 503.
+		collector = TimingCollector()
+		client = AsyncAPIClient(base_url=server.base_url,retry_policy=RetryPolicy(max_retries=2,backoff_factor=0,jitter=False),request_hooks=[collector.record])
+		try:
+			with pytest.raises(APIError):
+				asyncio.run(client.post("users",json={"name":"Retried"},retry=True))
+			assert server.request_count == 3							#The first try plus two retries.
+			assert client.stats["retries"] == 2
+			assert len(collector.timings) == 3
+		finally:
+			client.close()
+			server.stop()
+
+	def test_max_concurrency_must_be_positive(self):
+		with pytest.raises(ValueError):
+			AsyncAPIClient(base_url=self.server.base_url,max_concurrency=0)
@@ -0,0 +1,95 @@
+"""
+Test file for the shared client registry (src/client_registry.py).
+
+These tests run against the local stand-in server (src/local_server.py), so they do
+not need internet access. They check that:
+  - get_client hands out one client per base URL
+  - prewarm opens the asked number of connections and later requests reuse them
+  - connection_stats counts the handshakes the pool saved
+  - the pool options (blocking pool, TCP keep-alive) reach the connections
+  - components handed a shared client keep its pool options and pre-warmed connections
+"""
+
+
+import socket		#For checking the keep-alive socket option.
+import pytest		#This is for running tests.
+import sys			#This is to find the src folder.
+import os			#This is for fixing and creating proper paths.
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))	#Adding the project root to Python's search path so "from src..." works.
+
+from src import client_registry
+from src.data_runner import DataDrivenRunner
+from src.local_server import LocalAPIServer
+from src.utils import setup_logger
+
+logger = setup_logger("client_registry_tests")
+
+class TestClientRegistry:
+
+	def setup_method(self):												#A fresh local server for every test, so its clients are not the session's shared one.
+		self.server = LocalAPIServer().start()
+		logger.info("Test setup: Started local server for the client registry")
+
+	def teardown_method(self):
+		client = client_registry._clients.pop(self.server.base_url,None)	#Only forget our own client; the session's shared client stays.
+		if client is not None:
+			client.session.close()
+		self.server.stop()
+
+	def test_same_client_for_same_base_url(self):
+		first = client_registry.get_client(self.server.base_url)
+		assert client_registry.get_client(self.server.base_url) is first
+		assert client_registry.get_client(self.server.base_url + "/other") is not first
+		client_registry._clients.pop(self.server.base_url + "/other").session.close()
+
+	def test_prewarm_opens_connections_that_are_reused(self):
+		client = client_registry.get_client(self.server.base_url,pool_size=4)
+		assert client_registry.prewarm(client,4) == 4
+		assert client.connection_stats()["connections"] == 4
+		for user_id in range(1,9):
+			assert client.get(f"users/{user_id}").status_code == 200
+		stats = client.connection_stats()
+		assert stats["connections"] == 4								#No new handshakes after pre-warming.
+		assert stats["requests"] == 12
+		assert stats["handshakes_saved"] == 8
+
+	def test_connection_stats_adds_up_shared_clients(self):
+		before = client_registry.connection_stats()
+		client = client_registry.get_client(self.server.base_url)
+		for _ in range(5):
+			client.get("users/1")
+		after = client_registry.connection_stats()
+		assert after["clients"] == before["clients"] + 1
+		assert after["requests"] - before["requests"] == 5
+		assert after["handshakes_saved"] - before["handshakes_saved"] == 4
+
+	def test_blocking_pool_and_keepalive_options(self):
+		client = client_registry.get_client(self.server.base_url,pool_size=2,pool_block=True,keepalive_idle=30)
+		client.get("users/1")
+		adapter = client.session.get_adapter(self.server.base_url)
+		pool = adapter.poolmanager.connection_from_url(self.server.base_url)
+		assert pool.block is True
+		assert pool.pool.maxsize == 2
+		connection = pool.pool.queue[-1]								#The kept-alive connection the request just returned.
+		assert connection.sock.getsockopt(socket.SOL_SOCKET,socket.SO_KEEPALIVE) == 1
+		if hasattr(socket,"TCP_KEEPIDLE"):
+			assert connection.sock.getsockopt(socket.IPPROTO_TCP,socket.TCP_KEEPIDLE) == 30
+
+	def test_prewarm_with_no_connections(self):
+		client = client_registry.get_client(self.server.base_url)
+		assert client_registry.prewarm(client,0) == 0
+		assert client.connection_stats()["connections"] == 0
+
+	def test_shared_client_keeps_its_pool_in_a_runner(self):
+		client = client_registry.get_client(self.server.base_url,pool_size=4,pool_block=True,keepalive_idle=30)
+		client_registry.prewarm(client,4)
+		adapter = client.session.get_adapter(self.server.base_url)
+		DataDrivenRunner(client=client,workers=2)						#Needs fewer connections than the pool has.
+		assert client.session.get_adapter(self.server.base_url) is adapter	#Same pool, pre-warmed connections kept.
+		DataDrivenRunner(client=client,workers=8)						#Needs more: the pool grows, the options stay.
+		assert client._pool_options == {"pool_size":8,"pool_block":True,"keepalive_idle":30}
+		client.set_pool_size(6)
+		assert client._pool_options == {"pool_size":6,"pool_block":True,"keepalive_idle":30}
+		client.set_pool_size(6,pool_block=False,keepalive_idle=0)			#Switched off on purpose.
+		assert client._pool_options == {"pool_size":6,"pool_block":False,"keepalive_idle":0}
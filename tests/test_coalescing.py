@@ -0,0 +1,179 @@
+"""
+Test file for GET coalescing and POST batching (src/coalescing.py).
+
+These tests run against the local stand-in server (src/local_server.py), so they do
+not need internet access. A small server latency keeps the first request in flight
+while the other threads arrive; server.request_count tells us how many requests
+really reached the network. They check that:
+  - concurrent identical GETs share one request, different ones do not
+  - every caller gets its own APIError when the shared request fails
+  - concurrent POSTs go out as one bulk request and every caller gets its own record
+  - an API without bulk support gets one POST per record
+  - an API that stores the array as one object never gets the records a second time
+  - clients for different servers sharing one batcher each reach their own server
+  - client.stats counts the requests saved
+"""
+
+
+import asyncio		#For the AsyncAPIClient pass-through test.
+import threading	#For sending requests from many threads at the same moment.
+import pytest		#This is for running tests.
+import sys			#This is to find the src folder.
+import os			#This is for fixing and creating proper paths.
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))	#Adding the project root to Python's search path so "from src..." works.
+
+from src.api_client import APIClient,APIError
+from src.async_api_client import AsyncAPIClient
+from src.coalescing import PostBatcher
+from src.local_server import LocalAPIServer
+
+
+def run_together(count,func):							#Calls func(i) on count threads released at the same moment. Returns the results (or exceptions) in order.
+	barrier = threading.Barrier(count)
+	results = [None] * count
+
+	def worker(i):
+		barrier.wait()
+		try:
+			results[i] = func(i)
+		except Exception as e:
+			results[i] = e
+
+	threads = [threading.Thread(target=worker,args=(i,)) for i in range(count)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	return results
+
+
+def payload(i):
+	return {"name":f"User {i}","username":f"user{i}","email":f"user{i}@example.com"}
+
+
+class TestGetCoalescing:
+
+	def setup_method(self):
+		self.server = LocalAPIServer(latency=0.2).start()
+		self.client = APIClient(base_url=self.server.base_url,coalesce_gets=True)
+		self.client.set_pool_size(20)
+
+	def teardown_method(self):
+		self.server.stop()
+
+	def test_concurrent_identical_gets_share_one_request(self):
+		responses = run_together(20,lambda i: self.client.get("users/1"))
+		assert self.server.request_count == 1
+		assert all(response.status_code == 200 and response.json()["id"] == 1 for response in responses)
+		assert self.client.stats["coalesced"] == 19
+		assert self.client.stats["requests_saved"] == 19
+
+	def test_different_requests_are_not_shared(self):
+		responses = run_together(6,lambda i: self.client.get(f"users/{i % 3 + 1}",params={"v":i % 2}))
+		assert self.server.request_count == 6
+		assert [response.json()["id"] for response in responses] == [1,2,3,1,2,3]
+		assert self.client.stats["coalesced"] == 0
+
+	def test_sequential_gets_are_sent_again(self):
+		self.client.get("users/1")
+		self.client.get("users/1")
+		assert self.server.request_count == 2
+
+	def test_every_caller_gets_its_own_error(self):
+		errors = run_together(5,lambda i: self.client.get("users/999"))
+		assert self.server.request_count == 1
+		assert all(isinstance(error,APIError) and error.status_code == 404 for error in errors)
+		assert len({id(error) for error in errors}) == 5
+
+
+class TestPostBatching:
+
+	def start(self,bulk=True,max_batch=50,error_rate=0.0):
+		self.server = LocalAPIServer(latency=0.05,bulk=bulk,error_rate=error_rate).start()
+		self.client = APIClient(base_url=self.server.base_url,post_batcher=PostBatcher(max_batch=max_batch,max_wait=0.2))
+		self.client.set_pool_size(20)
+
+	def teardown_method(self):
+		self.server.stop()
+
+	def test_concurrent_posts_go_out_as_one_request(self):
+		self.start()
+		responses = run_together(10,lambda i: self.client.post("users",json=payload(i)))
+		assert self.server.request_count == 1
+		for i,response in enumerate(responses):
+			assert response.status_code == 201
+			assert response.json() == dict(payload(i),id=11)
+		assert self.client.stats["bulk_requests"] == 1
+		assert self.client.stats["batched"] == 10
+		assert self.client.stats["requests_saved"] == 9
+
+	def test_batches_are_split_at_max_batch(self):
+		self.start(max_batch=4)
+		responses = run_together(10,lambda i: self.client.post("users",json=payload(i)))
+		assert self.server.request_count == 3								#4 + 4 + 2
+		assert sorted(response.json()["name"] for response in responses) == sorted(payload(i)["name"] for i in range(10))
+		assert self.client.stats["requests_saved"] == 7
+
+	def test_falls_back_to_one_post_per_record(self):
+		self.start(bulk=False)
+		responses = run_together(5,lambda i: self.client.post("users",json=payload(i)))
+		assert self.server.request_count == 6								#The refused bulk request plus one POST per record.
+		assert [response.json()["name"] for response in responses] == [payload(i)["name"] for i in range(5)]
+		run_together(5,lambda i: self.client.post("users",json=payload(i)))
+		assert self.server.request_count == 11								#The path is remembered: no second bulk attempt.
+		assert self.client.stats["requests_saved"] == 0
+
+	def test_array_stored_as_one_object_is_not_sent_again(self):
+		self.start(bulk="object")
+		errors = run_together(3,lambda i: self.client.post("users",json=payload(i)))
+		assert self.server.request_count == 1								#The records were accepted once and never posted again.
+		assert all(isinstance(error,APIError) and error.status_code == 201 for error in errors)
+		assert len({id(error) for error in errors}) == 3
+		responses = run_together(3,lambda i: self.client.post("users",json=payload(i)))
+		assert self.server.request_count == 4								#The path is remembered: one POST per record from now on.
+		assert [response.json()["name"] for response in responses] == [payload(i)["name"] for i in range(3)]
+
+	def test_batches_are_kept_apart_per_server(self):
+		self.start()
+		other_server = LocalAPIServer(latency=0.05,bulk=True).start()
+		try:
+			other_client = APIClient(base_url=other_server.base_url,post_batcher=self.client.post_batcher)
+			clients = [self.client,other_client]
+			responses = run_together(4,lambda i: clients[i % 2].post("users",json=payload(i)))
+			assert self.server.request_count == 1 and other_server.request_count == 1
+			assert [response.json()["name"] for response in responses] == [payload(i)["name"] for i in range(4)]
+		finally:
+			other_server.stop()
+
+	def test_every_caller_gets_its_own_error(self):
+		self.start(error_rate=1.0)
+		errors = run_together(4,lambda i: self.client.post("users",json=payload(i)))
+		assert self.server.request_count == 1
+		assert all(isinstance(error,APIError) and error.status_code == 503 for error in errors)
+		assert len({id(error) for error in errors}) == 4
+
+	def test_lone_post_is_sent_as_an_object(self):
+		self.start()
+		response = self.client.post("users",json=payload(1))
+		assert response.json() == dict(payload(1),id=11)
+		assert self.server.request_count == 1
+		assert self.client.stats["bulk_requests"] == 0
+
+	def test_retried_posts_are_not_batched(self):
+		self.start()
+		run_together(3,lambda i: self.client.post("users",json=payload(i),retry=True))
+		assert self.server.request_count == 3
+
+	def test_async_post_many_uses_the_batcher(self):
+		self.server = LocalAPIServer(latency=0.05,bulk=True).start()
+
+		async def post_all():
+			async with AsyncAPIClient(base_url=self.server.base_url,max_concurrency=8,post_batcher=PostBatcher(max_wait=0.2)) as client:
+				results = await client.post_many("users",[payload(i) for i in range(8)])
+				return results,client.stats
+
+		results,stats = asyncio.run(post_all())
+		assert [response.json()["name"] for response in results] == [payload(i)["name"] for i in range(8)]
+		assert self.server.request_count == 1
+		assert stats["requests_saved"] == 7
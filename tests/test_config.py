@@ -0,0 +1,100 @@
+"""
+Test file for the lazy, cached Config and its environment profiles (src/config.py).
+
+The tests point PROJECT_ROOT at a temporary folder so they can write their own .env
+files, and put the session's Config state (e.g. the local server's BASE_URL) back
+afterwards. They check that:
+  - nothing is read until a setting is used, and values are cached
+  - environment variables beat .env.<profile>, which beats the built-in profile and .env
+  - Config.BASE_URL = ... overrides a value until reload()
+  - unknown profiles are refused
+"""
+
+
+import pytest		#This is for running tests.
+import sys			#This is to find the src folder.
+import os			#This is for fixing and creating proper paths.
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))	#Adding the project root to Python's search path so "from src..." works.
+
+from src import config
+from src.config import Config
+
+
+class TestConfig:
+
+	def setup_method(self):												#Saves the session's Config state; the tests below reload it.
+		self.saved = (dict(Config._values),Config._env,Config._profile,Config._active_profile)
+
+	def teardown_method(self):
+		values,env,profile,active_profile = self.saved
+		Config._values.clear()
+		Config._values.update(values)
+		Config._env = env
+		Config._profile = profile
+		Config._active_profile = active_profile
+
+	def use_root(self,monkeypatch,tmp_path,files):						#An empty environment with only the given .env files.
+		for name,text in files.items():
+			(tmp_path / name).write_text(text,encoding="utf-8")
+		monkeypatch.setattr(config,"PROJECT_ROOT",str(tmp_path))
+		for name in ("API_BASE_URL","REQUEST_TIMEOUT","POOL_BLOCK","CONFIG_PROFILE"):
+			monkeypatch.delenv(name,raising=False)
+		Config._profile = None
+		Config.reload()
+
+	def test_nothing_is_read_until_a_setting_is_used(self,monkeypatch,tmp_path):
+		self.use_root(monkeypatch,tmp_path,{".env":"REQUEST_TIMEOUT=7\n"})
+		assert Config._env is None and not Config._values
+		assert Config.REQUEST_TIMEOUT == 7
+		assert Config._values == {"REQUEST_TIMEOUT":7}					#Only the setting that was used.
+
+	def test_values_are_cached(self,monkeypatch,tmp_path):
+		self.use_root(monkeypatch,tmp_path,{})
+		assert Config.REQUEST_TIMEOUT == 10
+		monkeypatch.setenv("REQUEST_TIMEOUT","20")
+		assert Config.REQUEST_TIMEOUT == 10							#Cached until reload.
+		Config.reload()
+		assert Config.REQUEST_TIMEOUT == 20
+
+	def test_types(self,monkeypatch,tmp_path):
+		self.use_root(monkeypatch,tmp_path,{".env":"POOL_BLOCK=Yes\nLOCAL_SERVER_LATENCY=0.25\n"})
+		assert Config.POOL_BLOCK is True
+		assert Config.LOCAL_SERVER_LATENCY == 0.25
+
+	def test_profile_priority(self,monkeypatch,tmp_path):
+		self.use_root(monkeypatch,tmp_path,{
+			".env":"CONFIG_PROFILE=offline\nREQUEST_TIMEOUT=3\n",
+			".env.offline":"REQUEST_TIMEOUT=4\n",
+		})
+		assert Config.get_profile() == "offline"
+		assert Config.get_base_url() == "local://"						#From the built-in profile.
+		assert Config.get_timeout() == 4								#.env.offline beats .env.
+		monkeypatch.setenv("REQUEST_TIMEOUT","5")
+		Config.reload()
+		assert Config.get_timeout() == 5								#The environment beats every file.
+
+	def test_profile_from_file_only(self,monkeypatch,tmp_path):
+		self.use_root(monkeypatch,tmp_path,{".env.staging":"API_BASE_URL=https://staging.example.com\n"})
+		assert Config.get_base_url() == "https://jsonplaceholder.typicode.com"
+		Config.use_profile("staging")
+		assert Config.get_base_url() == "https://staging.example.com"
+		Config.use_profile("")
+		assert Config.get_base_url() == "https://jsonplaceholder.typicode.com"
+
+	def test_assignment_overrides_until_reload(self,monkeypatch,tmp_path):
+		self.use_root(monkeypatch,tmp_path,{})
+		Config.BASE_URL = "http://127.0.0.1:1"
+		assert Config.get_base_url() == "http://127.0.0.1:1"
+		assert isinstance(Config.__dict__["BASE_URL"],config._Setting)	#The setting itself is still there.
+		Config.reload()
+		assert Config.get_base_url() == "https://jsonplaceholder.typicode.com"
+
+	def test_unknown_profile(self,monkeypatch,tmp_path):
+		self.use_root(monkeypatch,tmp_path,{})
+		with pytest.raises(ValueError):
+			Config.use_profile("nope")
+		monkeypatch.setenv("CONFIG_PROFILE","nope")
+		Config.reload()
+		with pytest.raises(ValueError):
+			Config.get_base_url()
@@ -5,15 +5,16 @@ import os							#This is for getting a clear and proper path.
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))				#This is so that test_data_driven.py can access the api_client.py file in the src folder to eventually get access to the APIClient class.
 
-from src.api_client import APIClient															#Importing the APIClient class from the src folder's api_client.py file.
+from src.client_registry import get_client																#Importing get_client, which hands out the shared pooled APIClient.
+from src.schema import CREATED_USER_SCHEMA																#The compiled schema for a created user (fields, types and the values we sent).
 from src.utils import setup_logger,get_test_data_path											#Importing setup_logger and get_test_data_path methods from the src.utils.py file.
 
 logger = setup_logger("data_driven_tests")														#I am creating a logger with the name data_driven_tests. 
 
 class TestDataDrivenUsers:																		#I'm creating a class TestDataDrivenUsers.
 	def setup_method(self):																		#The setup_method will be called in the beginning of every test.
-		self.client = APIClient()																#For every test, a new object of the class APIClient will be created.
-		logger.info("Test setup: Created new APIClient instance")								#This message will be logged on the console every time a new test is being done. This will indicate that I have created an new APIClient instance for every test. 
+		self.client = get_client()																#Every test uses the same pooled APIClient, so its connections stay open between tests.
+		logger.info("Test setup: Using the shared APIClient instance")								#This message will be logged on the console every time a new test is being done. This will indicate that the test is using the shared APIClient instance. 
 
 	def test_create_users_from_data_file(self):													#This method is created to test if I can create users from the data file which is users_to_create.json in the data folder.
 		logger.info("Starting data-driven test: Create users from JSON file")					#This logs a statement in the console stating that creation of the user from the JSON file has been started. 
@@ -29,14 +30,7 @@ class TestDataDrivenUsers:																		#I'm creating a class TestDataDriven
 
 			created_user = response.json()														#The API's reply, which is in JSON text, is converted to a Python dictionary and saved in the created user. 
 
-			assert "id" in created_user, "Response should have 'id' field"						#This is to check if there is a key called 'ID' in the dictionary that is denoted by created_user.
-			assert "name" in created_user, "Response should have 'name' field"					#This is to check if there is a key called 'name' in the dictionary that is denoted by the created_user.
-			assert "username" in created_user, "Response should have 'username' field"			#This is to check if there is a key called 'username' in the created_user dictionary.
-			assert "email" in created_user, "Response should have 'email' field"				#This is to check if there is a key called 'email' in the created_user dictionary. 
-
-			assert created_user["name"] == user_data["name"]									#This is to verify that the user created in the API has the same name as the one we have given the API.
-			assert created_user["username"] == user_data["username"]							#This is to verify that the user created in the API has the same username as the one we have given the API.
-			assert created_user["email"] == user_data["email"]									#This is to verify that the user created in the API has the same email as the one we have given in the API. 
+			CREATED_USER_SCHEMA.validate(created_user,expected=user_data)						#This checks the 'id', 'name', 'username' and 'email' keys and that name, username and email match what we have given the API.
 
 			logger.info(f"Created user: {created_user['name']} (ID: {created_user['id']})")		#This is to show on the console that the user with this name and this ID has been created, and it matches what we have sent to the API. 
 
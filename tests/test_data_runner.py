@@ -0,0 +1,125 @@
+"""
+Test file for the streaming data-driven runner.
+
+These tests run against the local stand-in server (src/local_server.py). They check
+that records are streamed from JSON arrays and NDJSON files, that every record gets
+a result line in input order, and that an interrupted run resumes from its checkpoint.
+"""
+
+
+import io			#For feeding small JSON texts to the reader.
+import json			#For writing data files and reading the results file.
+import pytest		#This is for running tests.
+import sys			#This is to find the src folder.
+import os			#This is for fixing and creating proper paths.
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))	#Adding the project root to Python's search path so "from src..." works.
+
+from src.api_client import APIClient
+from src.data_runner import DataDrivenRunner,iter_records
+from src.json_stream import iter_json_array
+from src.local_server import LocalAPIServer
+from src.utils import setup_logger
+
+logger = setup_logger("data_runner_tests")
+
+
+def make_users(count):
+	return [{"name":f"User {i}","username":f"user{i}","email":f"user{i}@example.com"} for i in range(count)]
+
+
+def read_results(path):
+	with open(path,'r',encoding='utf-8') as f:
+		return [json.loads(line) for line in f]
+
+
+class TestIterRecords:
+
+	def test_json_array_across_small_chunks(self,tmp_path):				#A tiny chunk size forces records (and numbers) to be cut between reads.
+		data_file = tmp_path / "users.json"
+		records = make_users(25) + [12345,"text, with ] brackets",[1,[2]],None]
+		data_file.write_text(json.dumps(records,indent=2),encoding="utf-8")
+		with open(data_file,'r',encoding='utf-8') as f:
+			assert list(iter_json_array(f,chunk_size=7)) == records
+
+	def test_ndjson_and_blank_lines(self,tmp_path):
+		data_file = tmp_path / "users.ndjson"
+		records = make_users(3)
+		data_file.write_text("\n".join(json.dumps(r) for r in records) + "\n\n",encoding="utf-8")
+		assert list(iter_records(str(data_file))) == records
+
+	def test_json_array_with_bom_and_leading_whitespace(self,tmp_path):
+		data_file = tmp_path / "users.json"
+		data_file.write_text("\n  " + json.dumps(make_users(2)),encoding="utf-8-sig")
+		assert list(iter_records(str(data_file))) == make_users(2)
+
+	def test_unclosed_array_raises(self,tmp_path):
+		data_file = tmp_path / "broken.json"
+		data_file.write_text('[{"name":"a"},',encoding="utf-8")
+		with pytest.raises(ValueError):
+			list(iter_records(str(data_file)))
+
+
+	@pytest.mark.parametrize("text",['[1 2,,3 {"a":1}]','[1,2,]','[,1]','[1,,2]'])
+	def test_malformed_separators_raise(self,text):
+		with pytest.raises(ValueError):
+			list(iter_json_array(io.StringIO(text)))
+
+	def test_broken_item_fails_where_it_is(self):
+		text = '[{"a":tru},' + ",".join(['{"name":"x"}'] * 10000) + "]"
+		reader = io.StringIO(text)
+		with pytest.raises(ValueError,match="at character 6"):
+			list(iter_json_array(reader,chunk_size=1024))
+		assert reader.tell() <= 2048										#The rest of the file was never read.
+
+
+class TestDataDrivenRunner:
+
+	def setup_method(self):
+		self.server = LocalAPIServer().start()
+		self.client = APIClient(base_url=self.server.base_url)
+		logger.info("Test setup: Started local server for the data runner")
+
+	def teardown_method(self):
+		self.server.stop()
+
+	def test_posts_every_record_in_order(self,tmp_path):
+		data_file = tmp_path / "users.json"
+		data_file.write_text(json.dumps(make_users(50)),encoding="utf-8")
+		results_file = str(tmp_path / "results.ndjson")
+
+		runner = DataDrivenRunner(client=self.client,workers=4,results_file=results_file,checkpoint_every=7)
+		summary = runner.run(str(data_file))
+
+		assert summary["processed"] == 50
+		assert summary["succeeded"] == 50
+		assert summary["failed"] == 0
+		results = read_results(results_file)
+		assert [r["index"] for r in results] == list(range(50))
+		assert all(r["status"] == 201 for r in results)
+		assert not os.path.exists(results_file + ".checkpoint")				#A finished run removes its checkpoint.
+
+	def test_failed_records_are_reported(self,tmp_path):
+		data_file = tmp_path / "users.ndjson"
+		data_file.write_text("\n".join(json.dumps(r) for r in make_users(3)),encoding="utf-8")
+		results_file = str(tmp_path / "results.ndjson")
+
+		summary = DataDrivenRunner(client=self.client,path="unknown",results_file=results_file).run(str(data_file))
+
+		assert summary["failed"] == 3
+		assert all(r["status"] == 404 and "error" in r for r in read_results(results_file))
+
+	def test_resume_from_checkpoint(self,tmp_path):
+		data_file = tmp_path / "users.json"
+		data_file.write_text(json.dumps(make_users(10)),encoding="utf-8")
+		results_file = tmp_path / "results.ndjson"
+		checkpoint_file = tmp_path / "results.ndjson.checkpoint"
+		first_lines = "".join(json.dumps({"status":201,"index":i},separators=(",",":")) + "\n" for i in range(4))
+		results_file.write_text(first_lines + '{"status":201,"index":4}\n',encoding="utf-8")	#The 5th line was written after the last checkpoint.
+		checkpoint_file.write_text(json.dumps({"source":os.path.abspath(str(data_file)),"next_index":4,"results_offset":len(first_lines)}),encoding="utf-8")
+
+		summary = DataDrivenRunner(client=self.client,workers=2,results_file=str(results_file)).run(str(data_file))
+
+		assert summary["resumed_from"] == 4
+		assert summary["processed"] == 6
+		assert [r["index"] for r in read_results(results_file)] == list(range(10))
@@ -0,0 +1,53 @@
+"""
+Test file for the fast startup path of the framework modules.
+
+Timings depend on the machine, so the timed comparison with the baseline lives in
+benchmarks/bench_import_time.py. These tests check the things that make startup
+fast and can be checked exactly, each in a fresh interpreter:
+  - importing the framework does not load requests, urllib3, dotenv or orjson
+  - importing the framework does not change sys.path
+  - the lazy modules still load as soon as a client is created
+"""
+
+
+import json			#For reading what the fresh interpreter reports.
+import subprocess	#Every check needs a fresh interpreter.
+import pytest		#This is for running tests.
+import sys			#This is to find the src folder.
+import os			#This is for fixing and creating proper paths.
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))	#Adding the project root to Python's search path so "from src..." works.
+
+from benchmarks.bench_import_time import LAZY_MODULES,MODULES,PROJECT_ROOT,loaded_lazy_modules,regressions
+
+
+def run_python(code):													#Runs code in a fresh interpreter from the project root and returns what it printed, decoded from JSON.
+	result = subprocess.run([sys.executable,"-c",code],cwd=PROJECT_ROOT,capture_output=True,text=True,check=True)
+	return json.loads(result.stdout)
+
+
+class TestImportTime:
+
+	def test_heavy_modules_are_not_imported(self):
+		assert loaded_lazy_modules() == []
+
+	def test_sys_path_is_left_alone(self):
+		changed = run_python(
+			"import json,sys\nbefore = list(sys.path)\n"
+			f"for name in {list(MODULES)!r}: __import__(name)\n"
+			"print(json.dumps(sys.path != before))"
+		)
+		assert changed is False
+
+	def test_requests_loads_when_a_client_is_created(self):
+		loaded = run_python(
+			"import json,sys\nfrom src.api_client import APIClient\nbefore = 'requests' in sys.modules\n"
+			"APIClient(base_url='http://127.0.0.1:1')\nprint(json.dumps([before,'requests' in sys.modules]))"
+		)
+		assert loaded == [False,True]
+
+	def test_regression_check(self):
+		baseline = {"src.config":2.0,"src.api_client":20.0}
+		assert regressions({"src.config":3.0,"src.api_client":30.0},baseline) == []	#Within tolerance and slack.
+		assert regressions({"src.config":2.0,"src.api_client":80.0},baseline) == ["src.api_client: 80.0 ms, baseline 20.0 ms"]
+		assert "requests" in LAZY_MODULES
@@ -0,0 +1,100 @@
+"""
+Test file for the per-request timing instrumentation.
+
+Runs against the local stand-in server (src/local_server.py) and checks that the
+timings, byte counts and connection reuse flags reach the request hooks, that the
+collector summarises and exports them, and that clients without hooks are untouched.
+"""
+
+
+import csv			#For reading the CSV export.
+import json			#For reading the JSON export.
+import pytest		#This is for running tests.
+import sys			#This is to find the src folder.
+import os			#This is for fixing and creating proper paths.
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))	#Adding the project root to Python's search path so "from src..." works.
+
+from src.api_client import APIClient,APIError
+from src.instrumentation import InstrumentedAdapter,TimingCollector,endpoint_name
+from src.local_server import LocalAPIServer
+
+
+class TestInstrumentation:
+
+	def setup_method(self):
+		self.server = LocalAPIServer().start()
+		self.collector = TimingCollector()
+		self.saved_hooks = APIClient.default_request_hooks						#Without the session's --api-timing hook, so only our own timings are collected.
+		APIClient.default_request_hooks = []
+		self.client = APIClient(base_url=self.server.base_url,request_hooks=[self.collector.record])
+
+	def teardown_method(self):
+		APIClient.default_request_hooks = self.saved_hooks
+		self.server.stop()
+
+	def test_timings_and_connection_reuse(self):
+		self.client.get("users/1")
+		self.client.post("users",json={"name":"Alice"})
+
+		first,second = self.collector.timings
+		assert first.endpoint == "GET /users/{id}"
+		assert first.status == 200
+		assert first.reused is False and first.connect_s > 0							#The first request had to open the connection...
+		assert second.reused is True and second.connect_s == 0						#...the second one used it again.
+		for timing in (first,second):
+			assert timing.total_s >= timing.ttfb_s >= 0
+			assert timing.download_s >= 0
+			assert timing.connect_s + timing.ttfb_s + timing.download_s == pytest.approx(timing.total_s)	#Connect time is not counted again in the TTFB.
+			assert timing.bytes_sent > 0 and timing.bytes_received > 0
+		assert second.bytes_sent > first.bytes_sent									#The POST has a body.
+
+	def test_errors_are_recorded(self):
+		try:
+			self.client.get("users/99999")
+		except APIError:
+			pass
+		assert self.collector.timings[0].status == 404
+
+	def test_summaries_and_exports(self,tmp_path):
+		self.collector.current_test = "tests/test_x.py::test_a"
+		for user_id in (1,2,3):
+			self.client.get(f"users/{user_id}")
+		self.collector.current_test = "tests/test_x.py::test_b"
+		self.client.get("users")
+
+		endpoints = {row["endpoint"]:row for row in self.collector.by_endpoint()}
+		assert endpoints["GET /users/{id}"]["count"] == 3
+		assert endpoints["GET /users"]["count"] == 1
+		assert {row["test"]:row["requests"] for row in self.collector.by_test()} == {"tests/test_x.py::test_a":3,"tests/test_x.py::test_b":1}
+
+		json_path = tmp_path / "out" / "timings.json"
+		csv_path = tmp_path / "out" / "timings.csv"
+		self.collector.export_json(str(json_path))
+		self.collector.export_csv(str(csv_path))
+		assert len(json.loads(json_path.read_text(encoding="utf-8"))["timings"]) == 4
+		with open(csv_path,'r',encoding='utf-8') as f:
+			assert len(list(csv.DictReader(f))) == 4
+
+	def test_pool_size_keeps_instrumentation(self):
+		self.client.set_pool_size(20)
+		assert isinstance(self.client.session.get_adapter(self.server.base_url),InstrumentedAdapter)
+
+
+class TestWithoutHooks:
+
+	def setup_method(self):
+		self.saved_hooks = APIClient.default_request_hooks						#Without the session's --api-timing hook.
+		APIClient.default_request_hooks = []
+
+	def teardown_method(self):
+		APIClient.default_request_hooks = self.saved_hooks
+
+	def test_plain_client_uses_plain_adapter(self):
+		client = APIClient(base_url="http://api.test")
+		assert client.request_hooks == []
+		assert not isinstance(client.session.get_adapter("http://api.test"),InstrumentedAdapter)
+
+	def test_endpoint_name(self):
+		assert endpoint_name("GET","http://x/users/25?_page=2") == "GET /users/{id}"
+		assert endpoint_name("POST","http://x/users/") == "POST /users"
@@ -0,0 +1,90 @@
+"""
+Test file for APIClient.iter_get and the truncated error bodies.
+
+These tests run against the local stand-in server (src/local_server.py), seeded with
+more users than fit on one page. They check page-based, range-based and Link-header
+pagination, the streaming mode, a server that ignores the paging parameters and that a huge error body is not copied into the
+APIError message.
+"""
+
+
+import pytest		#This is for running tests.
+import requests		#For building a fake error response.
+import sys			#This is to find the src folder.
+import os			#This is for fixing and creating proper paths.
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))	#Adding the project root to Python's search path so "from src..." works.
+
+from src.api_client import ERROR_BODY_LIMIT,APIClient,APIError
+from src.local_server import LocalAPIServer,_StandInHandler
+
+USER_COUNT = 95
+
+
+class TestIterGet:
+
+	def setup_method(self):
+		users = [{"id":i,"name":f"User {i}","username":f"user{i}","email":f"user{i}@example.com"} for i in range(1,USER_COUNT + 1)]
+		self.server = LocalAPIServer(users=users).start()
+		self.client = APIClient(base_url=self.server.base_url)
+
+	def teardown_method(self):
+		self.server.stop()
+
+	@pytest.mark.parametrize("pagination",["page","range"])
+	@pytest.mark.parametrize("prefetch",[True,False])
+	def test_walks_every_page(self,pagination,prefetch):
+		ids = [user["id"] for user in self.client.iter_get("users",page_size=10,pagination=pagination,prefetch=prefetch)]
+		assert ids == list(range(1,USER_COUNT + 1))
+		assert self.server.request_count == 10											#9 full pages and one page with 5 users.
+
+	def test_stream_mode_decodes_items_one_by_one(self):
+		ids = [user["id"] for user in self.client.iter_get("users",page_size=40,stream=True)]
+		assert ids == list(range(1,USER_COUNT + 1))
+
+	def test_stream_mode_without_pages(self):
+		assert len(list(self.client.iter_get("users",stream=True))) == USER_COUNT
+		assert self.server.request_count == 1
+
+	def test_max_pages(self):
+		assert len(list(self.client.iter_get("users",page_size=10,max_pages=2))) == 20
+
+	def test_stopping_early_does_not_hang(self):
+		items = self.client.iter_get("users",page_size=10)
+		assert next(items)["id"] == 1
+		items.close()																	#The prefetch thread is shut down cleanly.
+
+	def test_error_is_raised_as_api_error(self):
+		with pytest.raises(APIError) as error_info:
+			list(self.client.iter_get("unknown",page_size=10))
+		assert error_info.value.status_code == 404
+
+	def test_streamed_error_is_raised_as_api_error(self):
+		with pytest.raises(APIError) as error_info:
+			list(self.client.iter_get("unknown",stream=True))
+		assert error_info.value.status_code == 404
+
+	@pytest.mark.parametrize("pagination",["page","range"])
+	def test_server_that_ignores_paging(self,monkeypatch,pagination):
+		monkeypatch.setattr(_StandInHandler,"_paginate",lambda handler,items: (items,{}))	#Every page is the whole collection.
+		with pytest.raises(ValueError):
+			list(self.client.iter_get("users",page_size=10,pagination=pagination))
+		assert self.server.request_count == 1											#No endless loop over the same items.
+
+	def test_unknown_pagination_style(self):
+		with pytest.raises(ValueError):
+			list(self.client.iter_get("users",page_size=10,pagination="cursor"))
+
+
+class TestErrorBodyPreview:
+
+	def test_large_error_body_is_truncated(self):
+		client = APIClient(base_url="http://api.test")
+		fake = requests.Response()
+		fake.status_code = 500
+		fake._content = b"x" * (ERROR_BODY_LIMIT * 100)
+		fake._content_consumed = True													#Like a normal (not streamed) response that has been downloaded.
+		with pytest.raises(APIError) as error_info:
+			client._raise_for_error(fake,"http://api.test/users")
+		assert len(error_info.value.message) < ERROR_BODY_LIMIT + 200
+		assert error_info.value.response is fake										#The full body is still there if a test needs it.
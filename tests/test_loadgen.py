@@ -0,0 +1,85 @@
+"""
+Test file for the load generator.
+
+Checks the latency histogram maths and runs very short open- and closed-loop
+scenarios against the local stand-in server (src/local_server.py).
+"""
+
+
+import json			#For reading the saved report.
+import pytest		#This is for running tests.
+import sys			#This is to find the src folder.
+import os			#This is for fixing and creating proper paths.
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))	#Adding the project root to Python's search path so "from src..." works.
+
+from src.api_client import APIClient
+from src.loadgen import LatencyHistogram,LoadGenerator,main,parse_mix
+from src.local_server import LocalAPIServer
+
+
+class TestLatencyHistogram:
+
+	def test_percentiles_within_one_percent(self):
+		histogram = LatencyHistogram()
+		for ms in range(1,1001):												#1 ms to 1000 ms, one value each.
+			histogram.record(ms / 1000.0)
+		for p,expected in ((50,500),(90,900),(99,990),(99.9,999)):
+			assert abs(histogram.percentile(p) - expected) <= expected * 0.01
+		assert histogram.percentile(100) == 1000.0
+		assert len(histogram.counts) < 1000									#Values were folded into buckets.
+
+	def test_merge(self):
+		first,second = LatencyHistogram(),LatencyHistogram()
+		first.record(0.001)
+		second.record(0.5)
+		first.merge(second)
+		assert first.total == 2
+		assert first.max == 500000
+
+	def test_empty(self):
+		assert LatencyHistogram().percentile(50) is None
+
+
+class TestParseMix:
+
+	def test_weights(self):
+		assert parse_mix("get_users=1,get_user=3,post_user") == {"get_users":1.0,"get_user":3.0,"post_user":1.0}
+
+	def test_unknown_operation(self):
+		with pytest.raises(ValueError):
+			parse_mix("delete_user=1")
+
+
+class TestLoadGenerator:
+
+	def setup_method(self):
+		self.server = LocalAPIServer().start()
+
+	def teardown_method(self):
+		self.server.stop()
+
+	def test_open_loop_sends_at_target_rate(self):
+		generator = LoadGenerator(client=APIClient(base_url=self.server.base_url),rps=100,concurrency=5,duration=0.5,seed=1)
+		report = generator.run()
+		assert report["config"]["mode"] == "open"
+		assert report["requests"] == 50
+		assert self.server.request_count == 50
+		assert report["errors"] == {}
+		assert set(report["latency_by_operation"]) <= {"get_users","get_user","post_user"}
+		assert sum(slot["ok"] for slot in report["throughput_over_time"]) == 50
+
+	def test_closed_loop_and_errors_by_status(self):
+		self.server.error_rate = 1.0
+		generator = LoadGenerator(client=APIClient(base_url=self.server.base_url),mix={"get_user":1},concurrency=2,duration=0.2)
+		report = generator.run()
+		assert report["config"]["mode"] == "closed"
+		assert report["requests"] > 0
+		assert report["errors"] == {"503":report["requests"]}
+
+	def test_cli_writes_json_report(self,tmp_path):
+		output = tmp_path / "report.json"
+		main(["--base-url",self.server.base_url,"--rps","40","--duration","0.25","--mix","get_users=1","--output",str(output)])
+		report = json.loads(output.read_text(encoding="utf-8"))
+		assert report["requests"] == 10
+		assert set(report["latency"]["percentiles_ms"]) == {"p50","p90","p99","p99.9"}
@@ -0,0 +1,107 @@
+"""
+Test file for the local stand-in server.
+
+Checks the seeded /users endpoints, injected errors, the record/replay cassettes
+and how local://, record:// and replay:// base URLs are turned into servers.
+"""
+
+
+import json			#For reading the cassette file.
+import pytest		#This is for running tests.
+import sys			#This is to find the src folder.
+import os			#This is for fixing and creating proper paths.
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))	#Adding the project root to Python's search path so "from src..." works.
+
+from src.api_client import APIClient,APIError
+from src.local_server import LocalAPIServer,RecordingAPIServer,ReplayAPIServer,server_from_base_url
+
+
+class TestLocalAPIServer:
+
+	def test_seeded_users_create_and_not_found(self):
+		with LocalAPIServer() as server:
+			client = APIClient(base_url=server.base_url)
+			assert len(client.get("users").json()) == 10
+			assert client.post("users",json={"name":"A"}).status_code == 201
+			with pytest.raises(APIError) as error_info:
+				client.get("users/99999")
+			assert error_info.value.status_code == 404
+
+	def test_injected_errors(self):
+		with LocalAPIServer(error_rate=1.0,error_status=502) as server:
+			with pytest.raises(APIError) as error_info:
+				APIClient(base_url=server.base_url).get("users")
+			assert error_info.value.status_code == 502
+
+	def test_seeded_error_rate_is_repeatable(self):
+		outcomes = []
+		for _ in range(2):
+			with LocalAPIServer(error_rate=0.5,seed=7) as server:
+				client = APIClient(base_url=server.base_url)
+				run = []
+				for _ in range(20):
+					try:
+						run.append(client.get("users/1").status_code)
+					except APIError as e:
+						run.append(e.status_code)
+				outcomes.append(run)
+		assert outcomes[0] == outcomes[1]
+		assert 200 in outcomes[0] and 503 in outcomes[0]
+
+
+class TestRecordReplay:
+
+	def test_recorded_traffic_is_replayed_without_upstream(self,tmp_path):
+		cassette = str(tmp_path / "cassettes" / "users.json")
+		with LocalAPIServer() as upstream:
+			with RecordingAPIServer(cassette,upstream=upstream.base_url) as recorder:
+				client = APIClient(base_url=recorder.base_url)
+				recorded_page = client.get("users",params={"_page":1,"_limit":4})
+				recorded_user = client.get("users/2").json()
+				recorded_post = client.post("users",json={"name":"Alice","email":"a@example.com"}).json()
+				with pytest.raises(APIError):
+					client.get("users/99999")
+			assert recorded_page.links["next"]["url"].startswith(recorder.base_url)		#Link headers point back at the local server.
+
+		with open(cassette,'r',encoding='utf-8') as f:
+			assert len(json.load(f)["interactions"]) == 4
+
+		with ReplayAPIServer(cassette) as replay:										#The upstream server is gone now.
+			client = APIClient(base_url=replay.base_url)
+			assert client.get("users",params={"_limit":4,"_page":1}).json() == recorded_page.json()	#Query order does not matter.
+			assert client.get("users/2").json() == recorded_user
+			assert client.post("users",json={"email":"a@example.com","name":"Alice"}).json() == recorded_post
+			with pytest.raises(APIError) as error_info:
+				client.get("users/99999")
+			assert error_info.value.status_code == 404
+			with pytest.raises(APIError) as error_info:
+				client.get("users/3")													#Never recorded.
+			assert error_info.value.status_code == 501
+
+
+class TestServerFromBaseURL:
+
+	def test_normal_url_gives_no_server(self):
+		assert server_from_base_url("https://jsonplaceholder.typicode.com") is None
+
+	def test_local_url(self):
+		server = server_from_base_url("local://",latency=0.01)
+		try:
+			assert isinstance(server,LocalAPIServer)
+			assert server.latency == 0.01
+		finally:
+			server.server_close()
+
+	def test_replay_url_reads_cassette_path(self,tmp_path):
+		cassette = tmp_path / "users.json"
+		cassette.write_text(json.dumps({"upstream":"https://example.com","interactions":[]}),encoding="utf-8")
+		server = server_from_base_url(f"replay://{cassette}")
+		try:
+			assert isinstance(server,ReplayAPIServer)
+		finally:
+			server.server_close()
+
+	def test_record_url_needs_cassette(self):
+		with pytest.raises(ValueError):
+			server_from_base_url("record://")
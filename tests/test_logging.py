@@ -0,0 +1,96 @@
+"""
+Test file for setup_logger's queued, rotating, JSON and rate limited modes.
+"""
+
+
+import json			#For reading the JSON-lines log file.
+import logging		#For checking the handlers on the logger.
+import sys			#This is to find the src folder.
+import os			#This is for fixing and creating proper paths.
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))	#Adding the project root to Python's search path so "from src..." works.
+
+from src.utils import RateLimitFilter,setup_logger,shutdown_logger
+
+
+def close_logger(logger):													#Detaches and closes the handlers so every test starts clean.
+	for handler in list(logger.handlers):
+		logger.removeHandler(handler)
+		handler.close()
+	for log_filter in list(logger.filters):
+		logger.removeFilter(log_filter)
+
+
+class TestSetupLogger:
+
+	def test_default_mode_is_unchanged(self,tmp_path):
+		logger = setup_logger("test_default_mode",log_file=str(tmp_path / "plain.log"),queued=False,rate_limit=0)
+		try:
+			assert {type(handler) for handler in logger.handlers} == {logging.StreamHandler,logging.FileHandler}
+		finally:
+			close_logger(logger)
+
+	def test_queued_json_lines(self,tmp_path):
+		log_file = tmp_path / "queued.log"
+		logger = setup_logger("test_queued_json",log_file=str(log_file),queued=True,log_format="json",rate_limit=0)
+		logger.propagate = False
+		try:
+			assert len(logger.handlers) == 1 and isinstance(logger.handlers[0],logging.handlers.QueueHandler)
+			for i in range(100):
+				logger.info("message %d",i)
+			shutdown_logger("test_queued_json")									#Waits until the background thread has written everything. Other queued loggers keep running.
+			entries = [json.loads(line) for line in log_file.read_text(encoding="utf-8").splitlines()]
+			assert [entry["message"] for entry in entries] == [f"message {i}" for i in range(100)]
+			assert entries[0]["level"] == "INFO" and entries[0]["logger"] == "test_queued_json"
+		finally:
+			close_logger(logger)
+
+	def test_logger_keeps_writing_after_shutdown(self,tmp_path):
+		log_file = tmp_path / "after.log"
+		logger = setup_logger("test_after_shutdown",log_file=str(log_file),queued=True,rate_limit=0)
+		logger.propagate = False
+		try:
+			logger.info("before shutdown")
+			shutdown_logger("test_after_shutdown")
+			assert {type(handler) for handler in logger.handlers} == {logging.StreamHandler,logging.FileHandler}	#The real handlers are back on the logger.
+			assert setup_logger("test_after_shutdown") is logger
+			logger.info("after shutdown")
+			lines = log_file.read_text(encoding="utf-8").splitlines()
+			assert [line.split(" - ")[-1] for line in lines] == ["before shutdown","after shutdown"]
+		finally:
+			close_logger(logger)
+
+	def test_size_rotation(self,tmp_path):
+		log_file = tmp_path / "rotating.log"
+		logger = setup_logger("test_size_rotation",log_file=str(log_file),queued=False,max_bytes=2000,backup_count=2,rate_limit=0)
+		logger.propagate = False
+		try:
+			for i in range(200):
+				logger.debug("x" * 50)
+				logger.warning("line %d %s",i,"y" * 50)
+			assert os.path.exists(f"{log_file}.1")
+			assert not os.path.exists(f"{log_file}.3")							#Only backup_count old files are kept.
+			assert os.path.getsize(log_file) <= 2000
+		finally:
+			close_logger(logger)
+
+
+class TestRateLimitFilter:
+
+	def make_record(self,lineno=1):
+		return logging.LogRecord("rate",logging.INFO,"file.py",lineno,"hello",None,None)
+
+	def test_burst_then_suppressed_count(self):
+		rate_filter = RateLimitFilter(rate=0.0001,burst=3)
+		results = [rate_filter.filter(self.make_record()) for _ in range(10)]
+		assert results == [True] * 3 + [False] * 7
+		rate_filter._buckets[("rate","file.py",1)][0] = 1.0						#Pretend enough time has passed for one more message.
+		record = self.make_record()
+		assert rate_filter.filter(record)
+		assert "suppressed 7 similar messages" in record.msg
+
+	def test_each_call_site_has_its_own_budget(self):
+		rate_filter = RateLimitFilter(rate=0.0001,burst=1)
+		assert rate_filter.filter(self.make_record(lineno=1))
+		assert rate_filter.filter(self.make_record(lineno=2))
+		assert not rate_filter.filter(self.make_record(lineno=1))
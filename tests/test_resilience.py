@@ -0,0 +1,160 @@
+"""
+Test file for the retry policy and circuit breaker in APIClient.
+
+The session's request method is replaced by a small fake that plays back a list of
+outcomes (status codes or network errors), so no server is needed and we can
+check exactly how many attempts were made.
+"""
+
+
+import pytest		#This is for running tests.
+import requests		#For building fake responses and network errors.
+import sys			#This is to find the src folder.
+import os			#This is for fixing and creating proper paths.
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))	#Adding the project root to Python's search path so "from src..." works.
+
+from src.api_client import APIClient,APIError,CircuitOpenError
+from src.resilience import CircuitBreaker,RetryPolicy
+
+
+def make_response(status,headers=None):
+	response = requests.Response()
+	response.status_code = status
+	response.headers.update(headers or {})
+	response._content = b"{}"
+	response._content_consumed = True
+	return response
+
+
+class FakeSession:																#Plays back the outcomes one by one and remembers every call.
+	def __init__(self,outcomes):
+		self.outcomes = list(outcomes)
+		self.calls = []
+
+	def request(self,method,url,**kwargs):
+		self.calls.append((method,url))
+		outcome = self.outcomes.pop(0)
+		if isinstance(outcome,Exception):
+			raise outcome
+		return outcome
+
+
+def make_client(outcomes,**kwargs):
+	client = APIClient(base_url="http://api.test",**kwargs)
+	fake = FakeSession(outcomes)
+	client.session.request = fake.request
+	return client,fake
+
+
+class TestRetryPolicy:
+
+	def setup_method(self):
+		self.sleeps = []
+
+	def policy(self,**kwargs):
+		kwargs.setdefault("jitter",False)
+		return RetryPolicy(sleep=self.sleeps.append,**kwargs)
+
+	def test_get_retries_transient_errors_with_backoff(self):
+		client,fake = make_client([make_response(503),requests.ConnectionError("reset"),make_response(200)],retry_policy=self.policy(backoff_factor=0.1))
+		response = client.get("users")
+		assert response.status_code == 200
+		assert len(fake.calls) == 3
+		assert self.sleeps == [0.1,0.2]											#Exponential backoff: 0.1 then 0.2 seconds.
+		assert client.stats["retries"] == 2
+
+	def test_retry_after_header_is_used(self):
+		client,_ = make_client([make_response(429,{"Retry-After":"7"}),make_response(200)],retry_policy=self.policy())
+		client.get("users")
+		assert self.sleeps == [7.0]
+
+	def test_gives_up_after_max_retries(self):
+		client,fake = make_client([make_response(502)] * 3,retry_policy=self.policy(max_retries=2))
+		with pytest.raises(APIError) as error_info:
+			client.get("users")
+		assert error_info.value.status_code == 502
+		assert len(fake.calls) == 3
+
+	def test_client_errors_are_not_retried(self):
+		client,fake = make_client([make_response(404)],retry_policy=self.policy())
+		with pytest.raises(APIError):
+			client.get("users/99999")
+		assert len(fake.calls) == 1
+
+	def test_post_only_retried_when_asked(self):
+		client,fake = make_client([make_response(503)],retry_policy=self.policy())
+		with pytest.raises(APIError):
+			client.post("users",json={})
+		assert len(fake.calls) == 1
+
+		client,fake = make_client([make_response(503),make_response(201)],retry_policy=self.policy())
+		assert client.post("users",json={},retry=True).status_code == 201
+		assert len(fake.calls) == 2
+
+	def test_retry_budget_is_shared_by_all_requests(self):
+		client,fake = make_client([make_response(503),make_response(200),make_response(503)],retry_policy=self.policy(retry_budget=1))
+		client.get("users")
+		with pytest.raises(APIError):
+			client.get("users")
+		assert len(fake.calls) == 3
+		assert client.stats["retry_budget_exhausted"] == 1
+
+	def test_jitter_stays_below_backoff(self):
+		policy = RetryPolicy(backoff_factor=1.0,jitter=True)
+		assert all(0 <= policy.backoff(3) <= 4.0 for _ in range(50))
+
+
+class TestCircuitBreaker:
+
+	def setup_method(self):
+		self.now = 0.0
+
+	def breaker(self,**kwargs):
+		return CircuitBreaker(clock=lambda: self.now,**kwargs)
+
+	def test_opens_after_threshold_and_fails_fast(self):
+		breaker = self.breaker(failure_threshold=2,recovery_timeout=10)
+		client,fake = make_client([make_response(500),requests.Timeout("slow")],circuit_breaker=breaker)
+		for _ in range(2):
+			with pytest.raises(APIError):
+				client.get("users")
+		assert breaker.state("api.test") == CircuitBreaker.OPEN
+
+		with pytest.raises(CircuitOpenError):
+			client.get("users")
+		assert len(fake.calls) == 2												#The third call never reached the network.
+		assert client.stats["circuit_opened"] == 1
+		assert client.stats["circuit_rejected"] == 1
+
+	def test_half_open_trial_closes_or_reopens(self):
+		breaker = self.breaker(failure_threshold=1,recovery_timeout=10)
+		client,_ = make_client([make_response(503),make_response(503),make_response(200)],circuit_breaker=breaker)
+		with pytest.raises(APIError):
+			client.get("users")
+		self.now = 11
+		with pytest.raises(APIError):
+			client.get("users")													#The trial request fails, so the circuit opens again.
+		assert breaker.state("api.test") == CircuitBreaker.OPEN
+		self.now = 22
+		assert client.get("users").status_code == 200
+		assert breaker.state("api.test") == CircuitBreaker.CLOSED
+
+	def test_unfinished_trial_does_not_block_the_host_forever(self):
+		breaker = self.breaker(failure_threshold=1,recovery_timeout=10)
+		breaker.record_failure("api.test")
+		self.now = 11
+		assert breaker.allow("api.test")										#The trial request, which never records a result (e.g. a hook raised).
+		assert not breaker.allow("api.test")
+		self.now = 20
+		assert not breaker.allow("api.test")
+		self.now = 21
+		assert breaker.allow("api.test")										#recovery_timeout after the first trial, a new one may go.
+		assert breaker.state("api.test") == CircuitBreaker.HALF_OPEN
+
+	def test_client_errors_do_not_open_the_circuit(self):
+		breaker = self.breaker(failure_threshold=1)
+		client,_ = make_client([make_response(404)],circuit_breaker=breaker)
+		with pytest.raises(APIError):
+			client.get("users/99999")
+		assert breaker.state("api.test") == CircuitBreaker.CLOSED
@@ -0,0 +1,125 @@
+"""
+Test file for the GET response cache.
+
+These tests run against the local stand-in server (src/local_server.py), which sends
+ETags and answers If-None-Match with 304. server.request_count tells us how many
+requests really reached the network.
+"""
+
+
+import pytest		#This is for running tests.
+import sys			#This is to find the src folder.
+import os			#This is for fixing and creating proper paths.
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))	#Adding the project root to Python's search path so "from src..." works.
+
+from src.api_client import APIClient,APIError
+from src.local_server import LocalAPIServer
+from src.response_cache import ResponseCache,make_key
+
+
+class TestResponseCache:
+
+	def setup_method(self):
+		self.server = LocalAPIServer().start()
+
+	def teardown_method(self):
+		self.server.stop()
+
+	def test_fresh_entry_skips_the_network(self):
+		cache = ResponseCache(ttl=60)
+		client = APIClient(base_url=self.server.base_url,cache=cache)
+
+		first = client.get("users/2")
+		second = client.get("users/2")
+
+		assert second.json() == first.json()
+		assert getattr(second,"from_cache",False)
+		assert self.server.request_count == 1
+		assert cache.stats["hits"] == 1
+		assert cache.stats["misses"] == 1
+
+	def test_stale_entry_is_revalidated_with_304(self):
+		cache = ResponseCache(ttl=0)													#Every entry is stale straight away.
+		client = APIClient(base_url=self.server.base_url,cache=cache)
+
+		client.get("users")
+		response = client.get("users")
+
+		assert response.status_code == 200
+		assert len(response.json()) == 10
+		assert self.server.request_count == 2
+		assert cache.stats["revalidated"] == 1
+
+	def test_params_are_part_of_the_key(self):
+		assert make_key("http://x/users",{"b":2,"a":1}) == make_key("http://x/users",{"a":1,"b":2})
+		assert make_key("http://x/users",{"a":1}) != make_key("http://x/users",{"a":2})
+
+	def test_errors_are_not_cached(self):
+		cache = ResponseCache()
+		client = APIClient(base_url=self.server.base_url,cache=cache)
+		for _ in range(2):
+			with pytest.raises(APIError):
+				client.get("users/99999")
+		assert self.server.request_count == 2
+		assert len(cache) == 0
+
+	def test_lru_eviction_by_size(self):
+		client = APIClient(base_url=self.server.base_url)
+		one_user = client.get("users/1")
+		cache = ResponseCache(max_bytes=len(one_user.content) * 2 + 500)				#Room for two small users but not three.
+		client.cache = cache
+
+		client.get("users/1")
+		client.get("users/2")
+		client.get("users/1")															#users/1 is now the most recently used...
+		client.get("users/3")															#...so users/2 is the one that gets evicted.
+
+		assert cache.stats["evictions"] == 1
+		assert cache.lookup(make_key(client._build_url("users/1")))[0] is not None
+		assert cache.lookup(make_key(client._build_url("users/2")))[0] is None
+		assert cache.size_bytes <= cache.max_bytes
+
+	def test_disk_cache_is_shared_between_clients(self,tmp_path):
+		first_client = APIClient(base_url=self.server.base_url,cache=ResponseCache(disk_dir=str(tmp_path)))
+		first_client.get("users/4")
+
+		second_cache = ResponseCache(disk_dir=str(tmp_path))							#Like a second pytest process.
+		second_client = APIClient(base_url=self.server.base_url,cache=second_cache)
+		response = second_client.get("users/4")
+
+		assert response.json()["id"] == 4
+		assert self.server.request_count == 1
+		assert second_cache.stats["disk_hits"] == 1
+
+	def test_disk_folder_is_kept_under_its_limit(self,tmp_path):
+		client = APIClient(base_url=self.server.base_url,cache=ResponseCache(disk_dir=str(tmp_path)))
+		client.get("users/1")
+		file_size = os.path.getsize(next(tmp_path.iterdir()))
+		cache = ResponseCache(disk_dir=str(tmp_path),disk_max_bytes=file_size * 3 + 100)	#Room for three files.
+		client.cache = cache
+		for user_id in range(2,7):
+			client.get(f"users/{user_id}")
+		total = sum(os.path.getsize(path) for path in tmp_path.iterdir())
+		assert total <= cache.disk_max_bytes
+		assert cache.stats["disk_evictions"] >= 2
+		assert len(list(tmp_path.iterdir())) <= 3
+		assert cache._read_disk(make_key(client._build_url("users/6"))) is not None	#The newest file is kept.
+
+	def test_leftover_files_are_pruned_on_start(self,tmp_path):
+		APIClient(base_url=self.server.base_url,cache=ResponseCache(disk_dir=str(tmp_path))).get("users/1")
+		cache = ResponseCache(disk_dir=str(tmp_path),disk_max_bytes=0)
+		assert list(tmp_path.iterdir()) == []
+		assert cache.stats["disk_evictions"] == 1
+
+	def test_revalidation_does_not_change_the_shared_entry(self):
+		cache = ResponseCache(ttl=0)
+		client = APIClient(base_url=self.server.base_url,cache=cache)
+		client.get("users/1")
+		key = make_key(client._build_url("users/1"))
+		old_entry,_ = cache.lookup(key)
+		old_stored_at,old_headers = old_entry.stored_at,dict(old_entry.headers)
+		client.get("users/1")															#Stale, so revalidated with a 304.
+		assert cache.stats["revalidated"] == 1
+		assert old_entry.stored_at == old_stored_at and old_entry.headers == old_headers	#Readers of the old entry see no changes.
+		assert cache.lookup(key)[0] is not old_entry
@@ -0,0 +1,164 @@
+"""
+Test file for the compiled response schemas (src/schema.py) and the pluggable JSON
+decoder (src/json_decoder.py).
+
+The decoder tests run against the local stand-in server (src/local_server.py), so
+they do not need internet access. They check that:
+  - valid objects and lists pass, and every problem in a list is reported together
+  - match keys are compared with the payload we sent
+  - response.json() gives the same result with every decoder
+  - keyword arguments to response.json() are honoured, and non-UTF-8 bodies reach a custom decoder as str
+"""
+
+
+import json			#A plain function decoder for the error test.
+from decimal import Decimal	#For the parse_int keyword argument test.
+import pytest		#This is for running tests.
+import sys			#This is to find the src folder.
+import os			#This is for fixing and creating proper paths.
+
+import requests		#For the JSONDecodeError that response.json() raises.
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))	#Adding the project root to Python's search path so "from src..." works.
+
+from src.api_client import APIClient
+from src.json_decoder import get_decoder,load_orjson
+from src.local_server import LocalAPIServer
+from src.schema import CREATED_USER_SCHEMA,MAX_REPORTED,USER_SCHEMA,Schema,SchemaError
+
+
+def make_users(count):
+	return [{"id":i,"name":f"User {i}","username":f"user{i}","email":f"user{i}@example.com"} for i in range(1,count + 1)]
+
+
+class TestSchema:
+
+	def test_valid_list_passes(self):
+		users = make_users(1000)
+		assert USER_SCHEMA.validate_many(users) is users
+
+	def test_all_violations_are_reported_together(self):
+		users = make_users(10)
+		del users[2]["email"]
+		users[5]["id"] = "6"
+		users[7] = "not a user"
+		with pytest.raises(SchemaError) as error_info:
+			USER_SCHEMA.validate_many(users)
+		assert error_info.value.errors == [
+			"[2] 'email': missing",
+			"[5] 'id': expected int, got str",
+			"[7] expected a JSON object, got str",
+		]
+		assert "3 schema violation(s)" in str(error_info.value)
+
+	def test_schema_error_is_an_assertion_error(self):
+		with pytest.raises(AssertionError):
+			USER_SCHEMA.validate({"id":1})
+
+	def test_long_reports_are_shortened(self):
+		users = [{"id":i} for i in range(30)]
+		with pytest.raises(SchemaError) as error_info:
+			USER_SCHEMA.validate_many(users)
+		assert len(error_info.value.errors) == 90						#name, username and email missing for every user.
+		assert f"... and {90 - MAX_REPORTED} more" in str(error_info.value)
+
+	def test_optional_fields_are_checked_only_when_present(self):
+		schema = Schema({"id":int},optional={"phone":str,"address":dict})
+		schema.validate_many([{"id":1},{"id":2,"phone":"555"},{"id":3,"address":{}}])
+		with pytest.raises(SchemaError) as error_info:
+			schema.validate({"id":1,"phone":12345})
+		assert error_info.value.errors == ["'phone': expected str, got int"]
+
+	def test_types_are_exact(self):
+		with pytest.raises(SchemaError) as error_info:
+			USER_SCHEMA.validate(dict(make_users(1)[0],id=True))
+		assert error_info.value.errors == ["'id': expected int, got bool"]
+
+	def test_match_against_sent_payload(self):
+		sent = {"name":"Alice Test","username":"alice","email":"alice@example.com"}
+		CREATED_USER_SCHEMA.validate(dict(sent,id=11),expected=sent)
+		with pytest.raises(SchemaError) as error_info:
+			CREATED_USER_SCHEMA.validate(dict(sent,id=11,email="bob@example.com"),expected=sent)
+		assert error_info.value.errors == ["'email': expected 'alice@example.com', got 'bob@example.com'"]
+
+	def test_validate_many_with_expected_payloads(self):
+		sent = [{"name":u["name"],"username":u["username"],"email":u["email"]} for u in make_users(5)]
+		created = [dict(payload,id=11) for payload in sent]
+		CREATED_USER_SCHEMA.validate_many(created,expected=sent)
+		created[3]["username"] = "someone"
+		with pytest.raises(SchemaError) as error_info:
+			CREATED_USER_SCHEMA.validate_many(created,expected=sent)
+		assert error_info.value.errors == ["[3] 'username': expected 'user4', got 'someone'"]
+		with pytest.raises(SchemaError):
+			CREATED_USER_SCHEMA.validate_many(created,expected=sent[:2])
+
+	def test_any_type_and_type_tuples(self):
+		schema = Schema({"id":(int,str),"extra":None})
+		schema.validate_many([{"id":1,"extra":None},{"id":"a","extra":[1]}])
+		with pytest.raises(SchemaError) as error_info:
+			schema.validate({"id":1.5})
+		assert error_info.value.errors == ["'id': expected int or str, got float","'extra': missing"]
+
+	def test_not_a_list(self):
+		with pytest.raises(SchemaError):
+			USER_SCHEMA.validate_many({"id":1})
+
+	def test_match_key_must_be_a_field(self):
+		with pytest.raises(ValueError):
+			Schema({"id":int},match=("name",))
+
+
+class TestJsonDecoder:
+
+	def setup_method(self):
+		self.server = LocalAPIServer().start()
+
+	def teardown_method(self):
+		self.server.stop()
+
+	@pytest.mark.parametrize("decoder",["auto","json",pytest.param("orjson",marks=pytest.mark.skipif(load_orjson() is None,reason="orjson is not installed"))])
+	def test_same_result_with_every_decoder(self,decoder):
+		client = APIClient(base_url=self.server.base_url,json_decoder=decoder)
+		users = client.get("users").json()
+		assert users == APIClient(base_url=self.server.base_url,json_decoder="json").get("users").json()
+		USER_SCHEMA.validate_many(users)
+
+	def test_custom_decoder_function(self):
+		calls = []
+
+		def loads(body):
+			calls.append(body)
+			return {"decoded":True}
+
+		client = APIClient(base_url=self.server.base_url,json_decoder=loads)
+		assert client.get("users/1").json() == {"decoded":True}
+		assert isinstance(calls[0],bytes)
+
+	@pytest.mark.parametrize("decoder",["auto","json"])
+	def test_keyword_arguments_use_the_json_module(self,decoder):
+		client = APIClient(base_url=self.server.base_url,json_decoder=decoder)
+		assert isinstance(client.get("users/1").json(parse_int=Decimal)["id"],Decimal)
+
+	def test_custom_decoder_gets_str_for_other_charsets(self):
+		calls = []
+
+		def loads(body):
+			calls.append(body)
+			return json.loads(body)
+
+		client = APIClient(base_url=self.server.base_url,json_decoder=loads)
+		response = client.get("users/1")
+		response.encoding = "latin-1"
+		assert response.json()["id"] == 1
+		assert isinstance(calls[-1],str)
+
+	def test_invalid_body_raises_requests_error(self):
+		client = APIClient(base_url=self.server.base_url,json_decoder=get_decoder("auto") or json.loads)		#Both go through our decode_response.
+		response = client.get("users/1")
+		response._content = b"{not json"
+		with pytest.raises(requests.exceptions.JSONDecodeError):
+			response.json()
+
+	def test_unknown_decoder_name(self):
+		with pytest.raises(ValueError):
+			APIClient(base_url=self.server.base_url,json_decoder="simplejson")